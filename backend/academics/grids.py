@@ -0,0 +1,99 @@
+"""
+Horaires hebdomadaires matérialisés (TimetableGrid) par auditoire et par enseignant.
+
+Une grille contient la liste [{"day", "events"}] des jours dans l'ordre de la semaine, chaque
+jour trié par heure de début, et un ETag calculé sur ce contenu. Toute écriture sur un créneau
+(Calendrier), ou le renommage d'un cours ou d'un enseignant, supprime les grilles concernées
+dans la même transaction; la grille est reconstruite à la lecture suivante, une seule fois.
+Les écritures en masse (générateur d'horaire) regroupent leurs invalidations avec deferred().
+"""
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Calendrier, TimetableGrid
+
+DAY_ORDER = [day for day, _ in Calendrier.DAY_CHOICES]
+
+_deferred = threading.local()
+
+
+def owners(auditoire_id, teacher_id):
+    """Propriétaires des grilles où figure un créneau."""
+    found = set()
+    if auditoire_id is not None:
+        found.add(('auditoire', auditoire_id))
+    if teacher_id is not None:
+        found.add(('teacher', teacher_id))
+    return found
+
+
+def invalidate(keys):
+    """Supprime les grilles des propriétaires [(owner_type, owner_id)], toutes sessions confondues."""
+    keys = set(keys)
+    if not keys:
+        return
+    pending = getattr(_deferred, 'keys', None)
+    if pending is not None:
+        pending.update(keys)
+        return
+    condition = Q()
+    for owner_type, owner_id in keys:
+        condition |= Q(owner_type=owner_type, owner_id=owner_id)
+    TimetableGrid.objects.filter(condition).delete()
+
+
+@contextmanager
+def deferred():
+    """Regroupe les invalidations du bloc en une seule requête, à sa sortie."""
+    if getattr(_deferred, 'keys', None) is not None:
+        yield
+        return
+    _deferred.keys = set()
+    try:
+        yield
+    finally:
+        keys, _deferred.keys = _deferred.keys, None
+    invalidate(keys)
+
+
+def build(owner_type, owner_id, session_type=''):
+    """Calcule le contenu d'une grille depuis Calendrier."""
+    events = Calendrier.objects.filter(**{f'{owner_type}_id': owner_id}).select_related('course', 'teacher', 'auditoire')
+    if session_type:
+        events = events.filter(session_type=session_type)
+    by_day = {day: [] for day in DAY_ORDER}
+    for event in events.order_by('start_time', 'end_time', 'id'):
+        if event.day in by_day:
+            by_day[event.day].append({
+                "id": event.id,
+                "startTime": event.start_time.strftime('%H:%M'),
+                "endTime": event.end_time.strftime('%H:%M'),
+                "courseName": event.course.name if event.course else "N/A",
+                "teacherName": event.teacher.get_full_name() if event.teacher else "N/A",
+                "auditoireName": event.auditoire.name if event.auditoire else "N/A",
+                "session_type": event.session_type,
+            })
+    return [{"day": day, "events": by_day[day]} for day in DAY_ORDER if by_day[day]]
+
+
+def _etag(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def get_grid(owner_type, owner_id, session_type=''):
+    """La grille enregistrée, ou reconstruite puis enregistrée si un créneau a changé depuis."""
+    grid = TimetableGrid.objects.filter(owner_type=owner_type, owner_id=owner_id, session_type=session_type).first()
+    if grid is not None:
+        return grid
+    with transaction.atomic():
+        data = build(owner_type, owner_id, session_type)
+        grid, _ = TimetableGrid.objects.update_or_create(
+            owner_type=owner_type, owner_id=owner_id, session_type=session_type,
+            defaults={"data": data, "etag": _etag(data)},
+        )
+    return grid
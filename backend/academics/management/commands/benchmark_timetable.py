@@ -0,0 +1,37 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from academics.scheduler import CourseLoad, solve
+
+class Command(BaseCommand):
+    help = "Mesure le temps de génération d'horaire sur des départements fictifs de taille croissante (sans base de données)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[5, 10, 20, 40, 80], help="Nombres d'auditoires.")
+        parser.add_argument('--courses', type=int, default=8, help="Cours par auditoire.")
+        parser.add_argument('--courses-per-teacher', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def department(self, auditoires, options):
+        rng = random.Random(options['seed'])
+        total = auditoires * options['courses']
+        teachers = max(total // options['courses_per_teacher'], 1)
+        return [
+            CourseLoad(i, i // options['courses'], rng.randrange(teachers), rng.randint(2, 6) * 60)
+            for i in range(total)
+        ]
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'auditoires':>10} {'cours':>7} {'blocs':>7} {'non placés':>11} {'temps (ms)':>11}")
+        for size in options['sizes']:
+            courses = self.department(size, options)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                placements, unplaced = solve(courses)
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(
+                f"{size:>10} {len(courses):>7} {len(placements):>7} {len(unplaced):>11} {min(timings) * 1000:>11.1f}"
+            )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Departement
+from academics.scheduler import generate
+
+class Command(BaseCommand):
+    help = "Génère l'horaire de tous les auditoires d'un département (les créneaux verrouillés sont conservés)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('departement', type=int)
+        parser.add_argument('--session-type', default='session')
+        parser.add_argument('--dry-run', action='store_true', help="Calculer l'horaire sans l'enregistrer.")
+
+    def handle(self, *args, **options):
+        departement = Departement.objects.filter(id=options['departement']).first()
+        if not departement:
+            raise CommandError(f"Département {options['departement']} introuvable.")
+        slots, unplaced = generate(departement, options['session_type'], commit=not options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(f'{len(slots)} créneau(x) générés pour {departement.name}.'))
+        for course_id, minutes in unplaced:
+            self.stdout.write(self.style.WARNING(f'Cours {course_id}: {minutes} minute(s) non placées.'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_remove_calendrier_description_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendrier',
+            index=models.Index(fields=['auditoire', 'session_type', 'day'], name='calendrier_aud_session_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['auditoire', 'session_type'], name='course_auditoire_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursemessage',
+            index=models.Index(fields=['course', 'created_at'], name='coursemessage_course_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paiement',
+            index=models.Index(fields=['student', 'tranche_number'], name='paiement_student_tranche_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_hot_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendrier',
+            index=models.Index(fields=['teacher', 'session_type', 'day'], name='calendrier_tch_session_day_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0009_calendrier_teacher_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calendrier',
+            name='locked',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0010_calendrier_locked'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimetableGrid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner_type', models.CharField(choices=[('auditoire', 'Auditoire'), ('teacher', 'Enseignant')], max_length=20)),
+                ('owner_id', models.PositiveBigIntegerField()),
+                ('session_type', models.CharField(blank=True, max_length=20)),
+                ('data', models.JSONField(default=list)),
+                ('etag', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('owner_type', 'owner_id', 'session_type')},
+            },
+        ),
+    ]
@@ -44,6 +44,17 @@ class Auditoire(models.Model):
             pass
         super().save(*args, **kwargs)
 
+class CourseQuerySet(models.QuerySet):
+    def with_instructor(self):
+        """Précharge l'enseignant assigné à chaque cours (une seule requête supplémentaire)."""
+        return self.prefetch_related(
+            models.Prefetch(
+                'assignments_by_assistant',
+                queryset=CourseAssignment.objects.select_related('assistant').order_by('id'),
+                to_attr='prefetched_assignments',
+            )
+        )
+
 class Course(models.Model):
     SESSION_CHOICES = (
         ('mi-session', 'Mi-Session'),
@@ -55,9 +66,26 @@ class Course(models.Model):
     credits = models.PositiveSmallIntegerField(default=3)
     session_type = models.CharField(max_length=20, choices=SESSION_CHOICES, default='session')
 
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['auditoire', 'session_type'], name='course_auditoire_session_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.get_session_type_display()}) - ({self.auditoire.name} - {self.auditoire.departement.name})"
 
+    @property
+    def instructor(self):
+        """Enseignant assigné au cours, lu depuis le préchargement de with_instructor() si disponible."""
+        assignments = getattr(self, 'prefetched_assignments', None)
+        if assignments is None:
+            assignment = self.assignments_by_assistant.select_related('assistant').order_by('id').first()
+        else:
+            assignment = assignments[0] if assignments else None
+        return assignment.assistant if assignment else None
+
     def save(self, *args, **kwargs):
         if not self.code:
             self.code = str(uuid.uuid4())[:8].upper()
@@ -109,10 +137,36 @@ class Calendrier(models.Model):
     course = models.ForeignKey(Course, on_delete=models.SET_NULL, related_name='calendar_events', null=True, blank=True)
     teacher = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='calendar_events', null=True, blank=True, limit_choices_to={'role__in': ['assistant', 'professeur']})
     session_type = models.CharField(max_length=20, choices=Course.SESSION_CHOICES, default='session')
+    locked = models.BooleanField(default=True) # False pour les créneaux produits par le générateur d'horaire, tant qu'ils ne sont pas retouchés
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['auditoire', 'session_type', 'day'], name='calendrier_aud_session_day_idx'),
+            models.Index(fields=['teacher', 'session_type', 'day'], name='calendrier_tch_session_day_idx'),
+        ]
 
     def __str__(self):
         return f"{self.day} {self.start_time}-{self.end_time}: {self.course.name if self.course else 'Libre'}"
 
+class TimetableGrid(models.Model):
+    """Horaire hebdomadaire d'un auditoire ou d'un enseignant, déjà groupé par jour (voir academics.grids)."""
+    OWNER_CHOICES = (
+        ('auditoire', 'Auditoire'),
+        ('teacher', 'Enseignant'),
+    )
+    owner_type = models.CharField(max_length=20, choices=OWNER_CHOICES)
+    owner_id = models.PositiveBigIntegerField()
+    session_type = models.CharField(max_length=20, blank=True) # Vide: toutes les sessions
+    data = models.JSONField(default=list)
+    etag = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('owner_type', 'owner_id', 'session_type')
+
+    def __str__(self):
+        return f"Horaire {self.owner_type} {self.owner_id} ({self.session_type or 'toutes sessions'})"
+
 class CourseAssignment(models.Model):
     assistant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_assignments', limit_choices_to={'role__in': ['assistant', 'professeur']})
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='assignments_by_assistant')
@@ -135,6 +189,9 @@ class CourseMessage(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['course', 'created_at'], name='coursemessage_course_date_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.course.name}] {self.title}"
@@ -146,5 +203,10 @@ class Paiement(models.Model):
     date_paid = models.DateTimeField(auto_now_add=True)
     academic_year = models.CharField(max_length=9)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'tranche_number'], name='paiement_student_tranche_idx'),
+        ]
+
     def __str__(self):
         return f"Payment of {self.amount} by {self.student} for tranche {self.tranche_number}"
@@ -0,0 +1,174 @@
+"""
+Génération automatique de l'horaire d'un département.
+
+Chaque cours doit occuper autant d'heures par semaine que de crédits, découpées en blocs
+d'au plus TIMETABLE_MAX_BLOCK_MINUTES. Les blocs sont placés un à un, les plus contraints
+d'abord (enseignants les plus chargés, blocs les plus longs), sur les jours de
+Calendrier.DAY_CHOICES: on préfère un jour où le cours n'a pas encore lieu et où
+l'auditoire est le moins chargé, puis l'heure la plus matinale. L'occupation de chaque
+enseignant et de chaque auditoire, par jour, est un masque de bits (un bit par pas de
+TIMETABLE_STEP_MINUTES): tester un créneau est un simple ET binaire.
+
+Les créneaux verrouillés (saisis à la main, locked=True) sont conservés et occupent leur
+enseignant et leur auditoire; les heures qu'ils donnent déjà à un cours sont déduites.
+Les créneaux générés lors d'un passage précédent (locked=False) sont remplacés.
+"""
+from collections import defaultdict, namedtuple
+from datetime import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import grids
+from .models import Calendrier, Course, CourseAssignment
+
+CourseLoad = namedtuple('CourseLoad', 'course_id auditoire_id teacher_id minutes')
+Placement = namedtuple('Placement', 'course_id auditoire_id teacher_id day start end')
+
+
+def default_options():
+    return {
+        "days": [day for day, _ in Calendrier.DAY_CHOICES],
+        "day_start": getattr(settings, 'TIMETABLE_DAY_START', 8 * 60),
+        "day_end": getattr(settings, 'TIMETABLE_DAY_END', 18 * 60),
+        "step": getattr(settings, 'TIMETABLE_STEP_MINUTES', 30),
+        "max_block": getattr(settings, 'TIMETABLE_MAX_BLOCK_MINUTES', 120),
+    }
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def _blocks(minutes, max_block, step):
+    """Découpe la charge d'un cours en blocs d'au plus max_block, arrondis au pas."""
+    minutes = -(-minutes // step) * step
+    blocks = []
+    while minutes > 0:
+        blocks.append(min(minutes, max_block))
+        minutes -= blocks[-1]
+    return blocks
+
+
+def solve(courses, busy=(), days=None, day_start=None, day_end=None, step=None, max_block=None):
+    """
+    Place les cours [CourseLoad] en évitant les occupations busy [(type, id, jour, début, fin)]
+    ('teacher' ou 'auditoire', heures en minutes depuis minuit).
+    Retourne (placements [Placement], non placés [(course_id, minutes)]).
+    """
+    options = default_options()
+    days = days or options["days"]
+    day_start = options["day_start"] if day_start is None else day_start
+    day_end = options["day_end"] if day_end is None else day_end
+    step = step or options["step"]
+    max_block = max_block or options["max_block"]
+    positions = (day_end - day_start) // step
+
+    occupied = defaultdict(int)
+    for kind, object_id, day, start, end in busy:
+        first = max((start - day_start) // step, 0)
+        last = min(-(-(end - day_start) // step), positions)
+        if last > first:
+            occupied[(kind, object_id, day)] |= ((1 << (last - first)) - 1) << first
+
+    teacher_load = defaultdict(int)
+    for course in courses:
+        if course.teacher_id is not None:
+            teacher_load[course.teacher_id] += course.minutes
+    blocks = sorted(
+        ((course, length) for course in courses for length in _blocks(course.minutes, max_block, step)),
+        key=lambda item: (-teacher_load.get(item[0].teacher_id, 0), -item[1], item[0].course_id),
+    )
+
+    auditoire_load = defaultdict(int)
+    course_days = defaultdict(int)
+    placements, unplaced = [], defaultdict(int)
+    for course, length in blocks:
+        width = length // step
+        block = (1 << width) - 1
+        order = sorted(
+            range(len(days)),
+            key=lambda i: (course_days[(course.course_id, days[i])], auditoire_load[(course.auditoire_id, days[i])], i),
+        )
+        for i in order:
+            day = days[i]
+            taken = occupied[('auditoire', course.auditoire_id, day)]
+            if course.teacher_id is not None:
+                taken |= occupied[('teacher', course.teacher_id, day)]
+            position = next((p for p in range(positions - width + 1) if not taken & (block << p)), None)
+            if position is None:
+                continue
+            mask = block << position
+            occupied[('auditoire', course.auditoire_id, day)] |= mask
+            if course.teacher_id is not None:
+                occupied[('teacher', course.teacher_id, day)] |= mask
+            auditoire_load[(course.auditoire_id, day)] += length
+            course_days[(course.course_id, day)] += 1
+            start = day_start + position * step
+            placements.append(Placement(course.course_id, course.auditoire_id, course.teacher_id, day, start, start + length))
+            break
+        else:
+            unplaced[course.course_id] += length
+    return placements, sorted(unplaced.items())
+
+
+def _time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def generate(departement, session_type='session', commit=True):
+    """
+    Génère l'horaire des auditoires du département pour la session donnée.
+
+    Retourne (créneaux Calendrier, non placés [(course_id, minutes)]); avec commit=False, les
+    créneaux ne sont pas enregistrés.
+    """
+    courses = list(
+        Course.objects.filter(auditoire__departement=departement, session_type=session_type)
+        .values_list('id', 'auditoire_id', 'credits')
+    )
+    teachers = dict(
+        CourseAssignment.objects.filter(course_id__in=[course_id for course_id, _, _ in courses])
+        .values_list('course_id', 'assistant_id')
+    )
+    auditoire_ids = {auditoire_id for _, auditoire_id, _ in courses}
+
+    with transaction.atomic():
+        # Tout ce qui occupe déjà ces auditoires et ces enseignants, sauf ce qui va être régénéré
+        existing = Calendrier.objects.filter(
+            Q(auditoire_id__in=auditoire_ids) | Q(teacher_id__in=set(teachers.values())),
+            session_type=session_type,
+        ).exclude(locked=False, auditoire__departement=departement).values_list(
+            'auditoire_id', 'teacher_id', 'course_id', 'day', 'start_time', 'end_time',
+        )
+        busy, scheduled = [], defaultdict(int)
+        for auditoire_id, teacher_id, course_id, day, start_time, end_time in existing:
+            start, end = _minutes(start_time), _minutes(end_time)
+            if auditoire_id is not None:
+                busy.append(('auditoire', auditoire_id, day, start, end))
+            if teacher_id is not None:
+                busy.append(('teacher', teacher_id, day, start, end))
+            if course_id is not None:
+                scheduled[course_id] += end - start
+
+        loads = [
+            CourseLoad(course_id, auditoire_id, teachers.get(course_id), credits * 60 - scheduled[course_id])
+            for course_id, auditoire_id, credits in courses
+            if credits * 60 > scheduled[course_id]
+        ]
+        placements, unplaced = solve(loads, busy)
+        slots = [
+            Calendrier(
+                day=p.day, start_time=_time(p.start), end_time=_time(p.end), auditoire_id=p.auditoire_id,
+                course_id=p.course_id, teacher_id=p.teacher_id, session_type=session_type, locked=False,
+            )
+            for p in placements
+        ]
+        if commit:
+            with grids.deferred():
+                Calendrier.objects.filter(locked=False, session_type=session_type, auditoire__departement=departement).delete()
+                Calendrier.objects.bulk_create(slots, batch_size=500)
+                # bulk_create n'envoie pas post_save: les grilles des nouveaux créneaux sont invalidées ici
+                grids.invalidate(key for slot in slots for key in grids.owners(slot.auditoire_id, slot.teacher_id))
+    return slots, unplaced
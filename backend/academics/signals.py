@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .grids import invalidate, owners
+from .models import Calendrier, Course
+
+User = get_user_model()
+
+NAME_FIELDS = {'first_name', 'post_name', 'last_name'}
+
+
+@receiver(pre_save, sender=Calendrier)
+def calendrier_saving(sender, instance, **kwargs):
+    # Un créneau déplacé vers un autre auditoire ou enseignant quitte aussi les anciennes grilles
+    instance._grid_owners = set()
+    if instance.pk:
+        old = Calendrier.objects.filter(pk=instance.pk).values_list('auditoire_id', 'teacher_id').first()
+        if old:
+            instance._grid_owners = owners(*old)
+
+
+@receiver(post_save, sender=Calendrier)
+@receiver(post_delete, sender=Calendrier)
+def calendrier_changed(sender, instance, **kwargs):
+    invalidate(owners(instance.auditoire_id, instance.teacher_id) | getattr(instance, '_grid_owners', set()))
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    if not created:
+        invalidate(
+            key for auditoire_id, teacher_id in instance.calendar_events.values_list('auditoire_id', 'teacher_id')
+            for key in owners(auditoire_id, teacher_id)
+        )
+
+
+@receiver(post_save, sender=User)
+def teacher_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or instance.role not in ('assistant', 'professeur'):
+        return
+    if update_fields is not None and not NAME_FIELDS & set(update_fields):
+        return
+    invalidate(
+        key for (auditoire_id,) in instance.calendar_events.values_list('auditoire_id')
+        for key in owners(auditoire_id, instance.id)
+    )
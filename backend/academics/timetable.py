@@ -0,0 +1,80 @@
+"""
+Détection des conflits d'horaire (enseignant ou auditoire occupé deux fois au même moment).
+
+Les créneaux sont regroupés par clé (session, jour, 'teacher' | 'auditoire', id). check_slot
+vérifie un nouveau créneau par un filtre de chevauchement en SQL (début avant sa fin, fin
+après son début), guidé par les index (enseignant | auditoire, session, jour): il ne suppose
+pas l'horaire enregistré exempt de chevauchements. find_conflicts balaie un horaire complet,
+trié une fois, et rapporte toutes les paires de créneaux qui se chevauchent.
+"""
+import heapq
+from collections import namedtuple
+from itertools import groupby
+
+from django.db.models import Q
+
+from .models import Calendrier
+
+Slot = namedtuple('Slot', 'id day start end session_type auditoire_id teacher_id')
+
+SLOT_FIELDS = ('id', 'day', 'start_time', 'end_time', 'session_type', 'auditoire_id', 'teacher_id')
+
+
+def slot_keys(slot):
+    """Clés d'occupation d'un créneau: son enseignant et son auditoire, s'ils sont renseignés."""
+    if slot.teacher_id is not None:
+        yield (slot.session_type, slot.day, 'teacher', slot.teacher_id)
+    if slot.auditoire_id is not None:
+        yield (slot.session_type, slot.day, 'auditoire', slot.auditoire_id)
+
+
+def as_slot(calendrier):
+    return Slot(calendrier.id, calendrier.day, calendrier.start_time, calendrier.end_time,
+                calendrier.session_type, calendrier.auditoire_id, calendrier.teacher_id)
+
+
+def check_slot(slot):
+    """Conflits [(type, id)] d'un créneau à créer (id None) ou à modifier contre l'horaire enregistré."""
+    occupants = Q()
+    if slot.teacher_id is not None:
+        occupants |= Q(teacher_id=slot.teacher_id)
+    if slot.auditoire_id is not None:
+        occupants |= Q(auditoire_id=slot.auditoire_id)
+    if not occupants:
+        return []
+    rows = list(
+        Calendrier.objects
+        .filter(occupants, day=slot.day, session_type=slot.session_type, start_time__lt=slot.end, end_time__gt=slot.start)
+        .exclude(id=slot.id)
+        .order_by('start_time', 'id')
+        .values_list('id', 'teacher_id', 'auditoire_id')
+    )
+    conflicts = []
+    if slot.teacher_id is not None:
+        conflicts += [('teacher', other) for other, teacher_id, _ in rows if teacher_id == slot.teacher_id]
+    if slot.auditoire_id is not None:
+        conflicts += [('auditoire', other) for other, _, auditoire_id in rows if auditoire_id == slot.auditoire_id]
+    return conflicts
+
+
+def find_conflicts(slots):
+    """
+    Toutes les paires en conflit d'un horaire: [(type, id, id)], chaque paire une seule fois.
+
+    Balayage par clé: les créneaux triés par début, un tas des créneaux encore en cours
+    (par heure de fin) donne directement ceux que chevauche le créneau suivant.
+    """
+    keyed = sorted(
+        (key, slot.start, slot.end, slot.id)
+        for slot in slots
+        for key in slot_keys(slot)
+    )
+    conflicts = []
+    for key, group in groupby(keyed, key=lambda entry: entry[0]):
+        running = []
+        for _, start, end, slot_id in group:
+            while running and running[0][0] <= start:
+                heapq.heappop(running)
+            conflicts.extend((key[2], other_id, slot_id) for _, other_id in sorted(running, key=lambda r: r[1]))
+            heapq.heappush(running, (end, slot_id))
+    return conflicts
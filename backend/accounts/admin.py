@@ -1,6 +1,6 @@
 from django.contrib import admin, messages
 from .models import User
-import uuid
+from .matricules import next_matricule
 import random
 import string
 
@@ -53,10 +53,7 @@ class CustomUserAdmin(admin.ModelAdmin):
     # Surcharger la méthode save_model pour la génération automatique
     def save_model(self, request, obj, form, change):
         if not change: # Création
-            random_hex = uuid.uuid4().hex.upper()
-            part1 = random_hex[:4]
-            part2 = random_hex[4:8]
-            obj.matricule = f"MAT-{part1}-{part2}"
+            obj.matricule = next_matricule()
             
             password = ''.join(random.choices(string.ascii_letters + string.digits, k=12))
             obj.set_password(password)
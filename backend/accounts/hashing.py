@@ -0,0 +1,28 @@
+"""
+Hachage des mots de passe hors du processus web.
+
+Ce module n'importe aucun modèle: il est rechargé tel quel par les processus du pool
+(méthode « spawn ») sans qu'il faille y initialiser Django.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+
+def _encode(args):
+    hasher, password = args
+    return hasher.encode(password, hasher.salt())
+
+
+def hash_passwords(hasher, passwords, executor=None):
+    """Hache passwords avec hasher, dans executor s'il est fourni, sinon dans le processus courant."""
+    jobs = [(hasher, password) for password in passwords]
+    if executor is None:
+        return [_encode(job) for job in jobs]
+    return list(executor.map(_encode, jobs, chunksize=max(1, len(jobs) // 32)))
+
+
+def password_pool(workers):
+    """Pool de processus pour hash_passwords, ou None si workers vaut 0."""
+    if workers == 0:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
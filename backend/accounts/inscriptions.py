@@ -0,0 +1,294 @@
+"""
+Inscription en masse des étudiants.
+
+Le fichier (CSV ou XLSX) est conservé sur le job puis traité en arrière-plan par lots de
+INSCRIPTION_BATCH_SIZE lignes. Chaque lot est validé en une requête (emails déjà pris),
+voit ses mots de passe hachés dans un pool de processus, puis reçoit un bloc de matricules
+(accounts.matricules) et est inséré par bulk_create dans la même transaction que
+l'avancement du job. Un job interrompu reprend ainsi exactement au premier lot non enregistré.
+
+Les mots de passe générés ne sont jamais exposés par le suivi du job: ils attendent dans
+InscriptionJob.results d'être remis une seule fois par take_credentials, qui les efface.
+Ils n'y restent pas plus de INSCRIPTION_CREDENTIALS_TTL_MINUTES après le dernier lot
+(purge_expired_credentials, commande purge_inscription_credentials) et sont effacés si le
+job échoue: les comptes concernés passent alors par la réinitialisation du mot de passe.
+
+Colonnes (en-tête obligatoire): email, first_name, last_name, et auditoire_id ou auditoire
+(nom) sauf si un auditoire par défaut est donné au job; optionnelles: post_name, sexe, phone, address.
+"""
+import csv
+import io
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher
+from django.db import transaction, connection
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from academics.models import Auditoire
+from api.dashboard_cache import invalidate_model
+from .hashing import hash_passwords, password_pool
+from .matricules import allocate_matricules
+from .models import InscriptionJob
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+REQUIRED_COLUMNS = ('email', 'first_name', 'last_name')
+OPTIONAL_COLUMNS = ('post_name', 'sexe', 'phone', 'address', 'auditoire_id', 'auditoire')
+SEXES = {code for code, _ in User.SEXE_CHOICES}
+
+
+class InscriptionError(ValueError):
+    pass
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _normalize(header, rows):
+    columns = [_clean(h).lower() for h in header]
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise InscriptionError(f"Colonnes manquantes: {', '.join(missing)}")
+    return [
+        {col: _clean(value) for col, value in zip(columns, row) if col in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+        for row in rows
+        if any(_clean(value) for value in row)
+    ]
+
+
+def read_csv(content):
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    sample = content[:2048]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(io.StringIO(content), dialect)
+    header = next(reader, None)
+    if not header:
+        raise InscriptionError("Le fichier est vide.")
+    return _normalize(header, reader)
+
+
+def read_xlsx(content):
+    try:
+        import openpyxl
+    except ImportError:
+        raise InscriptionError("La lecture des fichiers XLSX nécessite le paquet openpyxl.")
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise InscriptionError("Le fichier est vide.")
+        return _normalize(header, list(rows))
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    """Lit toutes les lignes du fichier d'inscription (liste de dictionnaires colonne -> texte)."""
+    content = file.read()
+    if filename.lower().endswith('.xlsx'):
+        return read_xlsx(content)
+    return read_csv(content)
+
+
+def _resolve_auditoires(rows):
+    """Associe chaque valeur d'auditoire du fichier (id ou nom) à son id, en deux requêtes."""
+    ids = {int(r['auditoire_id']) for r in rows if r.get('auditoire_id', '').isdigit()}
+    names = {r['auditoire'] for r in rows if r.get('auditoire') and not r.get('auditoire_id')}
+    known_ids = set(Auditoire.objects.filter(id__in=ids).values_list('id', flat=True))
+    by_name = {}
+    for auditoire_id, name in Auditoire.objects.filter(name__in=names).values_list('id', 'name'):
+        # Un nom porté par plusieurs auditoires est ambigu: la ligne devra donner auditoire_id
+        by_name[name] = None if name in by_name else auditoire_id
+    return known_ids, by_name
+
+
+def _validate_batch(job, rows, first_row, auditoires):
+    known_ids, by_name = auditoires
+    emails = {r['email'].lower() for r in rows if r.get('email')}
+    taken = {e.lower() for e in User.objects.filter(email__in=emails).values_list('email', flat=True)}
+
+    valid, errors, seen = [], [], set()
+    for offset, row in enumerate(rows):
+        number = first_row + offset
+        email = row.get('email', '').lower()
+        if not all(row.get(col) for col in REQUIRED_COLUMNS):
+            errors.append({"row": number, "error": "Email, Prénom et Nom sont requis."})
+            continue
+        if email in taken or email in seen:
+            errors.append({"row": number, "error": f"Un utilisateur avec l'email {email} existe déjà."})
+            continue
+        if row.get('auditoire_id'):
+            auditoire_id = int(row['auditoire_id']) if row['auditoire_id'].isdigit() else None
+            if auditoire_id not in known_ids:
+                auditoire_id = None
+        elif row.get('auditoire'):
+            auditoire_id = by_name.get(row['auditoire'])
+        else:
+            auditoire_id = job.default_auditoire_id
+        if auditoire_id is None:
+            errors.append({"row": number, "error": "Auditoire non trouvé ou ambigu."})
+            continue
+        seen.add(email)
+        valid.append((row, email, auditoire_id))
+    return valid, errors
+
+
+def _process_batch(job, rows, first_row, auditoires, hasher, executor):
+    valid, errors = _validate_batch(job, rows, first_row, auditoires)
+    passwords = [get_random_string(10) for _ in valid]
+    hashed = hash_passwords(hasher, passwords, executor)
+
+    with transaction.atomic():
+        # Les numéros réservés par un lot annulé ne sont pas perdus: la réservation est annulée avec lui
+        matricules = allocate_matricules(len(valid))
+        users = [
+            User(
+                matricule=matricule,
+                password=password_hash,
+                email=email,
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                post_name=row.get('post_name', ''),
+                sexe=row.get('sexe', '').upper() if row.get('sexe', '').upper() in SEXES else 'M',
+                phone=row.get('phone') or None,
+                address=row.get('address') or None,
+                current_auditoire_id=auditoire_id,
+                role='etudiant',
+                status='pending',
+            )
+            for (row, email, auditoire_id), matricule, password_hash in zip(valid, matricules, hashed)
+        ]
+        User.objects.bulk_create(users)
+        # bulk_create n'envoie pas post_save: les tableaux de bord dépendant de User sont invalidés ici
+        transaction.on_commit(lambda: invalidate_model(User))
+        job.processed_rows += len(rows)
+        job.created_count += len(users)
+        job.errors += errors
+        # Relu sous verrou: take_credentials a pu remettre et effacer les identifiants des lots précédents
+        pending = InscriptionJob.objects.select_for_update().values_list('results', flat=True).get(id=job.id)
+        job.results = pending + [
+            {"matricule": user.matricule, "email": user.email, "full_name": user.get_full_name(), "password": password}
+            for user, password in zip(users, passwords)
+        ]
+        job.credentials_expire_at = timezone.now() + credentials_ttl()
+        job.save(update_fields=['processed_rows', 'created_count', 'errors', 'results', 'credentials_expire_at', 'updated_at'])
+
+
+def claim_job(job_id, force=False):
+    """Passe le job à 'running' s'il n'est pas déjà traité ailleurs. Retourne True si le job est réservé."""
+    statuses = ['pending', 'failed', 'running'] if force else ['pending', 'failed']
+    return InscriptionJob.objects.filter(id=job_id, status__in=statuses).update(
+        status='running', updated_at=timezone.now()
+    ) == 1
+
+
+def run_job(job_id):
+    """Traite un job réservé par claim_job, à partir de son point de reprise."""
+    job = InscriptionJob.objects.select_related('default_auditoire').get(id=job_id)
+    batch_size = getattr(settings, 'INSCRIPTION_BATCH_SIZE', 500)
+    executor = None
+    try:
+        with job.file.open('rb') as f:
+            rows = read_rows(f, job.file.name)
+        if job.total_rows != len(rows):
+            job.total_rows = len(rows)
+            job.save(update_fields=['total_rows', 'updated_at'])
+
+        auditoires = _resolve_auditoires(rows)
+        hasher = get_hasher()
+        executor = password_pool(getattr(settings, 'INSCRIPTION_HASH_WORKERS', None))
+        for start in range(job.processed_rows, len(rows), batch_size):
+            # Numéros de ligne du fichier: l'en-tête occupe la ligne 1
+            _process_batch(job, rows[start:start + batch_size], start + 2, auditoires, hasher, executor)
+    except Exception as e:
+        logger.exception("Inscription #%s interrompue", job_id)
+        job.status = 'failed'
+        job.errors = job.errors + [{"row": None, "error": str(e)}]
+        # Les mots de passe en clair ne survivent pas à un job échoué
+        job.results, job.credentials_expire_at = [], None
+        job.save(update_fields=['status', 'errors', 'results', 'credentials_expire_at', 'updated_at'])
+        return job
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return job
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def start_job(job_id, force=False):
+    """Réserve le job et le lance dans un thread d'arrière-plan après la validation de la transaction."""
+    if not claim_job(job_id, force=force):
+        return False
+    transaction.on_commit(
+        lambda: threading.Thread(target=_run_in_thread, args=(job_id,), name=f"inscription-{job_id}", daemon=True).start()
+    )
+    return True
+
+
+def credentials_ttl():
+    return timedelta(minutes=getattr(settings, 'INSCRIPTION_CREDENTIALS_TTL_MINUTES', 60))
+
+
+def credentials_expired(job, now=None):
+    return job.credentials_expire_at is not None and job.credentials_expire_at <= (now or timezone.now())
+
+
+def take_credentials(job_id):
+    """Identifiants générés et pas encore remis; ils sont effacés du job: chacun n'est remis qu'une fois."""
+    with transaction.atomic():
+        job = InscriptionJob.objects.select_for_update().get(id=job_id)
+        credentials = [] if credentials_expired(job) else job.results
+        if job.results:
+            job.results, job.credentials_expire_at = [], None
+            job.save(update_fields=['results', 'credentials_expire_at', 'updated_at'])
+    return credentials
+
+
+def purge_expired_credentials(now=None):
+    """Efface les identifiants non téléchargés à temps. Retourne le nombre de jobs purgés."""
+    return InscriptionJob.objects.filter(credentials_expire_at__lte=now or timezone.now()).update(
+        results=[], credentials_expire_at=None, updated_at=timezone.now(),
+    )
+
+
+def job_status(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "total_rows": job.total_rows,
+        "processed_rows": job.processed_rows,
+        "created_count": job.created_count,
+        "progress": job.progress,
+        "errors": job.errors,
+        # Nombre d'identifiants à télécharger (une seule fois) via take_credentials
+        "pending_credentials": 0 if credentials_expired(job) else len(job.results),
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
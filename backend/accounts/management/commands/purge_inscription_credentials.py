@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from accounts.inscriptions import purge_expired_credentials
+
+class Command(BaseCommand):
+    help = "Efface les mots de passe générés par les inscriptions en masse et non téléchargés à temps (à planifier, ex.: toutes les heures)."
+
+    def handle(self, *args, **options):
+        purged = purge_expired_credentials()
+        self.stdout.write(self.style.SUCCESS(f'{purged} inscription(s) purgée(s).'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounts.inscriptions import claim_job, run_job
+from accounts.models import InscriptionJob
+
+class Command(BaseCommand):
+    help = "Traite (ou reprend là où il s'est arrêté) un job d'inscription en masse dans le processus courant."
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', type=int)
+        parser.add_argument('--force', action='store_true', help="Reprendre un job resté 'en cours' après l'arrêt du serveur.")
+
+    def handle(self, *args, **options):
+        job_id = options['job_id']
+        if not InscriptionJob.objects.filter(id=job_id).exists():
+            raise CommandError(f'Inscription {job_id} introuvable.')
+        if not claim_job(job_id, force=options['force']):
+            raise CommandError(f'Inscription {job_id} déjà terminée ou en cours (utiliser --force après un arrêt du serveur).')
+        job = run_job(job_id)
+        message = f'Inscription {job.id}: {job.created_count} étudiant(s) créé(s), {len(job.errors)} erreur(s), statut {job.status}.'
+        if job.status == 'done':
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            raise CommandError(message)
@@ -0,0 +1,42 @@
+"""
+Attribution des matricules.
+
+Chaque année a sa ligne dans MatriculeSequence; un appel réserve un bloc de numéros
+consécutifs en verrouillant cette seule ligne, si bien que des inscriptions concurrentes
+ou en masse n'ont jamais à vérifier l'unicité dans la table des utilisateurs.
+
+Format: MAT-{année}-{numéro sur 5 chiffres au moins}. Les anciens matricules aléatoires
+(MAT-{année}-{4 caractères hexadécimaux}) ne peuvent pas entrer en collision avec ce format.
+"""
+import datetime
+
+from django.db import transaction
+
+from .models import MatriculeSequence
+
+
+def format_matricule(year, number):
+    return f"MAT-{year}-{number:05d}"
+
+
+def reserve_block(count, year=None):
+    """Réserve count numéros consécutifs pour year. Retourne (année, premier numéro)."""
+    year = year or datetime.date.today().year
+    with transaction.atomic():
+        sequence, _ = MatriculeSequence.objects.select_for_update().get_or_create(year=year)
+        first = sequence.last_value + 1
+        sequence.last_value += count
+        sequence.save(update_fields=['last_value'])
+    return year, first
+
+
+def allocate_matricules(count, year=None):
+    """Retourne count matricules nouveaux et uniques."""
+    if count <= 0:
+        return []
+    year, first = reserve_block(count, year)
+    return [format_matricule(year, number) for number in range(first, first + count)]
+
+
+def next_matricule(year=None):
+    return allocate_matricules(1, year)[0]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_hot_lookup_indexes'),
+        ('accounts', '0006_user_date_joined'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['current_auditoire', 'role'], name='user_auditoire_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'status'], name='user_role_status_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_inscriptionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatriculeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(unique=True)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+def purge_credentials(apps, schema_editor):
+    """Les identifiants déjà en attente n'ont pas de date d'expiration: ils sont effacés."""
+    InscriptionJob = apps.get_model('accounts', 'InscriptionJob')
+    InscriptionJob.objects.exclude(results=[]).update(results=[])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_matriculesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inscriptionjob',
+            name='credentials_expire_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(purge_credentials, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,6 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from academics.models import Auditoire, Section, Departement
-import uuid
-import datetime
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, matricule, password=None, **extra_fields):
@@ -90,6 +88,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'matricule'
     REQUIRED_FIELDS = ['first_name', 'last_name', 'email']
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['current_auditoire', 'role'], name='user_auditoire_role_idx'),
+            models.Index(fields=['role', 'status'], name='user_role_status_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.matricule})"
 
@@ -101,7 +105,49 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def save(self, *args, **kwargs):
         if not self.matricule:
-            year = datetime.date.today().year
-            random_part = str(uuid.uuid4().hex)[:4].upper()
-            self.matricule = f"MAT-{year}-{random_part}"
+            from .matricules import next_matricule
+            self.matricule = next_matricule()
         super().save(*args, **kwargs)
+
+
+class InscriptionJob(models.Model):
+    """Inscription en masse d'étudiants depuis un fichier CSV/XLSX, traitée en arrière-plan par lots."""
+    STATUS_CHOICES = (
+        ('pending', 'En attente'),
+        ('running', 'En cours'),
+        ('done', 'Terminé'),
+        ('failed', 'Échoué'),
+    )
+
+    created_by = models.ForeignKey('accounts.User', on_delete=models.SET_NULL, null=True, related_name='inscription_jobs')
+    file = models.FileField(upload_to='inscriptions/')
+    default_auditoire = models.ForeignKey(Auditoire, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0) # Point de reprise: lignes déjà traitées
+    created_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True) # [{"row": n, "error": "..."}]
+    results = models.JSONField(default=list, blank=True) # Identifiants générés, effacés dès leur téléchargement
+    credentials_expire_at = models.DateTimeField(null=True, blank=True) # Au-delà, results est purgé sans être remis
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Inscription #{self.id} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        return round(100 * self.processed_rows / self.total_rows, 1) if self.total_rows else 0.0
+
+
+class MatriculeSequence(models.Model):
+    """Dernier numéro de matricule attribué pour une année (voir accounts.matricules)."""
+    year = models.PositiveIntegerField(unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_value}"
@@ -0,0 +1,76 @@
+"""
+Cache des tableaux de bord par rôle.
+
+Chaque tableau de bord est mis en cache sous une clé qui combine son nom, sa portée
+(utilisateur, section, département...) et la « génération » de chaque modèle dont il dépend.
+Un post_save/post_delete sur l'un de ces modèles incrémente sa génération : les entrées
+concernées ne sont plus jamais lues et expirent d'elles-mêmes (DASHBOARD_CACHE_TIMEOUT).
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'dashboards'
+
+# Modèles observés -> tableaux de bord qui en dépendent (rempli par cached_dashboard)
+DEPENDENCIES = {}
+
+
+def get_cache():
+    return caches[CACHE_ALIAS] if CACHE_ALIAS in settings.CACHES else caches['default']
+
+
+def _generation_key(label):
+    return f"dashboard-gen:{label}"
+
+
+def _generations(cache, labels):
+    keys = [_generation_key(label) for label in labels]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Valeur initiale non réutilisable: une génération évincée du cache ne ressert jamais une ancienne entrée
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [str(found[key]) for key in keys]
+
+
+def invalidate_model(model):
+    """Invalide tous les tableaux de bord dépendant de model."""
+    cache = get_cache()
+    key = _generation_key(model._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def cached_dashboard(name, depends_on, scope=lambda request: 'all'):
+    """
+    Met en cache la réponse d'une vue de tableau de bord.
+
+    depends_on liste les modèles dont les écritures invalident le cache, scope(request)
+    la portée de la clé (par exemple l'id du département du chef de département).
+    À placer sous @api_view/@permission_classes pour que l'authentification ait déjà eu lieu.
+    """
+    labels = sorted(model._meta.label_lower for model in depends_on)
+    for model in depends_on:
+        DEPENDENCIES.setdefault(model, set()).add(name)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cache = get_cache()
+            key = f"dashboard:{name}:{scope(request)}:{'-'.join(_generations(cache, labels))}"
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from . import views  # noqa: F401  (les décorateurs cached_dashboard déclarent leurs dépendances à l'import)
+from .dashboard_cache import DEPENDENCIES, invalidate_model
+
+
+def _invalidate_dashboards(sender, update_fields=None, **kwargs):
+    # Chaque connexion enregistre last_login (UPDATE_LAST_LOGIN): aucun tableau de bord n'en dépend
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    # Après la validation: une lecture concurrente ne peut pas remettre en cache, sous la nouvelle
+    # génération, des données d'avant l'écriture
+    transaction.on_commit(lambda: invalidate_model(sender))
+
+
+for model in DEPENDENCIES:
+    post_save.connect(_invalidate_dashboards, sender=model, dispatch_uid=f"dashboard-cache-save-{model._meta.label_lower}")
+    post_delete.connect(_invalidate_dashboards, sender=model, dispatch_uid=f"dashboard-cache-delete-{model._meta.label_lower}")
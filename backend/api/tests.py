@@ -0,0 +1,685 @@
+import csv
+import io
+import tempfile
+from datetime import time, timedelta
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.contrib.auth.hashers import check_password, get_hasher
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts import inscriptions
+from accounts.hashing import hash_passwords, password_pool
+from accounts.inscriptions import purge_expired_credentials, run_job
+from accounts.matricules import allocate_matricules
+from accounts.models import InscriptionJob
+from academics.models import Section, Departement, Auditoire, Course, CourseAssignment, Calendrier
+from academics.scheduler import CourseLoad, generate, solve
+from academics.timetable import Slot, as_slot, check_slot, find_conflicts
+from core.pagination import encode_cursor
+from evaluations.models import Assignment, Submission, Quiz
+
+User = get_user_model()
+
+
+class AssistantAuditoriumStudentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        course = Course.objects.create(name="Algorithmique", auditoire=cls.auditoire)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        tp = Assignment.objects.create(course=course, assistant=cls.assistant, title="TP1", total_points=10, deadline=timezone.now())
+        td = Assignment.objects.create(course=course, assistant=cls.assistant, title="TD1", total_points=20, deadline=timezone.now())
+
+        cls.students = []
+        for i in range(5):
+            student = User.objects.create_user(
+                matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com",
+                role="etudiant", current_auditoire=cls.auditoire,
+            )
+            cls.students.append(student)
+            Submission.objects.create(assignment=tp, student=student, status="soumis", grade=5 + i)
+            Submission.objects.create(assignment=td, student=student, status="soumis", grade=None)
+        Submission.objects.create(assignment=td, student=cls.students[0], status="soumis", grade=12.5)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.assistant)
+        self.url = f"/api/assistant/auditoriums/{self.auditoire.id}/students/"
+
+    def test_totals_match_graded_submissions(self):
+        rows = {row["id"]: row for row in self.client.get(self.url).json()}
+
+        first = rows[self.students[0].id]
+        self.assertEqual(first["total_grade_obtained"], 17.5)
+        self.assertEqual(first["total_possible_points"], 30)
+        self.assertEqual(first["auditorium"], "Licence 1")
+
+        last = rows[self.students[4].id]
+        self.assertEqual(last["total_grade_obtained"], 9)
+        self.assertEqual(last["total_possible_points"], 10)
+
+    def test_query_count_does_not_grow_with_students(self):
+        # 1 auditoire + 1 requête agrégée, quel que soit le nombre d'étudiants
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 5)
+
+
+class CoursesWithInstructorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 2", departement=cls.departement)
+        cls.head = User.objects.create_user(
+            matricule="CHEF-1", password="x", email="chef@ex.com",
+            role="chef_departement", department_head_of=cls.departement,
+        )
+        cls.student = User.objects.create_user(
+            matricule="ETU-1", password="x", email="etu@ex.com",
+            role="etudiant", current_auditoire=cls.auditoire,
+        )
+        for i in range(6):
+            course = Course.objects.create(name=f"Cours {i}", auditoire=cls.auditoire)
+            if i % 2 == 0:
+                teacher = User.objects.create_user(
+                    matricule=f"ASS-{i}", password="x", email=f"ass{i}@ex.com",
+                    first_name="Prof", last_name=str(i), role="assistant",
+                )
+                CourseAssignment.objects.create(course=course, assistant=teacher)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_student_courses_in_constant_queries(self):
+        self.client.force_authenticate(self.student)
+        # cours + enseignants préchargés
+        with self.assertNumQueries(2):
+            rows = self.client.get("/api/student/courses/").json()
+        instructors = {row["title"]: row["instructor"] for row in rows}
+        self.assertEqual(instructors["Cours 0"], "Prof  0")
+        self.assertEqual(instructors["Cours 1"], "N/A")
+
+    def test_department_auditorium_courses_in_constant_queries(self):
+        self.client.force_authenticate(self.head)
+        # auditoire + cours + enseignants préchargés
+        with self.assertNumQueries(3):
+            rows = self.client.get(f"/api/department/auditoriums/{self.auditoire.id}/courses/").json()
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(sum(1 for row in rows if row["teacher_id"]), 3)
+
+
+class DashboardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dg = User.objects.create_user(matricule="DG-1", password="x", email="dg@ex.com", role="dg")
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        # Backend fichier: mêmes garanties qu'un cache partagé (Redis) mais utilisable localement
+        caches_setting = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "dashboards": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tmpdir.name},
+        }
+        override = override_settings(CACHES=caches_setting)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.dg)
+
+    def test_summary_is_served_from_cache_until_a_dependency_changes(self):
+        self.assertEqual(self.client.get("/api/dg/summary/").json()["totalStudents"], 0)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/api/dg/summary/").json()
+        self.assertEqual(cached["totalStudents"], 0)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant")
+            # Tant que l'écriture n'est pas validée, la génération ne change pas
+            with self.assertNumQueries(0):
+                self.client.get("/api/dg/summary/")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get("/api/dg/summary/").json()["totalStudents"], 1)
+
+    def test_logins_keep_the_entry(self):
+        self.client.get("/api/dg/summary/")
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.dg)
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/dg/summary/")
+
+    def test_unrelated_writes_keep_the_entry(self):
+        self.client.get("/api/dg/summary/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Section.objects.create(name="Droit")
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/dg/summary/")
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN est propre à SQLite")
+class HotLookupIndexTests(TestCase):
+    """Les requêtes réellement exécutées par les vues les plus fréquentes doivent passer par un index composite."""
+
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.course = Course.objects.create(name="Algorithmique", code="ALGO", auditoire=cls.auditoire)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        cls.head = User.objects.create_user(matricule="CD-1", password="x", email="cd@ex.com", role="chef_departement", department_head_of=cls.departement)
+        cls.student = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant", current_auditoire=cls.auditoire)
+        CourseAssignment.objects.create(course=cls.course, assistant=cls.assistant)
+        cls.assignment = Assignment.objects.create(course=cls.course, assistant=cls.assistant, title="TP1", total_points=10, deadline=timezone.now())
+        cls.quiz = Quiz.objects.create(course=cls.course, assistant=cls.assistant, title="QCM")
+
+    def queries(self, user, method, url, data=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}):
+            # Les recalculs différés (carnet de notes) font partie du travail de la requête
+            with CaptureQueriesContext(connection) as captured, self.captureOnCommitCallbacks(execute=True):
+                response = getattr(client, method)(url, data, format="json")
+        self.assertLess(response.status_code, 300, response.content)
+        return [query["sql"] for query in captured]
+
+    def assertUsesIndex(self, statements, table, index_name):
+        plans = []
+        with connection.cursor() as cursor:
+            for sql in statements:
+                if sql.startswith("SELECT") and f'FROM "{table}"' in sql:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plans.append(" | ".join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans, f"Aucune requête sur {table}")
+        self.assertTrue(any(index_name in plan for plan in plans), plans)
+
+    def test_students_of_auditorium(self):
+        statements = self.queries(self.assistant, "get", f"/api/assistant/grades/{self.auditoire.id}/{self.course.code}")
+        self.assertUsesIndex(statements, "accounts_user", "user_auditoire_role_idx")
+
+    def test_users_by_role(self):
+        statements = self.queries(self.head, "get", "/api/users/?role=assistant&status=active")
+        self.assertUsesIndex(statements, "accounts_user", "user_role_status_idx")
+
+    def test_recent_submissions_of_student(self):
+        statements = self.queries(self.student, "get", "/api/student/grades/recent")
+        self.assertUsesIndex(statements, "evaluations_submission", "submission_student_date_idx")
+
+    def test_graded_submissions_of_student(self):
+        # Noter un étudiant recalcule son carnet de notes à partir de ses soumissions notées
+        url = f"/api/assistant/grades/{self.auditoire.id}/{self.course.code}"
+        statements = self.queries(self.assistant, "patch", url, {"student_id": self.student.id, "grade": 8})
+        self.assertUsesIndex(statements, "evaluations_submission", "submission_student_grade_idx")
+
+    def test_pending_submissions_of_assistant(self):
+        statements = self.queries(self.assistant, "get", "/api/assistant/summary")
+        self.assertUsesIndex(statements, "evaluations_submission", "submission_assign_grade_idx")
+
+    def test_quiz_submissions_by_status(self):
+        with CaptureQueriesContext(connection) as captured:
+            call_command("regrade_quiz", self.quiz.id, stdout=io.StringIO())
+        self.assertUsesIndex([query["sql"] for query in captured], "evaluations_quizsubmission", "quizsub_quiz_status_idx")
+
+    def test_timetable_of_auditorium(self):
+        statements = self.queries(self.head, "get", f"/api/department/auditoriums/{self.auditoire.id}/schedules?session_type=session")
+        self.assertUsesIndex(statements, "academics_calendrier", "calendrier_aud_session_day_idx")
+
+    def test_courses_of_auditorium(self):
+        statements = self.queries(self.head, "get", f"/api/department/auditoriums/{self.auditoire.id}/courses?session_type=session")
+        self.assertUsesIndex(statements, "academics_course", "course_auditoire_session_idx")
+
+    def test_latest_assignment_of_course(self):
+        url = f"/api/assistant/grades/{self.auditoire.id}/{self.course.code}"
+        statements = self.queries(self.assistant, "patch", url, {"student_id": self.student.id, "grade": 8})
+        self.assertUsesIndex(statements, "evaluations_assignment", "assignment_course_created_idx")
+
+
+@skipUnless(connection.vendor == 'sqlite', "Réglages propres à SQLite")
+class SQLiteConnectionTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_connection_waits_for_write_lock(self):
+        self.assertEqual(self.pragma('busy_timeout'), connection.settings_dict['OPTIONS']['timeout'] * 1000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_init_command_applied(self):
+        # 1 = NORMAL, suffisant en mode WAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+
+
+class UserListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        cls.admin = User.objects.create_user(matricule="ADM-1", password="x", email="adm@ex.com", role="dg", status="active")
+        for i in range(5):
+            User.objects.create_user(
+                matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", first_name=f"Prenom{i}",
+                last_name="Kabila" if i % 2 else "Mbuyi", role="etudiant", current_auditoire=cls.auditoire,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_pages_follow_matricule_order(self):
+        seen = []
+        url = "/api/users/?limit=2"
+        for _ in range(4):
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['matricule'] for row in response.data]
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            url = f"/api/users/?limit=2&cursor={cursor}"
+        self.assertEqual(seen, ["ADM-1", "ETU-0", "ETU-1", "ETU-2", "ETU-3", "ETU-4"])
+
+    def test_row_labels(self):
+        response = self.client.get("/api/users/?q=ADM")
+        self.assertEqual(response.data, [{
+            'id': self.admin.id, 'username': "ADM-1", 'matricule': "ADM-1", 'email': "adm@ex.com",
+            'full_name': self.admin.get_full_name(), 'role': self.admin.get_role_display(),
+            'auditoire': 'Non assigné', 'status': self.admin.get_status_display(), 'team_status': False,
+        }])
+
+    def test_filters(self):
+        response = self.client.get(f"/api/users/?role=etudiant&auditoire={self.auditoire.id}&q=kab")
+        self.assertEqual([row['matricule'] for row in response.data], ["ETU-1", "ETU-3"])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+        response = self.client.get("/api/users/?role=dg,assistant")
+        self.assertEqual([row['matricule'] for row in response.data], ["ADM-1"])
+
+    def test_invalid_cursor_and_filters(self):
+        self.assertEqual(self.client.get("/api/users/?cursor=nope").status_code, 400)
+        self.assertEqual(self.client.get(f"/api/users/?cursor={encode_cursor('ETU', 'x')}").status_code, 400)
+        self.assertEqual(self.client.get("/api/users/?auditoire=abc").status_code, 400)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    INSCRIPTION_HASH_WORKERS=0,
+    INSCRIPTION_BATCH_SIZE=2,
+)
+class BulkInscriptionTests(TestCase):
+    CSV = (
+        "email,first_name,last_name,post_name,sexe,auditoire\n"
+        "a@ex.com,Alice,Kabeya,,F,Licence 1\n"
+        "b@ex.com,Bob,Ilunga,Mutombo,M,Licence 1\n"
+        "taken@ex.com,Carl,Mbuyi,,M,Licence 1\n"
+        "d@ex.com,Dora,Tshala,,F,Inconnu\n"
+        "e@ex.com,Eve,Ngalula,,F,\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        cls.other = Auditoire.objects.create(name="Licence 2", departement=departement)
+        cls.sga = User.objects.create_user(matricule="SGA-1", password="x", email="sga@ex.com", role="sga")
+        User.objects.create_user(matricule="ETU-0", password="x", email="taken@ex.com", role="etudiant")
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        media_override = override_settings(MEDIA_ROOT=self.media.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(self.sga)
+
+    def upload(self, content=None, **data):
+        upload = SimpleUploadedFile("etudiants.csv", (content or self.CSV).encode(), content_type="text/csv")
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post("/api/sga/student-management/bulk-inscriptions/", {"file": upload, **data}, format="multipart")
+        return response, callbacks
+
+    def test_job_is_started_in_background(self):
+        response, callbacks = self.upload(auditoire_id=self.other.id)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "running")
+        self.assertEqual(response.data["total_rows"], 5)
+        self.assertEqual(len(callbacks), 1)
+
+        job = run_job(response.data["id"])
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.processed_rows, 5)
+        self.assertEqual(job.created_count, 3)
+        self.assertEqual([e["row"] for e in job.errors], [4, 5])
+
+        students = User.objects.filter(email__in=["a@ex.com", "b@ex.com", "e@ex.com"]).order_by("email")
+        self.assertEqual([s.current_auditoire_id for s in students], [self.auditoire.id, self.auditoire.id, self.other.id])
+        self.assertEqual(len({s.matricule for s in students}), 3)
+
+        status = self.client.get(f"/api/sga/student-management/bulk-inscriptions/{job.id}/")
+        self.assertEqual(status.data["progress"], 100.0)
+        self.assertEqual(status.data["pending_credentials"], 3)
+        self.assertNotIn("results", status.data)
+
+        # Les identifiants sont remis une seule fois, puis effacés du job
+        url = f"/api/sga/student-management/bulk-inscriptions/{job.id}/credentials/"
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(response.content.decode())))
+        credentials = {row["email"]: row["password"] for row in rows}
+        self.assertTrue(all(s.check_password(credentials[s.email]) for s in students))
+        job.refresh_from_db()
+        self.assertEqual(job.results, [])
+        self.assertEqual(self.client.post(url).status_code, 410)
+
+    def test_credentials_expire_when_not_downloaded(self):
+        response, _ = self.upload(auditoire_id=self.other.id)
+        job = run_job(response.data["id"])
+        self.assertEqual(len(job.results), 3)
+        self.assertEqual(purge_expired_credentials(), 0)
+
+        # Délai de téléchargement dépassé: plus rien n'est remis, même avant la purge
+        InscriptionJob.objects.filter(id=job.id).update(credentials_expire_at=timezone.now() - timedelta(seconds=1))
+        url = f"/api/sga/student-management/bulk-inscriptions/{job.id}/"
+        self.assertEqual(self.client.get(url).data["pending_credentials"], 0)
+        self.assertEqual(self.client.post(url + "credentials/").status_code, 410)
+        self.assertEqual(InscriptionJob.objects.get(id=job.id).results, [])
+
+        InscriptionJob.objects.filter(id=job.id).update(results=[{"password": "x"}], credentials_expire_at=timezone.now() - timedelta(seconds=1))
+        call_command("purge_inscription_credentials", stdout=io.StringIO())
+        self.assertEqual(InscriptionJob.objects.get(id=job.id).results, [])
+
+    def test_import_invalidates_dashboards(self):
+        response, _ = self.upload(auditoire_id=self.other.id)
+        with mock.patch.object(inscriptions, "invalidate_model") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                run_job(response.data["id"])
+        invalidate.assert_called_with(User)
+
+    def test_rejects_missing_columns(self):
+        response, callbacks = self.upload("email,first_name\na@ex.com,Alice\n")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(InscriptionJob.objects.exists())
+
+    def test_resume_after_failure(self):
+        response, _ = self.upload(auditoire_id=self.other.id)
+        job_id = response.data["id"]
+        real_allocate = inscriptions.allocate_matricules
+        with mock.patch.object(inscriptions, "allocate_matricules", side_effect=[real_allocate(2), RuntimeError("coupure")]):
+            with self.assertLogs("accounts.inscriptions", level="ERROR"):
+                job = run_job(job_id)
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.processed_rows, 2)
+        self.assertEqual(job.created_count, 2)
+        # Les mots de passe du premier lot ne restent pas en clair sur un job échoué
+        job.refresh_from_db()
+        self.assertEqual((job.results, job.credentials_expire_at), ([], None))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            resumed = self.client.post(f"/api/sga/student-management/bulk-inscriptions/{job_id}/resume/")
+        self.assertEqual(resumed.status_code, 202)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.client.post(f"/api/sga/student-management/bulk-inscriptions/{job_id}/resume/").status_code, 409)
+
+        job = run_job(job_id)
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.created_count, 3)
+        self.assertEqual(User.objects.filter(email="a@ex.com").count(), 1)
+
+    def test_passwords_hashed_in_process_pool(self):
+        hasher = get_hasher()
+        executor = password_pool(2)
+        self.addCleanup(executor.shutdown)
+        encoded = hash_passwords(hasher, ["secret-1", "secret-2"], executor)
+        self.assertTrue(check_password("secret-1", encoded[0]))
+        self.assertTrue(check_password("secret-2", encoded[1]))
+
+
+class MatriculeAllocationTests(TestCase):
+    def test_blocks_are_consecutive_per_year(self):
+        self.assertEqual(allocate_matricules(3, year=2030), ["MAT-2030-00001", "MAT-2030-00002", "MAT-2030-00003"])
+        self.assertEqual(allocate_matricules(2, year=2030), ["MAT-2030-00004", "MAT-2030-00005"])
+        self.assertEqual(allocate_matricules(1, year=2031), ["MAT-2031-00001"])
+        self.assertEqual(allocate_matricules(0), [])
+
+    def test_user_table_is_never_probed(self):
+        with CaptureQueriesContext(connection) as ctx:
+            allocate_matricules(1000)
+        self.assertFalse([q for q in ctx.captured_queries if 'accounts_user' in q['sql']])
+
+    def test_single_inscription_uses_sequence(self):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(matricule="SGA-1", password="x", email="sga@ex.com", role="sga"))
+        year = timezone.now().year
+        allocate_matricules(41, year=year)
+
+        response = client.post("/api/sga/student-management/create-inscription/", {
+            "email": "new@ex.com", "first_name": "Nouveau", "last_name": "Etudiant", "auditoire_id": auditoire.id,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["matricule"], f"MAT-{year}-00042")
+
+        user = User(email="autre@ex.com")
+        user.save()
+        self.assertEqual(user.matricule, f"MAT-{year}-00043")
+
+
+class TimetableConflictTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.l1 = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.l2 = Auditoire.objects.create(name="Licence 2", departement=cls.departement)
+        cls.head = User.objects.create_user(matricule="CD-1", password="x", email="cd@ex.com", role="chef_departement", department_head_of=cls.departement)
+        cls.teacher = User.objects.create_user(matricule="PROF-1", password="x", email="prof@ex.com", role="professeur")
+        cls.slot = Calendrier.objects.create(auditoire=cls.l1, day="Lundi", start_time="08:00", end_time="10:00", teacher=cls.teacher)
+        Calendrier.objects.create(auditoire=cls.l1, day="Lundi", start_time="10:00", end_time="12:00")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.head)
+
+    def post(self, auditoire, start, end, teacher=None, day="Lundi"):
+        return self.client.post(f"/api/department/auditoriums/{auditoire.id}/schedules", {
+            "day": day, "startTime": start, "endTime": end, "teacher": teacher.id if teacher else None, "session_type": "session",
+        }, format="json")
+
+    def test_check_slot_scans_overlapping_slots_already_stored(self):
+        # Horaire antérieur à la validation: 08:00-12:00 recouvre déjà 09:00-10:00
+        wide = Calendrier.objects.create(auditoire=self.l2, day="Lundi", start_time="08:00", end_time="12:00")
+        Calendrier.objects.create(auditoire=self.l2, day="Lundi", start_time="09:00", end_time="10:00")
+        self.assertEqual(check_slot(Slot(None, "Lundi", time(11), time(11, 30), "session", self.l2.id, None)), [("auditoire", wide.id)])
+        self.assertEqual(check_slot(Slot(None, "Lundi", time(12), time(13), "session", self.l2.id, None)), [])
+        self.assertEqual(check_slot(Slot(wide.id, "Lundi", time(11), time(11, 30), "session", self.l2.id, None)), [])
+
+        response = self.post(self.l2, "11:00", "11:30")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([c["id"] for c in response.data["conflicts"]], [wide.id])
+
+    def test_create_rejects_auditoire_and_teacher_overlaps(self):
+        response = self.post(self.l1, "09:00", "10:30")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(sorted(c["id"] for c in response.data["conflicts"]), sorted(Calendrier.objects.values_list("id", flat=True)))
+
+        response = self.post(self.l2, "09:30", "11:00", teacher=self.teacher)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([(c["type"], c["id"]) for c in response.data["conflicts"]], [("teacher", self.slot.id)])
+
+        self.assertEqual(self.post(self.l2, "10:00", "11:00", teacher=self.teacher).status_code, 201)
+        self.assertEqual(self.post(self.l1, "12:00", "11:00").status_code, 400)
+
+    def test_update_ignores_the_slot_itself(self):
+        url = f"/api/department/auditoriums/{self.l1.id}/schedules/{self.slot.id}"
+        data = {"day": "Lundi", "startTime": "08:30", "endTime": "10:00", "teacher": self.teacher.id, "session_type": "session"}
+        self.assertEqual(self.client.put(url, data, format="json").status_code, 200)
+        data["endTime"] = "10:30"
+        self.assertEqual(self.client.put(url, data, format="json").status_code, 409)
+
+    def test_bulk_report_lists_every_pair(self):
+        # Conflits créés directement en base, comme dans un horaire antérieur à la validation
+        extra = [
+            Calendrier.objects.create(auditoire=self.l2, day="Lundi", start_time="09:00", end_time="11:00", teacher=self.teacher),
+            Calendrier.objects.create(auditoire=self.l1, day="Lundi", start_time="11:00", end_time="13:00"),
+        ]
+        response = self.client.get("/api/department/schedule-conflicts?session_type=session")
+        pairs = sorted((c["type"], *sorted(s["id"] for s in c["schedules"])) for c in response.data)
+        second = Calendrier.objects.get(start_time="10:00").id
+        self.assertEqual(pairs, sorted([("teacher", self.slot.id, extra[0].id), ("auditoire", second, extra[1].id)]))
+
+        self.assertEqual(find_conflicts([
+            Slot(i, "Mardi", time(8), time(12), "session", 1, None) for i in range(4)
+        ]), [("auditoire", a, b) for b in range(4) for a in range(b)])
+
+
+class TimetableGeneratorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoires = [Auditoire.objects.create(name=f"Licence {i}", departement=cls.departement) for i in (1, 2)]
+        cls.teacher = User.objects.create_user(matricule="PROF-1", password="x", email="prof@ex.com", role="professeur")
+        cls.courses = []
+        for auditoire in cls.auditoires:
+            for i in range(4):
+                course = Course.objects.create(name=f"Cours {auditoire.id}-{i}", code=f"C{auditoire.id}{i}", auditoire=auditoire, credits=5)
+                CourseAssignment.objects.create(course=course, assistant=cls.teacher)
+                cls.courses.append(course)
+        # Créneau saisi à la main: 2 heures du premier cours, le lundi matin
+        cls.locked = Calendrier.objects.create(
+            auditoire=cls.auditoires[0], course=cls.courses[0], teacher=cls.teacher, day="Lundi", start_time="08:00", end_time="10:00",
+        )
+        cls.head = User.objects.create_user(matricule="CD-1", password="x", email="cd@ex.com", role="chef_departement", department_head_of=cls.departement)
+
+    def timetable(self):
+        return [as_slot(slot) for slot in Calendrier.objects.all()]
+
+    def test_solve_places_weekly_hours_without_conflicts(self):
+        loads = [CourseLoad(i, i % 3, i % 2, 270) for i in range(12)]
+        placements, unplaced = solve(loads, busy=[('teacher', 0, 'Lundi', 8 * 60, 18 * 60)])
+        self.assertEqual(unplaced, [])
+        for load in loads:
+            self.assertEqual(sum(p.end - p.start for p in placements if p.course_id == load.course_id), 270)
+        self.assertFalse([p for p in placements if p.teacher_id == 0 and p.day == 'Lundi'])
+        slots = [
+            Slot(i, p.day, time(p.start // 60, p.start % 60), time(p.end // 60, p.end % 60), 'session', p.auditoire_id, p.teacher_id)
+            for i, p in enumerate(placements)
+        ]
+        self.assertEqual(find_conflicts(slots), [])
+
+    def test_generate_keeps_locked_slots_and_replaces_generated_ones(self):
+        client = APIClient()
+        client.force_authenticate(self.head)
+        response = client.post("/api/department/schedules/generate", {"session_type": "session"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["unplaced"], [])
+        self.assertEqual(find_conflicts(self.timetable()), [])
+        self.assertTrue(Calendrier.objects.filter(id=self.locked.id, locked=True).exists())
+        minutes = {}
+        for slot in Calendrier.objects.all():
+            length = (slot.end_time.hour - slot.start_time.hour) * 60 + slot.end_time.minute - slot.start_time.minute
+            minutes[slot.course_id] = minutes.get(slot.course_id, 0) + length
+        self.assertEqual(minutes, {course.id: 300 for course in self.courses})
+
+        # Une seconde génération remplace la première, en un nombre fixe de requêtes
+        # (dont la lecture des créneaux supprimés et l'invalidation groupée des grilles horaires)
+        with self.assertNumQueries(9):
+            slots, unplaced = generate(self.departement)
+        self.assertEqual(Calendrier.objects.count(), len(slots) + 1)
+
+    def test_edited_slot_survives_the_next_generation(self):
+        generate(self.departement)
+        slot = Calendrier.objects.filter(locked=False).order_by("id").first()
+        client = APIClient()
+        client.force_authenticate(self.head)
+        url = f"/api/department/auditoriums/{slot.auditoire_id}/schedules/{slot.id}"
+        # Retouche à la main: le créneau n'a plus d'enseignant attribué
+        data = {"day": slot.day, "startTime": slot.start_time.strftime("%H:%M"), "endTime": slot.end_time.strftime("%H:%M"),
+                "course": slot.course_id, "teacher": None, "session_type": "session"}
+        self.assertEqual(client.put(url, data, format="json").status_code, 200)
+        self.assertTrue(client.get(url).data["locked"])
+
+        generate(self.departement)
+        self.assertTrue(Calendrier.objects.filter(id=slot.id, teacher=None, locked=True).exists())
+
+    def test_dry_run_writes_nothing(self):
+        slots, unplaced = generate(self.departement, commit=False)
+        self.assertTrue(slots)
+        self.assertEqual(Calendrier.objects.count(), 1)
+
+
+class TimetableGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        cls.course = Course.objects.create(name="Algorithmique", code="ALGO", auditoire=cls.auditoire)
+        cls.teacher = User.objects.create_user(matricule="PROF-1", password="x", email="prof@ex.com", role="professeur", last_name="Kabila")
+        cls.other = User.objects.create_user(matricule="PROF-2", password="x", email="prof2@ex.com", role="professeur")
+        cls.sga = User.objects.create_user(matricule="SGA-1", password="x", email="sga@ex.com", role="sga")
+        cls.student = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant", current_auditoire=cls.auditoire)
+        Calendrier.objects.create(auditoire=cls.auditoire, course=cls.course, teacher=cls.teacher, day="Mardi", start_time="10:00", end_time="12:00")
+        cls.slot = Calendrier.objects.create(auditoire=cls.auditoire, course=cls.course, teacher=cls.teacher, day="Mardi", start_time="08:00", end_time="10:00")
+        Calendrier.objects.create(auditoire=cls.auditoire, day="Lundi", start_time="14:00", end_time="16:00", session_type="mi-session")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.sga)
+        self.url = f"/api/sga/auditoires/{self.auditoire.id}/schedule?session_type=session"
+
+    def test_grid_is_grouped_sorted_and_served_from_storage(self):
+        response = self.client.get(self.url)
+        self.assertEqual([(d["day"], [e["startTime"] for e in d["events"]]) for d in response.data], [("Mardi", ["08:00", "10:00"])])
+        with self.assertNumQueries(2):
+            again = self.client.get(self.url)
+        self.assertEqual(again.data, response.data)
+        self.assertEqual(again["ETag"], response["ETag"])
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_slot_changes_rebuild_the_affected_grids(self):
+        etag = self.client.get(self.url)["ETag"]
+        teacher = APIClient()
+        teacher.force_authenticate(self.teacher)
+        self.assertEqual(len(teacher.get("/api/assistant/timetable").data[0]["events"]), 2)
+
+        self.slot.teacher = self.other
+        self.slot.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(teacher.get("/api/assistant/timetable").data[0]["events"]), 1)
+
+        self.course.name = "Algorithmique avancée"
+        self.course.save()
+        self.assertEqual({e["courseName"] for e in self.client.get(self.url).data[0]["events"]}, {"Algorithmique avancée"})
+
+    def test_student_calendar_and_schedule(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        calendar = client.get("/api/student/calendar?session_type=mi-session").data
+        self.assertEqual([d["day"] for d in calendar], ["Lundi"])
+        schedule = client.get("/api/student/schedule").data
+        self.assertEqual([(s["day"], s["startTime"], s["teacher_name"]) for s in schedule], [("Mardi", "08:00", "Kabila"), ("Mardi", "10:00", "Kabila")])
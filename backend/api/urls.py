@@ -18,12 +18,16 @@ from .views import (
     assistant_auditorium_create_tptd,
     assistant_auditorium_create_quiz,
     student_notifications,
+    notifications_unread_count,
+    notifications_mark_read,
     quizzes_student_available,
     tptd_student_available,
     quizzes_student_my_attempts,
     tptd_student_my_submissions,
     student_courses,
     student_calendar,
+    student_schedule,
+    teacher_timetable,
     library_catalog,
     library_myloans,
     student_grades_all,
@@ -39,7 +43,12 @@ from .views import (
     sga_calendar_events,
     sga_enrollment_requests,
     sga_create_student_inscription,
+    sga_bulk_inscription,
+    sga_inscription_job,
+    sga_inscription_job_resume,
+    sga_inscription_job_credentials,
     sga_deliberation_sessions,
+    sga_deliberation_detail,
     sga_auditoires_list,
     sga_departements_list,
     sga_auditoire_schedules,
@@ -62,7 +71,10 @@ from .views import (
     department_auditoriums_list,
     department_auditorium_schedules_list_create,
     department_auditorium_schedule_detail,
+    department_schedule_conflicts,
+    department_schedule_generate,
     jury_summary,
+    grades_export,
     jury_defenses,
     apparitorat_summary,
     apparitorat_presences,
@@ -83,6 +95,7 @@ from .views import (
     assistant_my_courses,
     tptd_my_detail,
     quizzes_my_detail,
+    quizzes_my_import,
     assistant_profile,
     assistant_grades,
     assistant_submission_detail,
@@ -112,6 +125,8 @@ urlpatterns = [
     re_path(r"^student/grades/recent/?$", student_grades_recent, name="student_grades_recent"),
     re_path(r"^student/profile/?$", student_profile, name="student_profile"),
     re_path(r"^student/notifications/?$", student_notifications, name="student_notifications"),
+    re_path(r"^notifications/unread-count/?$", notifications_unread_count, name="notifications_unread_count"),
+    re_path(r"^notifications/read/?$", notifications_mark_read, name="notifications_mark_read"),
     re_path(r"^quizzes/student/available/?$", quizzes_student_available, name="quizzes_student_available"),
     re_path(r"^tptd/student/available/?$", tptd_student_available, name="tptd_student_available"),
     re_path(r"^tptd/student/(?P<id>\d+)/?$", tptd_student_detail, name="tptd_student_detail"),
@@ -123,6 +138,7 @@ urlpatterns = [
     re_path(r"^tptd/student/(?P<id>\d+)/submit/?$", tptd_student_submit, name="tptd_student_submit"),
     re_path(r"^student/courses/?$", student_courses, name="student_courses"),
     re_path(r"^student/calendar/?$", student_calendar, name="student_calendar"),
+    re_path(r"^student/schedule/?$", student_schedule, name="student_schedule"),
     re_path(r"^student/grades/all/?$", student_grades_all, name="student_grades_all"),
     re_path(r"^student/documents/?$", student_documents, name="student_documents"),
     re_path(r"^library/catalog/?$", library_catalog, name="library_catalog"),
@@ -133,6 +149,7 @@ urlpatterns = [
     # Assistant endpoints
     re_path(r"^assistant/summary/?$", assistant_summary, name="assistant_summary"),
     re_path(r"^assistant/profile/?$", assistant_profile, name="assistant_profile"),
+    re_path(r"^assistant/timetable/?$", teacher_timetable, name="teacher_timetable"),
     re_path(r"^auditoriums/assistant/my/?$", auditoriums_assistant_my, name="auditoriums_assistant_my"),
     re_path(r"^assistant/courses/?$", assistant_my_courses, name="assistant_my_courses"),
     re_path(r"^assistant/auditoriums/(?P<code>.+)/courses/?$", assistant_auditorium_courses, name="assistant_auditorium_courses"),
@@ -148,6 +165,7 @@ urlpatterns = [
     re_path(r"^tptd/my/(?P<id>\d+)/?$", tptd_my_detail, name="tptd_my_detail"),
     re_path(r"^quizzes/my/?$", quizzes_my, name="quizzes_my"),
     re_path(r"^quizzes/my/(?P<id>\d+)/?$", quizzes_my_detail, name="quizzes_my_detail"),
+    re_path(r"^quizzes/my/(?P<id>\d+)/import/?$", quizzes_my_import, name="quizzes_my_import"),
     re_path(r"^assistant/tograde/?$", assistant_tograde, name="assistant_tograde"),
     re_path(r'^assistant/grades/(?P<auditorium_id>\d+)/(?P<course_code>[^/]+)/?$', assistant_grades, name='assistant_grades'),
 
@@ -171,7 +189,12 @@ urlpatterns = [
     re_path(r"^sga/academic-coordination/calendar-events/?$", sga_calendar_events, name="sga_calendar_events"),
     re_path(r"^sga/student-management/enrollment-requests/?$", sga_enrollment_requests, name="sga_enrollment_requests"),
     re_path(r"^sga/student-management/create-inscription/?$", sga_create_student_inscription, name="sga_create_student_inscription"),
+    re_path(r"^sga/student-management/bulk-inscriptions/?$", sga_bulk_inscription, name="sga_bulk_inscription"),
+    re_path(r"^sga/student-management/bulk-inscriptions/(?P<job_id>\d+)/?$", sga_inscription_job, name="sga_inscription_job"),
+    re_path(r"^sga/student-management/bulk-inscriptions/(?P<job_id>\d+)/resume/?$", sga_inscription_job_resume, name="sga_inscription_job_resume"),
+    re_path(r"^sga/student-management/bulk-inscriptions/(?P<job_id>\d+)/credentials/?$", sga_inscription_job_credentials, name="sga_inscription_job_credentials"),
     re_path(r"^sga/evaluation-supervision/deliberation-sessions/?$", sga_deliberation_sessions, name="sga_deliberation_sessions"),
+    re_path(r"^sga/evaluation-supervision/deliberation-sessions/(?P<deliberation_id>\d+)/?$", sga_deliberation_detail, name="sga_deliberation_detail"),
     re_path(r"^sga/auditoires/?$", sga_auditoires_list, name="sga_auditoires_list"),
     re_path(r"^sga/departements/?$", sga_departements_list, name="sga_departements_list"),
     re_path(r"^sga/auditoires/(?P<auditoire_id>\d+)/schedule/?$", sga_auditoire_schedules, name="sga_auditoire_schedule"),
@@ -195,12 +218,17 @@ urlpatterns = [
     re_path(r"^department/auditoriums/?$", department_auditoriums_list, name="department_auditoriums_list"),
     re_path(r"^department/auditoriums/(?P<auditorium_id>\d+)/courses/?$", department_auditorium_courses, name="department_auditorium_courses"),
     re_path(r"^department/auditoriums/(?P<auditorium_id>\d+)/schedules/?$", department_auditorium_schedules_list_create, name="department_auditorium_schedules_list_create"),
-    re_path(r"^department/auditoriums/(?P<auditoire_id>\d+)/schedules/(?P<schedule_id>\d+)/?$", department_auditorium_schedule_detail, name="department_auditorium_schedule_detail"),
+    re_path(r"^department/auditoriums/(?P<auditorium_id>\d+)/schedules/(?P<schedule_id>\d+)/?$", department_auditorium_schedule_detail, name="department_auditorium_schedule_detail"),
+    re_path(r"^department/schedule-conflicts/?$", department_schedule_conflicts, name="department_schedule_conflicts"),
+    re_path(r"^department/schedules/generate/?$", department_schedule_generate, name="department_schedule_generate"),
     re_path(r"^department/student-performance/?$", department_student_performance, name="department_student_performance"),
     re_path(r"^department/teacher-distribution/?$", department_teacher_distribution, name="department_teacher_distribution"),
     re_path(r"^department/auditoires-with-courses/?$", department_auditoires_with_courses, name="department_auditoires_with_courses"),
     re_path(r"^department/assign-course/?$", department_assign_course, name="department_assign_course"),
+    re_path(r"^grades/export\.(?P<fmt>csv|xlsx)$", grades_export, name="grades_export"),
     re_path(r"^jury/summary/?$", jury_summary, name="jury_summary"),
+    re_path(r"^jury/deliberations/?$", sga_deliberation_sessions, name="jury_deliberations"),
+    re_path(r"^jury/deliberations/(?P<deliberation_id>\d+)/?$", sga_deliberation_detail, name="jury_deliberation_detail"),
     re_path(r"^jury/defenses/?$", jury_defenses, name="jury_defenses"),
     re_path(r"^apparitorat/summary/?$", apparitorat_summary, name="apparitorat_summary"),
     re_path(r"^apparitorat/presences/?$", apparitorat_presences, name="apparitorat_presences"),
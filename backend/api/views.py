@@ -1,26 +1,48 @@
 import uuid
 import random
-import datetime
 import logging
 import json
+import csv
 
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
 from rest_framework.response import Response
 from django.conf import settings
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_datetime, parse_time
 from datetime import timedelta
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
 from django.db import transaction
-from django.db.models import Q, Count, Sum, Avg
+from django.db.models import Q, Count, Sum
 from django.utils.crypto import get_random_string
+from django.utils.text import slugify
 
 from academics.models import Course, Auditoire, Calendrier, CourseAssignment, Section, Departement, CourseMessage, Paiement
-from evaluations.models import Assignment, Submission, Quiz, Question, Choice, QuizSubmission
+from academics.grids import get_grid
+from academics.scheduler import generate as generate_timetable
+from academics.timetable import SLOT_FIELDS, Slot, check_slot, find_conflicts
+from accounts.matricules import next_matricule
+from accounts.inscriptions import InscriptionError, read_rows, start_job, job_status, take_credentials
+from accounts.models import InscriptionJob
+from core.activity import log_activity
+from core.counters import decrement as decrement_unread, unread_count
+from core.models import Notification
+from core.pagination import encode_cursor, decode_cursor, parse_limit
+from evaluations.models import Assignment, Submission, Quiz, QuizSubmission
+from evaluations.grading import grade_submission
+from evaluations.quiz_paper import get_student_paper
+from evaluations.timer import expire_attempts, is_expired, remaining_seconds
+from evaluations.quiz_import import QuizImportError, parse_questions, load_question_bank, create_quiz, import_questions
+from gradebook.deliberation import deliberate
+from gradebook.engine import student_overview
+from gradebook.exports import as_async_stream, export_stream
+from gradebook.models import CourseGrade, Deliberation, DeliberationResult
+from gradebook.stats import get_stat, get_stats
+from .dashboard_cache import cached_dashboard
 from rest_framework.permissions import BasePermission, IsAuthenticated # Import BasePermission and IsAuthenticated
 
 User = get_user_model()
@@ -40,6 +62,9 @@ def health(request):
 
 DEV_PERMS = [permissions.AllowAny] if getattr(settings, "DEBUG", False) else [permissions.IsAuthenticated]
 
+USER_LIST_PAGE_SIZE = 100
+USER_LIST_MAX_PAGE_SIZE = 500
+
 # Custom Permission for Directeur Général
 class IsDirecteurGeneral(BasePermission):
     """Allows access only to Directeur Général users."""
@@ -52,23 +77,76 @@ class IsSGA(BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and request.user.role == 'sga'
 
+# Custom Permission for deliberations
+class IsDeliberationOfficer(BasePermission):
+    """Allows access only to SGA and jury users."""
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and request.user.role in ('sga', 'jury')
+
 @api_view(['GET'])
 @permission_classes(DEV_PERMS)
 def user_list(request):
-    users = User.objects.select_related('current_auditoire').all()
-    data = []
-    for user in users:
-        data.append({
-            'username': user.matricule, # Using matricule as username
-            'matricule': user.matricule,
-            'email': user.email,
-            'full_name': user.get_full_name(),
-            'role': user.get_role_display(),
-            'auditoire': user.current_auditoire.name if user.current_auditoire else 'Non assigné',
-            'status': user.get_status_display(),
-            'team_status': user.team_status,
-        })
-    return Response(data)
+    """
+    Annuaire des utilisateurs, paginé par clé sur (matricule, id).
+
+    Filtres: role (un ou plusieurs, séparés par des virgules), status, auditoire (id) et q
+    (préfixe du matricule, du nom, post-nom ou prénom).
+    `limit` borne la page (USER_LIST_PAGE_SIZE par défaut); l'en-tête X-Next-Cursor, présent
+    s'il reste des utilisateurs, est à repasser en `cursor` pour obtenir la page suivante.
+    """
+    params = request.query_params
+    try:
+        limit = parse_limit(params.get('limit'), USER_LIST_PAGE_SIZE, USER_LIST_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({'error': 'Invalid limit'}, status=400)
+
+    users = User.objects.all()
+    if params.get('role'):
+        users = users.filter(role__in=params['role'].split(','))
+    if params.get('status'):
+        users = users.filter(status=params['status'])
+    if params.get('auditoire'):
+        if not params['auditoire'].isdigit():
+            return Response({'error': 'Invalid auditoire'}, status=400)
+        users = users.filter(current_auditoire_id=params['auditoire'])
+    search = (params.get('q') or '').strip()
+    if search:
+        users = users.filter(
+            Q(matricule__istartswith=search) | Q(last_name__istartswith=search)
+            | Q(post_name__istartswith=search) | Q(first_name__istartswith=search)
+        )
+    if params.get('cursor'):
+        try:
+            matricule, user_id = decode_cursor(params['cursor'], str, int)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=400)
+        users = users.filter(Q(matricule__gt=matricule) | Q(matricule=matricule, id__gt=user_id))
+
+    rows = list(users.order_by('matricule', 'id').values(
+        'id', 'matricule', 'email', 'first_name', 'post_name', 'last_name',
+        'role', 'status', 'team_status', 'current_auditoire__name',
+    )[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    roles = dict(User.ROLE_CHOICES)
+    statuses = dict(User.STATUS_CHOICES)
+    data = [{
+        'id': row['id'],
+        'username': row['matricule'], # Using matricule as username
+        'matricule': row['matricule'],
+        'email': row['email'],
+        'full_name': f"{row['first_name']} {row['post_name']} {row['last_name']}".strip(),
+        'role': roles.get(row['role'], row['role']),
+        'auditoire': row['current_auditoire__name'] or 'Non assigné',
+        'status': statuses.get(row['status'], row['status']),
+        'team_status': row['team_status'],
+    } for row in rows]
+
+    response = Response(data)
+    if has_more:
+        response['X-Next-Cursor'] = encode_cursor(rows[-1]['matricule'], rows[-1]['id'])
+    return response
 
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
@@ -223,8 +301,9 @@ def quizzes_my(request):
         duration = request.data.get("duration", 20)
         total_points = request.data.get("total_points", 10)
         questions = request.data.get("questions", [])
+        bank = request.FILES.get("file")
 
-        if not (course_code and title and questions):
+        if not (course_code and title and (questions or bank)):
             return Response({"detail": "Code du cours, titre et questions requis."}, status=400)
 
         course = Course.objects.filter(code=course_code).first()
@@ -234,15 +313,14 @@ def quizzes_my(request):
         if not CourseAssignment.objects.filter(course=course, assistant=user).exists():
             return Response({"detail": "Vous n'êtes pas assigné à ce cours."}, status=403)
 
-        quiz = Quiz.objects.create(course=course, assistant=user, title=title, duration=duration, total_points=total_points)
+        try:
+            parsed = load_question_bank(bank.read(), bank.name) if bank else parse_questions(questions)
+        except QuizImportError as e:
+            return Response({"detail": str(e)}, status=400)
 
-        for q_data in questions:
-            question = Question.objects.create(quiz=quiz, question_text=q_data['text'], question_type=q_data['type'])
-            if q_data['type'] in ['single', 'multiple']:
-                for choice_data in q_data['choices']:
-                    Choice.objects.create(question=question, choice_text=choice_data['text'], is_correct=choice_data['is_correct'])
+        quiz = create_quiz(course, user, title, parsed, duration=duration, total_points=total_points)
 
-        return Response({"id": quiz.id, "title": quiz.title}, status=201)
+        return Response({"id": quiz.id, "title": quiz.title, "questions": len(parsed)}, status=201)
 
     # GET request
     items = []
@@ -259,6 +337,28 @@ def quizzes_my(request):
         })
     return Response(items)
 
+@api_view(['POST'])
+@permission_classes(DEV_PERMS)
+def quizzes_my_import(request, id):
+    """Ajoute une banque de questions (fichier JSON/CSV, champ 'csv' ou liste 'questions') à un quiz existant."""
+    quiz = Quiz.objects.filter(id=id, assistant=request.user).first()
+    if not quiz:
+        return Response({"detail": "Quiz non trouvé ou accès non autorisé."}, status=404)
+
+    bank = request.FILES.get("file")
+    try:
+        if bank:
+            parsed = load_question_bank(bank.read(), bank.name)
+        elif request.data.get("csv"):
+            parsed = load_question_bank(request.data["csv"], "questions.csv")
+        else:
+            parsed = parse_questions(request.data.get("questions"))
+    except QuizImportError as e:
+        return Response({"detail": str(e)}, status=400)
+
+    created = import_questions(quiz, parsed)
+    return Response({"id": quiz.id, "imported": len(created)}, status=201)
+
 @api_view(['GET', 'DELETE'])
 @permission_classes(DEV_PERMS)
 def tptd_my_detail(request, id):
@@ -505,6 +605,7 @@ def assistant_quiz_submission_detail(request, quiz_id: int, submission_id: int):
             "submitted_at": submission.submitted_at,
             "answers": submission.answers,
             "score": submission.score,
+            "auto_score": submission.auto_score,
         }
         return Response(data)
     except QuizSubmission.DoesNotExist:
@@ -626,29 +727,12 @@ def assistant_profile(request):
 def student_summary(request):
     user = request.user
     program = "N/A"
-    creditsEarned = 0
-    gpa = 0.0
     if user.current_auditoire and user.current_auditoire.departement and user.current_auditoire.departement.section:
         program = user.current_auditoire.departement.section.name
 
-    submissions = Submission.objects.filter(student=user, grade__isnull=False).select_related('assignment__course')
-    successful_courses = set()
-    total_points = 0
-    total_credits = 0
-
-    for sub in submissions:
-        if sub.grade and sub.grade >= 10:
-            credits = getattr(sub.assignment.course, 'credits', 3)
-            if sub.assignment.course.id not in successful_courses:
-                creditsEarned += credits
-                successful_courses.add(sub.assignment.course.id)
-
-        if sub.grade is not None:
-            total_points += sub.grade
-            total_credits += 1
-
-    if total_credits > 0:
-        gpa = round(total_points / total_credits, 2)
+    overview = student_overview(user)
+    creditsEarned = overview["credits_earned"]
+    gpa = overview["weighted_average"]
 
     data = {
         "program": program,
@@ -757,6 +841,7 @@ def student_profile(request):
 
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
+@cached_dashboard('assistant_summary', [CourseAssignment, Assignment, Quiz, Submission, Auditoire, User], scope=lambda request: _safe_user_id(request.user))
 def assistant_summary(request):
     user = request.user
     data = {"courses": 0, "activeTPTD": 0, "activeQuizzes": 0, "toGrade": 0, "auditoriums": []}
@@ -795,22 +880,18 @@ def auditoriums_assistant_my(request):
 @permission_classes(DEV_PERMS)
 def assistant_student_detail(request, id: int):
     try:
-        student = User.objects.get(id=id, role='etudiant')
-        total_grade_obtained = 0
-        total_possible_points = 0
-
-        submissions = Submission.objects.filter(student=student, grade__isnull=False).select_related('assignment')
-        for sub in submissions:
-            total_grade_obtained += sub.grade
-            total_possible_points += getattr(sub.assignment, 'total_points', 20)
+        student = User.objects.select_related('current_auditoire').get(id=id, role='etudiant')
+        overview = student_overview(student)
 
         data = {
             "id": student.id,
             "name": student.get_full_name(),
             "email": student.email,
             "auditorium": student.current_auditoire.name if student.current_auditoire else "",
-            "total_grade_obtained": total_grade_obtained,
-            "total_possible_points": total_possible_points,
+            "total_grade_obtained": overview["obtained"],
+            "total_possible_points": overview["possible"],
+            "weighted_average": overview["weighted_average"],
+            "credits_earned": overview["credits_earned"],
         }
         return Response(data)
     except User.DoesNotExist:
@@ -823,16 +904,9 @@ def assistant_student_grades(request, id: int):
     rows = []
     try:
         student = User.objects.get(id=id, role='etudiant')
-        subs = Submission.objects.select_related("assignment__course").filter(student=student, grade__isnull=False)
-        by_course = {}
-        for s in subs:
-            cname = s.assignment.course.name if s.assignment and s.assignment.course else ""
-            if not cname:
-                continue
-            by_course.setdefault(cname, []).append(s.grade)
-        for cname, grades in by_course.items():
-            if grades:
-                rows.append({"name": cname, "grade": round(sum(grades) / len(grades), 2)})
+        grades = CourseGrade.objects.filter(student=student, average__isnull=False).order_by('course__name')
+        for name, average, credits in grades.values_list('course__name', 'average', 'credits'):
+            rows.append({"name": name, "grade": average, "credits": credits})
     except User.DoesNotExist:
         pass
     return Response(rows)
@@ -893,23 +967,20 @@ def assistant_auditorium_students(request, code: str):
         auditorium_id = int(code)
         aud = Auditoire.objects.filter(pk=auditorium_id).first()
         if aud:
-            qs = User.objects.filter(current_auditoire=aud, role='etudiant')
+            # Une seule requête groupée par étudiant au lieu d'une requête Submission par étudiant
+            graded = Q(submissions__grade__isnull=False)
+            qs = User.objects.filter(current_auditoire=aud, role='etudiant').annotate(
+                total_grade_obtained=Sum('submissions__grade', filter=graded),
+                total_possible_points=Sum('submissions__assignment__total_points', filter=graded),
+            )
             for s in qs:
-                total_grade_obtained = 0
-                total_possible_points = 0
-
-                submissions = Submission.objects.filter(student=s, grade__isnull=False).select_related('assignment')
-                for sub in submissions:
-                    total_grade_obtained += sub.grade
-                    total_possible_points += getattr(sub.assignment, 'total_points', 20)
-
                 rows.append({
                     "id": s.id,
                     "name": s.get_full_name(),
                     "email": s.email,
-                    "auditorium": s.current_auditoire.name if s.current_auditoire else "",
-                    "total_grade_obtained": total_grade_obtained,
-                    "total_possible_points": total_possible_points,
+                    "auditorium": aud.name,
+                    "total_grade_obtained": s.total_grade_obtained or 0,
+                    "total_possible_points": s.total_possible_points or 0,
                 })
     except (ValueError, TypeError):
         pass
@@ -947,13 +1018,9 @@ def assistant_auditorium_stats(request, code: str):
             students_qs = User.objects.filter(current_auditoire=aud, role='etudiant')
             data["totalStudents"] = students_qs.count()
             data["department"] = aud.departement.name if aud.departement else "N/A"
-            subs = Submission.objects.filter(assignment__course__auditoire=aud, grade__isnull=False)
-            grades = list(subs.values_list("grade", flat=True))
-            if grades:
-                avg = sum(grades) / len(grades)
-                data["averageGrade"] = round(avg, 2)
-                passed = len([g for g in grades if g >= 10])
-                data["passRate"] = round(100 * passed / len(grades), 1)
+            stat = get_stat('auditoire', aud.id)
+            data["averageGrade"] = stat.average
+            data["passRate"] = stat.pass_rate
     except (ValueError, TypeError):
         pass
     return Response(data)
@@ -1063,25 +1130,59 @@ def assistant_auditorium_create_quiz(request, code: str):
         if not course:
             return Response({"detail": "Cours introuvable dans cet auditoire"}, status=404)
 
-        q = Quiz.objects.create(course=course, assistant=request.user, title=title, duration=duration)
-
-        for q_data in questions_data:
-            question = Question.objects.create(quiz=q, question_text=q_data['text'], question_type=q_data['type'])
-            if q_data['type'] in ['single', 'multiple']:
-                for choice_data in q_data['choices']:
-                    Choice.objects.create(question=question, choice_text=choice_data['text'], is_correct=choice_data['is_correct'])
+        q = create_quiz(course, request.user, title, parse_questions(questions_data), duration=duration)
 
         return Response({"id": q.id, "title": q.title, "duration": q.duration}, status=201)
+    except QuizImportError as e:
+        return Response({"detail": str(e)}, status=400)
     except (ValueError, TypeError):
         return Response({"detail": "Code d'auditoire invalide"}, status=400)
     except Exception as e:
         return Response({"detail": f"Erreur de création du quiz: {e}"}, status=500)
 
 
+NOTIFICATION_PAGE_SIZE = 50
+
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
 def student_notifications(request):
-    return Response([])
+    try:
+        limit = parse_limit(request.query_params.get('limit'), NOTIFICATION_PAGE_SIZE, 200)
+    except ValueError:
+        return Response({"detail": "limit doit être un entier."}, status=400)
+    notifications = Notification.objects.filter(target_user=request.user).order_by('-created_at', '-id').values(
+        'id', 'category', 'notification_type', 'message', 'is_read', 'created_at',
+    )[:limit]
+    return Response([{
+        "id": n['id'],
+        "type": n['category'] or n['notification_type'],
+        "text": n['message'],
+        "at": timezone.localtime(n['created_at']).strftime('%Y-%m-%d %H:%M'),
+        "read": n['is_read'],
+    } for n in notifications])
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def notifications_unread_count(request):
+    # Compteur dénormalisé (core.counters): une lecture par clé primaire
+    return Response({"unread": unread_count(request.user.id)})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def notifications_mark_read(request):
+    """Marque comme lues les notifications {ids} de l'utilisateur, ou toutes si ids est absent."""
+    notifications = Notification.objects.filter(target_user=request.user, is_read=False)
+    ids = request.data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return Response({"detail": "ids doit être une liste d'entiers."}, status=400)
+        notifications = notifications.filter(id__in=ids)
+    with transaction.atomic():
+        updated = notifications.update(is_read=True)
+        decrement_unread(request.user.id, updated)
+    return Response({"updated": updated})
 
 
 @api_view(["GET"])
@@ -1180,22 +1281,18 @@ def quizzes_student_detail(request, id):
             defaults={'status': 'en_cours'}
         )
 
+        # Tentative abandonnée dont le temps est écoulé: close à la réouverture
+        now = timezone.now()
+        if not created and is_expired(submission, now):
+            expire_attempts(now, id=submission.id)
+            return Response({"detail": "Temps écoulé: votre tentative a été clôturée.", "attempt": {"status": "soumis"}}, status=400)
+
         # Si la tentative est déjà soumise, on peut le signaler au frontend
         if submission.status == 'soumis':
             return Response({"detail": "Vous avez déjà soumis ce quiz.", "attempt": {"status": "soumis"}}, status=400)
 
-        questions = []
-        for q in quiz.questions.all():
-            choices = []
-            if q.question_type in ['single', 'multiple']:
-                for c in q.choices.all():
-                    choices.append({"id": c.id, "text": c.choice_text})
-            questions.append({
-                "id": q.id,
-                "text": q.question_text,
-                "type": q.question_type,
-                "choices": choices
-            })
+        # Énoncé compilé une fois par version du quiz et servi depuis le cache
+        questions = get_student_paper(quiz)["questions"]
 
         assistant_name = quiz.assistant.get_full_name() if quiz.assistant else "N/A"
         deadline = (quiz.created_at or timezone.now()) + timedelta(days=7)
@@ -1213,7 +1310,10 @@ def quizzes_student_detail(request, id):
                 "id": submission.id,
                 "status": submission.status,
                 "answers": submission.answers,
-                "started_at": submission.started_at.isoformat()
+                "started_at": submission.started_at.isoformat(),
+                "deadline": submission.deadline.isoformat(),
+                # Temps restant calculé par le serveur: l'horloge du navigateur n'est pas fiable
+                "remaining_seconds": remaining_seconds(submission, now),
             }
         }
         return Response(data)
@@ -1274,12 +1374,10 @@ def student_courses(request):
     rows = []
     user = request.user
     if user.current_auditoire:
-        for c in Course.objects.filter(auditoire=user.current_auditoire).select_related("auditoire"):
+        for c in Course.objects.filter(auditoire=user.current_auditoire).select_related("auditoire").with_instructor():
             title = c.name
             credits = c.credits
-            assign = CourseAssignment.objects.filter(course=c).select_related("assistant").first()
-
-            instructor = assign.assistant.get_full_name() if assign and assign.assistant else "N/A"
+            instructor = c.instructor.get_full_name() if c.instructor else "N/A"
 
             rows.append({
                 "id": c.id,
@@ -1294,10 +1392,55 @@ def student_courses(request):
     return Response(rows)
 
 
+def _grid_response(request, owner_type, owner_id, session_type):
+    """Grille horaire matérialisée, ou 304 si le client a déjà cette version (If-None-Match)."""
+    grid = get_grid(owner_type, owner_id, session_type)
+    etag = f'"{grid.etag}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=304)
+    else:
+        response = Response(grid.data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
 def student_calendar(request):
-    return Response([])
+    """Horaire hebdomadaire de l'auditoire de l'étudiant, groupé par jour."""
+    auditoire_id = getattr(request.user, 'current_auditoire_id', None)
+    if not auditoire_id:
+        return Response([])
+    return _grid_response(request, 'auditoire', auditoire_id, request.query_params.get('session_type', 'session'))
+
+
+@api_view(["GET"])
+@permission_classes(DEV_PERMS)
+def student_schedule(request):
+    """Même horaire, à plat (une ligne par créneau), pour la grille heure x jour de l'étudiant."""
+    auditoire = getattr(request.user, 'current_auditoire', None)
+    if not auditoire:
+        return Response([])
+    grid = get_grid('auditoire', auditoire.id, request.query_params.get('session_type', 'session'))
+    return Response([{
+        "id": event["id"],
+        "day": day["day"],
+        "startTime": event["startTime"],
+        "endTime": event["endTime"],
+        "course_title": event["courseName"],
+        "teacher_name": event["teacherName"],
+        "auditorium_name": auditoire.name,
+    } for day in grid.data for event in day["events"]])
+
+
+@api_view(["GET"])
+@permission_classes(DEV_PERMS)
+def teacher_timetable(request):
+    """Horaire hebdomadaire de l'enseignant connecté, tous auditoires confondus."""
+    if request.user.role not in ('assistant', 'professeur'):
+        return Response({"detail": "Réservé aux enseignants."}, status=403)
+    return _grid_response(request, 'teacher', request.user.id, request.query_params.get('session_type', 'session'))
 
 
 @api_view(["GET"])
@@ -1358,17 +1501,29 @@ def submit_quiz_answers(request, quiz_id: int):
         answers = request.data.get('answers', {})
         reason = request.data.get('reason', 'manual')
 
-        # Récupère la tentative existante
-        submission = QuizSubmission.objects.get(quiz=quiz, student=user, status='en_cours')
+        now = timezone.now()
+        with transaction.atomic():
+            # Récupère la tentative existante (verrouillée: le balayage des tentatives expirées peut la clore)
+            submission = QuizSubmission.objects.select_for_update().get(quiz=quiz, student=user, status='en_cours')
+            submission.quiz = quiz
+
+            # Au-delà de la fin de la tentative (plus la tolérance), les réponses reçues sont ignorées
+            if is_expired(submission, now):
+                expire_attempts(now, id=submission.id)
+                return Response({"detail": "Temps écoulé: la soumission a été refusée et la tentative clôturée.", "attempt": {"status": "soumis"}}, status=400)
+
+            # Met à jour la tentative
+            submission.answers = answers
+            submission.submission_reason = reason
+            submission.status = 'soumis'
+            submission.submitted_at = now
+            submission.save()
 
-        # Met à jour la tentative
-        submission.answers = answers
-        submission.submission_reason = reason
-        submission.status = 'soumis'
-        submission.submitted_at = timezone.now()
-        submission.save()
+            # Les questions à choix sont corrigées immédiatement; seules les questions 'text' restent à corriger
+            needs_review = grade_submission(submission)
+            log_activity(user.id, 'submission', f"Quiz {quiz.id}, tentative {submission.id}")
 
-        return Response({"status": "submitted", "submission_id": submission.id})
+        return Response({"status": "submitted", "submission_id": submission.id, "needs_review": needs_review})
 
     except Quiz.DoesNotExist:
         return Response({"detail": "Quiz non trouvé."}, status=404)
@@ -1391,13 +1546,14 @@ def tptd_student_submit(request, id: int):
             return Response({"detail": "Vous avez déjà soumis ce travail."}, status=400)
 
         content = request.data.get('content', '')
-        Submission.objects.create(
+        submission = Submission.objects.create(
             assignment=assignment,
             student=user,
             content=content,
             status='soumis',
             submitted_at=timezone.now(),
         )
+        log_activity(user.id, 'submission', f"TP/TD {assignment.id}, soumission {submission.id}")
         return Response({"status": "submitted"})
     except Assignment.DoesNotExist:
         return Response({"detail": "Travail non trouvé."}, status=404)
@@ -1435,6 +1591,7 @@ def pdg_activities(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsDirecteurGeneral]) # Apply custom permission
+@cached_dashboard('dg_summary', [User, Departement, Auditoire, Paiement])
 def dg_summary(request):
     total_students = User.objects.filter(role='etudiant').count()
     total_teachers = User.objects.filter(Q(role='professeur') | Q(role='assistant')).count()
@@ -1504,6 +1661,7 @@ def dg_actions(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsSGA])
+@cached_dashboard('sga_kpi_summary', [User, Course, Paiement])
 def sga_kpi_summary(request):
     total_students = User.objects.filter(role='etudiant').count()
     total_teachers = User.objects.filter(Q(role='professeur') | Q(role='assistant')).count()
@@ -1629,10 +1787,7 @@ def sga_create_student_inscription(request):
     except Auditoire.DoesNotExist:
         return Response({"detail": "Auditoire non trouvé."}, status=404)
 
-    matricule = f"MAT-{datetime.date.today().year}-{uuid.uuid4().hex[:4].upper()}"
-    while User.objects.filter(matricule=matricule).exists():
-        matricule = f"MAT-{datetime.date.today().year}-{uuid.uuid4().hex[:4].upper()}"
-    
+    matricule = next_matricule()
     password = get_random_string(10)
 
     try:
@@ -1673,6 +1828,82 @@ def sga_create_student_inscription(request):
         print(f"Error creating student: {e}") 
         return Response({"detail": f"An unexpected error occurred: {e}"}, status=500)
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsSGA])
+def sga_bulk_inscription(request):
+    """Lance l'inscription en masse d'un fichier CSV/XLSX d'étudiants; le suivi se fait via sga_inscription_job."""
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({"detail": "Un fichier CSV ou XLSX est requis."}, status=400)
+    if not upload.name.lower().endswith(('.csv', '.xlsx')):
+        return Response({"detail": "Format de fichier non supporté (CSV ou XLSX)."}, status=400)
+
+    default_auditoire = None
+    if request.data.get('auditoire_id'):
+        try:
+            default_auditoire = Auditoire.objects.get(id=request.data['auditoire_id'])
+        except (Auditoire.DoesNotExist, ValueError):
+            return Response({"detail": "Auditoire non trouvé."}, status=404)
+
+    try:
+        # Lecture immédiate pour refuser tout de suite un fichier illisible ou sans les bonnes colonnes
+        total_rows = len(read_rows(upload, upload.name))
+    except InscriptionError as e:
+        return Response({"detail": str(e)}, status=400)
+    upload.seek(0)
+
+    with transaction.atomic():
+        job = InscriptionJob.objects.create(
+            created_by=request.user, file=upload, default_auditoire=default_auditoire, total_rows=total_rows,
+        )
+        start_job(job.id)
+    job.refresh_from_db()
+    return Response(job_status(job), status=202)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsSGA])
+def sga_inscription_job(request, job_id):
+    try:
+        job = InscriptionJob.objects.get(id=job_id)
+    except InscriptionJob.DoesNotExist:
+        return Response({"detail": "Inscription non trouvée."}, status=404)
+    return Response(job_status(job))
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsSGA])
+def sga_inscription_job_credentials(request, job_id):
+    """Télécharge (CSV) les identifiants générés depuis le dernier téléchargement; ils sont ensuite effacés."""
+    try:
+        credentials = take_credentials(job_id)
+    except InscriptionJob.DoesNotExist:
+        return Response({"detail": "Inscription non trouvée."}, status=404)
+    if not credentials:
+        return Response({"detail": "Aucun identifiant à télécharger: ils ont déjà été remis ou ont expiré."}, status=410)
+
+    response = HttpResponse(content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="identifiants-inscription-{job_id}.csv"'
+    response["Cache-Control"] = "no-store"
+    writer = csv.writer(response)
+    writer.writerow(["matricule", "email", "full_name", "password"])
+    for row in credentials:
+        writer.writerow([row["matricule"], row["email"], row["full_name"], row["password"]])
+    return response
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsSGA])
+def sga_inscription_job_resume(request, job_id):
+    """Relance un job échoué ou interrompu à partir de la dernière ligne enregistrée."""
+    try:
+        job = InscriptionJob.objects.get(id=job_id)
+    except InscriptionJob.DoesNotExist:
+        return Response({"detail": "Inscription non trouvée."}, status=404)
+    with transaction.atomic():
+        started = start_job(job.id)
+    if not started:
+        return Response({"detail": f"L'inscription est déjà {job.get_status_display().lower()}."}, status=409)
+    job.refresh_from_db()
+    return Response(job_status(job), status=202)
+
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated, IsSGA])
 def sga_profile(request):
@@ -1710,17 +1941,73 @@ def sga_profile(request):
         "date_joined": user.date_joined.isoformat(),
     })
 
-@api_view(["GET"])
-@permission_classes([IsAuthenticated, IsSGA])
+def _deliberation_data(deliberation):
+    return {
+        "id": deliberation.id,
+        "faculty": deliberation.scope_name,
+        "date": deliberation.created_at.strftime("%Y-%m-%d"),
+        "status": deliberation.get_status_display(),
+        "students": deliberation.student_count,
+        "passed": deliberation.passed_count,
+        "rules": deliberation.rules,
+    }
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAuthenticated, IsDeliberationOfficer])
 def sga_deliberation_sessions(request):
-    # Simuler des sessions de délibération, car il n'y a pas de modèle dédié.
-    # Dans une implémentation réelle, cela viendrait d'un modèle DeliberationSession.
-    deliberations = [
-        { "id": 1, "faculty": "Sciences Appliquées", "date": "2024-02-10", "status": "Planifiée" },
-        { "id": 2, "faculty": "Sciences Économiques", "date": "2024-02-15", "status": "Planifiée" },
-        { "id": 3, "faculty": "Droit", "date": "2024-01-28", "status": "Terminée" },
-    ]
-    return Response(deliberations)
+    """
+    GET: dernières délibérations. POST {auditoire_id | departement_id, commit, pass_average, min_credit_ratio}:
+    délibère l'auditoire ou le département; sans commit=true, le résultat n'est qu'une simulation.
+    """
+    if request.method == 'GET':
+        deliberations = Deliberation.objects.select_related('auditoire', 'departement')[:50]
+        return Response([_deliberation_data(d) for d in deliberations])
+
+    data = request.data
+    try:
+        auditoire = Auditoire.objects.get(id=data['auditoire_id']) if data.get('auditoire_id') else None
+        departement = Departement.objects.get(id=data['departement_id']) if data.get('departement_id') else None
+    except (Auditoire.DoesNotExist, Departement.DoesNotExist, ValueError):
+        return Response({"detail": "Auditoire ou département non trouvé."}, status=404)
+    if (auditoire is None) == (departement is None):
+        return Response({"detail": "Préciser soit auditoire_id, soit departement_id."}, status=400)
+
+    rules = {}
+    try:
+        for key in ('pass_average', 'min_credit_ratio'):
+            if data.get(key) not in (None, ''):
+                rules[key] = float(data[key])
+    except (TypeError, ValueError):
+        return Response({"detail": "Règles de délibération invalides."}, status=400)
+
+    commit = str(data.get('commit', '')).lower() in ('1', 'true', 'oui')
+    deliberation = deliberate(auditoire=auditoire, departement=departement, commit=commit, rules=rules, run_by=request.user)
+    return Response(_deliberation_data(deliberation), status=201)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsDeliberationOfficer])
+def sga_deliberation_detail(request, deliberation_id):
+    deliberation = Deliberation.objects.select_related('auditoire', 'departement').filter(id=deliberation_id).first()
+    if not deliberation:
+        return Response({"detail": "Délibération non trouvée."}, status=404)
+    results = deliberation.results.order_by('auditoire__name', 'student__last_name', 'student__first_name').values(
+        'student_id', 'student__matricule', 'student__first_name', 'student__post_name', 'student__last_name',
+        'auditoire__name', 'average', 'credits_attempted', 'credits_earned', 'decision',
+    )
+    decisions = dict(DeliberationResult.DECISION_CHOICES)
+    data = _deliberation_data(deliberation)
+    data["results"] = [{
+        "student_id": r['student_id'],
+        "matricule": r['student__matricule'],
+        "student": f"{r['student__first_name']} {r['student__post_name']} {r['student__last_name']}".strip(),
+        "auditoire": r['auditoire__name'],
+        "average": r['average'],
+        "credits_attempted": r['credits_attempted'],
+        "credits_earned": r['credits_earned'],
+        "decision": decisions[r['decision']],
+    } for r in results]
+    return Response(data)
 
 
 @api_view(["GET"])
@@ -1770,51 +2057,11 @@ def sga_departements_list(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsSGA])
 def sga_auditoire_schedules(request, auditoire_id):
-    schedules_data = []
-    session_type = request.query_params.get('session_type', 'session')  # Default to 'session'
-
-    try:
-        auditoire = Auditoire.objects.get(id=auditoire_id)
-        day_order = {'Lundi': 0, 'Mardi': 1, 'Mercredi': 2, 'Jeudi': 3, 'Vendredi': 4, 'Samedi': 5, 'Dimanche': 6}
-
-        # Filter by auditoire and session_type
-        events_qs = Calendrier.objects.filter(auditoire=auditoire)
-        if session_type:
-            events_qs = events_qs.filter(session_type=session_type)
-        
-        events = events_qs.select_related('course', 'teacher')
-
-        # Group events by day
-        schedules_by_day = {day: [] for day in day_order.keys()}
-        for event in events:
-            if event.day in schedules_by_day:
-                schedules_by_day[event.day].append({
-                    "id": event.id,
-                    "startTime": event.start_time.strftime('%H:%M'),
-                    "endTime": event.end_time.strftime('%H:%M'),
-                    "courseName": event.course.name if event.course else "N/A",
-                    "teacherName": event.teacher.get_full_name() if event.teacher else "N/A",
-                    "session_type": event.session_type,
-                })
-
-        # Sort events within each day by start time
-        for day in schedules_by_day:
-            schedules_by_day[day].sort(key=lambda x: x['startTime'])
-
-        # Convert to a list of days with their sorted events
-        for day, events_list in sorted(schedules_by_day.items(), key=lambda item: day_order.get(item[0], 7)):
-            if events_list:
-                schedules_data.append({
-                    "day": day,
-                    "events": events_list
-                })
-
-    except Auditoire.DoesNotExist:
+    # Grille précalculée (academics.grids), déjà groupée par jour et triée par heure
+    if not Auditoire.objects.filter(id=auditoire_id).exists():
         return Response({"detail": "Auditoire non trouvé."}, status=404)
-    except Exception as e:
-        return Response({"detail": f"Erreur lors du chargement des horaires: {e}"}, status=500)
-
-    return Response(schedules_data)
+    session_type = request.query_params.get('session_type', 'session')  # Default to 'session'
+    return _grid_response(request, 'auditoire', int(auditoire_id), session_type)
 
 
 # ---- Endpoints SGAD (placeholders)
@@ -1844,6 +2091,7 @@ def sgad_paie(request):
 
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
+@cached_dashboard('section_summary', [User, Departement, Auditoire, Course, CourseAssignment], scope=lambda request: getattr(request.user, 'section_head_of_id', None))
 def section_summary(request):
     user = request.user
     # We assume the user is a Section Head and is linked to a Section.
@@ -2014,13 +2262,12 @@ def section_courses_list(request):
         if not section:
             return Response({"error": "No sections found."}, status=404)
 
-    courses = Course.objects.filter(auditoire__departement__section=section).select_related('auditoire__departement')
+    courses = Course.objects.filter(auditoire__departement__section=section).select_related('auditoire__departement').with_instructor()
     data = []
     for course in courses:
         teacher_name = "Non assigné"
-        assignment = CourseAssignment.objects.filter(course=course).select_related('assistant').first()
-        if assignment and assignment.assistant:
-            teacher_name = assignment.assistant.get_full_name()
+        if course.instructor:
+            teacher_name = course.instructor.get_full_name()
 
         data.append({
             "id": course.id,
@@ -2036,6 +2283,7 @@ def section_courses_list(request):
 
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
+@cached_dashboard('department_summary', [User, Auditoire, Course, CourseAssignment], scope=lambda request: getattr(request.user, 'department_head_of_id', None))
 def department_summary(request):
     user = request.user
     try:
@@ -2200,7 +2448,7 @@ def department_courses_list(request):
 
     courses_queryset = Course.objects.filter(
         auditoire__departement=department
-    ).select_related('auditoire__departement')
+    ).select_related('auditoire__departement').with_instructor()
 
     session_type_filter = request.query_params.get('session_type')
     auditoire_id_filter = request.query_params.get('auditoire_id')
@@ -2214,10 +2462,9 @@ def department_courses_list(request):
     for course in courses_queryset:
         teacher_name = "Non assigné"
         teacher_id = None
-        assignment = CourseAssignment.objects.filter(course=course).select_related('assistant').first()
-        if assignment and assignment.assistant:
-            teacher_name = assignment.assistant.get_full_name()
-            teacher_id = assignment.assistant.id
+        if course.instructor:
+            teacher_name = course.instructor.get_full_name()
+            teacher_id = course.instructor.id
 
         data.append({
             "id": course.id,
@@ -2306,6 +2553,35 @@ def department_course_create(request):
 
 # ---- New Department Endpoints ----
 
+def _schedule_slot(schedule_id, auditorium, day, start_time, end_time, session_type, teacher):
+    """Slot à vérifier, ou Response 400 si les heures sont invalides."""
+    start, end = parse_time(str(start_time)), parse_time(str(end_time))
+    if start is None or end is None or start >= end:
+        return Response({"detail": "L'heure de fin doit suivre l'heure de début (format HH:MM)."}, status=400)
+    return Slot(schedule_id, day, start, end, session_type, auditorium.id, teacher.id if teacher else None)
+
+def _schedule_conflicts_response(conflicts):
+    """Response 409 décrivant les créneaux en conflit."""
+    others = Calendrier.objects.select_related('course', 'auditoire').in_bulk([other for _, other in conflicts])
+    labels = {'teacher': "L'enseignant", 'auditoire': "L'auditoire"}
+    details = []
+    for kind, other in conflicts:
+        slot = others[other]
+        details.append({
+            "type": kind,
+            "id": slot.id,
+            "day": slot.day,
+            "startTime": slot.start_time.strftime('%H:%M'),
+            "endTime": slot.end_time.strftime('%H:%M'),
+            "course": slot.course.name if slot.course else None,
+            "auditoire": slot.auditoire.name if slot.auditoire else None,
+        })
+    first = details[0]
+    return Response({
+        "detail": f"{labels[first['type']]} est déjà occupé le {first['day']} de {first['startTime']} à {first['endTime']}.",
+        "conflicts": details,
+    }, status=409)
+
 @api_view(["GET", "POST"])
 @permission_classes(DEV_PERMS)
 def department_auditorium_schedules_list_create(request, auditorium_id):
@@ -2341,6 +2617,7 @@ def department_auditorium_schedules_list_create(request, auditorium_id):
                     "name": schedule.teacher.get_full_name() if schedule.teacher else " "
                 },
                 "session_type": schedule.session_type,
+                "locked": schedule.locked,
             })
         return Response(data)
 
@@ -2368,15 +2645,23 @@ def department_auditorium_schedules_list_create(request, auditorium_id):
             except User.DoesNotExist:
                 return Response({"detail": "Enseignant introuvable."}, status=404)
 
-        Calendrier.objects.create(
-            auditoire=auditorium,
-            day=day,
-            start_time=start_time,
-            end_time=end_time,
-            course=course,
-            teacher=teacher,
-            session_type=request.data.get('session_type', 'session') # Default to 'session'
-        )
+        session_type = request.data.get('session_type', 'session') # Default to 'session'
+        slot = _schedule_slot(None, auditorium, day, start_time, end_time, session_type, teacher)
+        if isinstance(slot, Response):
+            return slot
+        with transaction.atomic():
+            conflicts = check_slot(slot)
+            if conflicts:
+                return _schedule_conflicts_response(conflicts)
+            Calendrier.objects.create(
+                auditoire=auditorium,
+                day=day,
+                start_time=slot.start,
+                end_time=slot.end,
+                course=course,
+                teacher=teacher,
+                session_type=session_type,
+            )
         return Response({"detail": "Horaire créé avec succès."}, status=201)
 
 @api_view(["GET", "PUT", "DELETE"])
@@ -2415,6 +2700,7 @@ def department_auditorium_schedule_detail(request, auditorium_id, schedule_id):
                 "name": schedule.teacher.get_full_name() if schedule.teacher else "N/A"
             },
             "session_type": schedule.session_type,
+            "locked": schedule.locked,
         }
         return Response(data)
 
@@ -2443,13 +2729,22 @@ def department_auditorium_schedule_detail(request, auditorium_id, schedule_id):
             except User.DoesNotExist:
                 return Response({"detail": "Enseignant introuvable."}, status=404)
 
-        schedule.day = day
-        schedule.start_time = start_time
-        schedule.end_time = end_time
-        schedule.course = course
-        schedule.teacher = teacher
-        schedule.session_type = session_type
-        schedule.save()
+        slot = _schedule_slot(schedule.id, auditorium, day, start_time, end_time, session_type, teacher)
+        if isinstance(slot, Response):
+            return slot
+        with transaction.atomic():
+            conflicts = check_slot(slot)
+            if conflicts:
+                return _schedule_conflicts_response(conflicts)
+            schedule.day = day
+            schedule.start_time = slot.start
+            schedule.end_time = slot.end
+            schedule.course = course
+            schedule.teacher = teacher
+            schedule.session_type = session_type
+            # Un créneau retouché à la main n'est plus remplacé par la génération suivante
+            schedule.locked = True
+            schedule.save()
 
         return Response({"detail": "Horaire mis à jour avec succès."}, status=200)
 
@@ -2457,6 +2752,86 @@ def department_auditorium_schedule_detail(request, auditorium_id, schedule_id):
         schedule.delete()
         return Response({"detail": "Horaire supprimé avec succès."}, status=204)
 
+@api_view(["POST"])
+@permission_classes(DEV_PERMS)
+def department_schedule_generate(request):
+    """
+    Génère l'horaire de tous les auditoires du département {session_type, dry_run}.
+    Les créneaux saisis à la main sont conservés; ceux d'une génération précédente sont remplacés.
+    """
+    user = request.user
+    try:
+        department = user.department_head_of
+    except AttributeError:
+        department = Departement.objects.first()
+        if not department:
+            return Response({"error": "No departments found."}, status=404)
+
+    session_type = request.data.get('session_type', 'session')
+    if session_type not in dict(Course.SESSION_CHOICES):
+        return Response({"detail": "Type de session invalide."}, status=400)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'oui')
+
+    slots, unplaced = generate_timetable(department, session_type, commit=not dry_run)
+    courses = dict(Course.objects.filter(id__in=[course_id for course_id, _ in unplaced]).values_list('id', 'name'))
+    return Response({
+        "created": 0 if dry_run else len(slots),
+        "schedules": [{
+            "auditoire_id": slot.auditoire_id,
+            "course_id": slot.course_id,
+            "teacher_id": slot.teacher_id,
+            "day": slot.day,
+            "startTime": slot.start_time.strftime('%H:%M'),
+            "endTime": slot.end_time.strftime('%H:%M'),
+        } for slot in slots],
+        "unplaced": [{"course_id": course_id, "course": courses.get(course_id), "minutes": minutes} for course_id, minutes in unplaced],
+    }, status=200 if dry_run else 201)
+
+@api_view(["GET"])
+@permission_classes(DEV_PERMS)
+def department_schedule_conflicts(request):
+    """
+    Tous les conflits de l'horaire du département (?session_type= pour une seule session).
+    Les créneaux des enseignants du département dans d'autres départements sont pris en compte.
+    """
+    user = request.user
+    try:
+        department = user.department_head_of
+    except AttributeError:
+        department = Departement.objects.first()
+        if not department:
+            return Response({"error": "No departments found."}, status=404)
+
+    schedules = Calendrier.objects.all()
+    session_type = request.query_params.get('session_type')
+    if session_type:
+        schedules = schedules.filter(session_type=session_type)
+    in_department = Q(auditoire__departement=department)
+    teachers = schedules.filter(in_department, teacher__isnull=False).values('teacher_id')
+    slots = [Slot(*row) for row in schedules.filter(in_department | Q(teacher_id__in=teachers)).values_list(*SLOT_FIELDS)]
+
+    conflicts = find_conflicts(slots)
+    labels = dict(
+        Calendrier.objects.filter(id__in={i for _, a, b in conflicts for i in (a, b)})
+        .values_list('id', 'course__name')
+    )
+    slots_by_id = {slot.id: slot for slot in slots}
+    data = []
+    for kind, first, second in conflicts:
+        a, b = slots_by_id[first], slots_by_id[second]
+        data.append({
+            "type": kind,
+            "day": a.day,
+            "session_type": a.session_type,
+            "object_id": a.auditoire_id if kind == 'auditoire' else a.teacher_id,
+            "schedules": [
+                {"id": slot.id, "startTime": slot.start.strftime('%H:%M'), "endTime": slot.end.strftime('%H:%M'),
+                 "course": labels.get(slot.id), "auditoire_id": slot.auditoire_id}
+                for slot in (a, b)
+            ],
+        })
+    return Response(data)
+
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
 def department_auditorium_courses(request, auditorium_id):
@@ -2473,7 +2848,7 @@ def department_auditorium_courses(request, auditorium_id):
     except Auditoire.DoesNotExist:
         return Response({"error": "Auditorium not found in this department."}, status=404)
 
-    courses_queryset = Course.objects.filter(auditoire=auditorium)
+    courses_queryset = Course.objects.filter(auditoire=auditorium).with_instructor()
 
     session_type_filter = request.query_params.get('session_type')
     if session_type_filter:
@@ -2483,10 +2858,9 @@ def department_auditorium_courses(request, auditorium_id):
     for course in courses_queryset:
         teacher_name = "Aucun enseignant sélectionné"
         teacher_id = None
-        assignment = CourseAssignment.objects.filter(course=course).select_related('assistant').first()
-        if assignment and assignment.assistant:
-            teacher_name = assignment.assistant.get_full_name()
-            teacher_id = assignment.assistant.id
+        if course.instructor:
+            teacher_name = course.instructor.get_full_name()
+            teacher_id = course.instructor.id
 
         data.append({
             "id": course.id,
@@ -2509,13 +2883,13 @@ def department_student_performance(request):
         if not department:
             return Response({"error": "No departments found."}, status=404)
 
-    auditoires = Auditoire.objects.filter(departement=department)
+    auditoires = list(Auditoire.objects.filter(departement=department).order_by('id'))
+    stats = get_stats('auditoire', [a.id for a in auditoires])
     data = []
     for auditoire in auditoires:
-        avg_grade = Submission.objects.filter(assignment__course__auditoire=auditoire).aggregate(Avg('grade'))['grade__avg']
         data.append({
             "name": auditoire.name,
-            "performance": round(avg_grade, 2) if avg_grade else 0,
+            "performance": stats[auditoire.id].average or 0,
         })
     return Response(data)
 
@@ -2611,6 +2985,68 @@ def department_assign_course(request):
     return Response({"detail": "Cours assigné avec succès."}, status=201)
 
 
+# Rôles autorisés à exporter les notes de tous les cours de la portée demandée
+GRADE_EXPORT_ROLES = ('pdg', 'dg', 'sga', 'jury')
+
+def grades_export(request, fmt):
+    """
+    Relevé de notes en flux CSV ou XLSX, filtré par auditoire (id), course (code) et/ou departement (id).
+
+    Les assistants et professeurs n'obtiennent que les cours qui leur sont attribués, les chefs
+    de département et de section que ceux de leur département ou de leur section.
+    Servi par ASGI, le flux est lu de façon asynchrone (as_async_stream).
+    """
+    return _grades_export(request, fmt, asgi=isinstance(request, ASGIRequest))
+
+@api_view(["GET"])
+@permission_classes(DEV_PERMS)
+def _grades_export(request, fmt, asgi=False):
+    params = request.query_params
+    scope = {}
+    names = []
+    try:
+        if params.get('auditoire'):
+            auditoire = Auditoire.objects.get(id=params['auditoire'])
+            scope['auditoire_id'] = auditoire.id
+            names.append(auditoire.name)
+        if params.get('departement'):
+            departement = Departement.objects.get(id=params['departement'])
+            scope['departement_id'] = departement.id
+            names.append(departement.name)
+        if params.get('course'):
+            course = Course.objects.get(code=params['course'])
+            scope['course_ids'] = [course.id]
+            names.append(course.code)
+    except (Auditoire.DoesNotExist, Departement.DoesNotExist, Course.DoesNotExist, ValueError):
+        return Response({"detail": "Auditoire, département ou cours introuvable."}, status=404)
+    if not scope:
+        return Response({"detail": "Préciser au moins un auditoire, un cours ou un département."}, status=400)
+
+    role = getattr(request.user, 'role', None)
+    if role in ('assistant', 'professeur'):
+        assigned = set(CourseAssignment.objects.filter(assistant=request.user).values_list('course_id', flat=True))
+        scope['course_ids'] = [c for c in scope.get('course_ids', assigned) if c in assigned]
+    elif role == 'chef_departement':
+        departement_id = request.user.department_head_of_id
+        if departement_id is None or scope.get('departement_id', departement_id) != departement_id:
+            return Response({"detail": "Export limité aux notes de votre département."}, status=403)
+        scope['departement_id'] = departement_id
+    elif role == 'chef_section':
+        if request.user.section_head_of_id is None:
+            return Response({"detail": "Export limité aux notes de votre section."}, status=403)
+        scope['section_id'] = request.user.section_head_of_id
+    elif role not in GRADE_EXPORT_ROLES:
+        return Response({"detail": "Accès non autorisé à l'export des notes."}, status=403)
+
+    name = '-'.join(names)
+    stream, content_type, extension = export_stream(fmt, name, **scope)
+    if asgi:
+        stream = as_async_stream(stream)
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="notes-{slugify(name)}.{extension}"'
+    return response
+
+
 # ---- Endpoints Département (placeholders) ----
 
 @api_view(["GET"])
@@ -2629,9 +3065,12 @@ def department_list(request):
 @api_view(["GET"])
 @permission_classes(DEV_PERMS)
 def jury_summary(request):
+    last = Deliberation.objects.select_related('auditoire', 'departement').filter(status='validee').first()
     data = {
         "defensesUpcoming": 8,
         "reportsPending": 12,
+        "deliberationsValidated": Deliberation.objects.filter(status='validee').count(),
+        "lastDeliberation": _deliberation_data(last) if last else None,
     }
     return Response(data)
 
@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 from datetime import timedelta # Importation de timedelta
 
 import environ
@@ -11,6 +12,7 @@ env = environ.Env(
     DEBUG=(bool, True),
     SECRET_KEY=(str, "django-insecure-change-me"),
     ALLOWED_HOSTS=(list, ["*"]),
+    QUIZ_PARTIAL_CREDIT=(str, "proportional"),
 )
 
 environ.Env.read_env(os.path.join(BASE_DIR, ".env"))
@@ -42,6 +44,7 @@ INSTALLED_APPS = [
     "core",
     "tp_td",
     "messaging",
+    "gradebook",
 ]
 
 MIDDLEWARE = [
@@ -76,12 +79,29 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
+# Base de données: URL au format django-environ (sqlite:///chemin, postgres://user:mdp@hôte:5432/nom...)
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": env.db("DATABASE_URL", default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
 }
+# Connexions persistantes (secondes, 0 = une connexion par requête), vérifiées avant réutilisation
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=60)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # SQLite: journal WAL (les lectures ne bloquent plus les écritures), attente du verrou au lieu
+    # de « database is locked », et transactions IMMEDIATE pour prendre le verrou d'écriture dès le BEGIN.
+    DATABASES["default"].setdefault("OPTIONS", {}).update({
+        "timeout": env.int("SQLITE_BUSY_TIMEOUT", default=20),
+        "transaction_mode": "IMMEDIATE",
+        "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+    })
+
+# Caches: URL au format django-environ (locmemcache://, filecache:///chemin, rediscache://hôte:6379/1...)
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+    "dashboards": env.cache("DASHBOARD_CACHE_URL", default="locmemcache://dashboards"),
+}
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=300)
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -105,6 +125,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "X-Previous-Cursor", "ETag"]
 
 # DRF
 REST_FRAMEWORK = {
@@ -151,3 +172,42 @@ SIMPLE_JWT = {
 }
 
 AUTH_USER_MODEL = 'accounts.User'
+
+# Correction automatique des quiz: 'proportional' ou 'none' (tout ou rien) pour les questions à choix multiple
+QUIZ_PARTIAL_CREDIT = env("QUIZ_PARTIAL_CREDIT")
+# Tolérance (secondes) accordée après la fin d'une tentative de quiz avant de refuser la soumission
+QUIZ_SUBMISSION_GRACE_SECONDS = env.int("QUIZ_SUBMISSION_GRACE_SECONDS", default=30)
+
+# Messagerie temps réel (SSE): backend de diffusion et paramètres du flux
+MESSAGING_BROKER = env("MESSAGING_BROKER", default="messaging.pubsub.InMemoryBroker")
+MESSAGING_STREAM_HEARTBEAT = env.int("MESSAGING_STREAM_HEARTBEAT", default=15)
+MESSAGING_STREAM_MAX_SECONDS = env.int("MESSAGING_STREAM_MAX_SECONDS", default=300)
+
+# Inscriptions en masse: taille des lots et nombre de processus de hachage (0 = dans le thread du job)
+INSCRIPTION_BATCH_SIZE = env.int("INSCRIPTION_BATCH_SIZE", default=500)
+INSCRIPTION_HASH_WORKERS = env.int("INSCRIPTION_HASH_WORKERS", default=None)
+# Durée (minutes) pendant laquelle les mots de passe générés restent téléchargeables
+INSCRIPTION_CREDENTIALS_TTL_MINUTES = env.int("INSCRIPTION_CREDENTIALS_TTL_MINUTES", default=60)
+
+# Sous "manage.py test", les threads d'arrière-plan sont désactivés: la base de test n'est pas
+# visible depuis un autre thread, et les écritures différées sont faites immédiatement.
+TESTING = sys.argv[1:2] == ["test"]
+
+# Notifications écrites par un thread d'arrière-plan (False: directement à la validation de la transaction)
+NOTIFICATIONS_IN_BACKGROUND = env.bool("NOTIFICATIONS_IN_BACKGROUND", default=not TESTING)
+
+# Journal d'activité écrit par lots: taille d'un lot, délai maximal avant écriture (secondes),
+# nombre maximal d'événements gardés en mémoire quand l'écriture échoue
+ACTIVITY_LOG_BATCH_SIZE = env.int("ACTIVITY_LOG_BATCH_SIZE", default=1 if TESTING else 200)
+ACTIVITY_LOG_FLUSH_SECONDS = env.float("ACTIVITY_LOG_FLUSH_SECONDS", default=5)
+ACTIVITY_LOG_MAX_PENDING = env.int("ACTIVITY_LOG_MAX_PENDING", default=10000)
+ACTIVITY_LOG_IN_BACKGROUND = env.bool("ACTIVITY_LOG_IN_BACKGROUND", default=not TESTING)
+
+# Archivage (manage.py archive_logs): rétention en jours dans les tables, archives JSON Lines gzip par année
+ACTIVITY_LOG_RETENTION_DAYS = env.int("ACTIVITY_LOG_RETENTION_DAYS", default=365)
+NOTIFICATION_RETENTION_DAYS = env.int("NOTIFICATION_RETENTION_DAYS", default=180)
+ARCHIVE_DIR = env("ARCHIVE_DIR", default=str(BASE_DIR / "archives"))
+
+# Délibérations: moyenne /20 et part des crédits de l'auditoire à valider pour réussir
+DELIBERATION_PASS_AVERAGE = env.float("DELIBERATION_PASS_AVERAGE", default=10)
+DELIBERATION_MIN_CREDIT_RATIO = env.float("DELIBERATION_MIN_CREDIT_RATIO", default=1.0)
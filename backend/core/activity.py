@@ -0,0 +1,111 @@
+"""
+Journal d'activité (ActivityLog) écrit par lots.
+
+log_activity() ne fait qu'ajouter l'événement à un tampon en mémoire, à la validation de la
+transaction en cours (une action annulée n'est pas journalisée): aucune requête SQL dans la
+requête HTTP. Le tampon est vidé par un seul bulk_create lorsqu'il atteint
+ACTIVITY_LOG_BATCH_SIZE événements ou que le plus ancien a ACTIVITY_LOG_FLUSH_SECONDS,
+par un thread d'arrière-plan, et à l'arrêt du processus (atexit). Sans thread
+(ACTIVITY_LOG_IN_BACKGROUND=False), les seuils sont vérifiés à chaque ajout et le lot est
+écrit dans le thread appelant. Un lot dont l'écriture échoue est remis dans le tampon, borné
+à ACTIVITY_LOG_MAX_PENDING événements (les plus anciens sont abandonnés au-delà). Un arrêt
+brutal (kill -9) perd les événements en attente.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ActivityBuffer:
+    def __init__(self):
+        self._events = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def append(self, event):
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.append(event)
+            full = len(self._events) >= _setting('ACTIVITY_LOG_BATCH_SIZE', 200)
+            expired = time.monotonic() - self._oldest >= _setting('ACTIVITY_LOG_FLUSH_SECONDS', 5)
+        if _setting('ACTIVITY_LOG_IN_BACKGROUND', True):
+            self._ensure_thread()
+            if full:
+                self._wakeup.set()
+        elif full or expired:
+            self.flush()
+
+    def flush(self):
+        """Écrit les événements en attente. Retourne le nombre de lignes écrites."""
+        with self._lock:
+            events, oldest = self._events, self._oldest
+            self._events, self._oldest = [], None
+        if not events:
+            return 0
+        try:
+            ActivityLog.objects.bulk_create(events, batch_size=500)
+        except Exception:
+            logger.exception("Échec de l'écriture de %d événement(s) du journal d'activité", len(events))
+            self._restore(events, oldest)
+            return 0
+        return len(events)
+
+    def _restore(self, events, oldest):
+        """Remet en tête du tampon un lot non écrit, dans la limite de ACTIVITY_LOG_MAX_PENDING."""
+        with self._lock:
+            pending = events + self._events
+            dropped = len(pending) - _setting('ACTIVITY_LOG_MAX_PENDING', 10000)
+            if dropped > 0:
+                pending = pending[dropped:]
+                logger.error("Journal d'activité: %d événement(s) abandonné(s), tampon plein", dropped)
+            self._events = pending
+            self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(_setting('ACTIVITY_LOG_FLUSH_SECONDS', 5))
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+                    self._thread.start()
+
+
+buffer = ActivityBuffer()
+atexit.register(buffer.flush)
+
+
+def log_activity(actor_id, action_type, details=''):
+    """Enregistre une action (voir ActivityLog.ACTION_TYPES) à la validation de la transaction, sans accès à la base."""
+    event = ActivityLog(actor_id=actor_id, action_type=action_type, details=details, timestamp=timezone.now())
+    transaction.on_commit(lambda: buffer.append(event))
+
+
+def flush():
+    return buffer.flush()
@@ -5,17 +5,23 @@ from .models import Notification, ActivityLog
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
     list_display = ('target_user', 'notification_type', 'is_read', 'created_at')
-    list_filter = ('notification_type', 'is_read', 'target_user')
-    search_fields = ('target_user__username', 'message')
+    # Pas de filtre sur target_user: il listerait tous les utilisateurs (voir core.archive pour les anciennes lignes)
+    list_filter = ('notification_type', 'is_read')
+    search_fields = ('target_user__matricule', 'message')
     date_hierarchy = 'created_at'
+    list_select_related = ('target_user',)
+    raw_id_fields = ('target_user',)
+    show_full_result_count = False
 
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
     list_display = ('actor', 'action_type', 'timestamp')
-    list_filter = ('action_type', 'actor')
-    search_fields = ('actor__username', 'details')
+    list_filter = ('action_type',)
+    search_fields = ('actor__matricule', 'details')
     date_hierarchy = 'timestamp'
+    list_select_related = ('actor',)
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         # Personne ne peut ajouter de journaux manuellement
@@ -0,0 +1,127 @@
+"""
+Archivage du journal d'activité et des notifications.
+
+Les lignes plus anciennes que l'horizon de rétention (ACTIVITY_LOG_RETENTION_DAYS,
+NOTIFICATION_RETENTION_DAYS) sont écrites dans un fichier JSON Lines compressé par année,
+ARCHIVE_DIR/<modèle>/<année>.jsonl.gz, puis supprimées des tables. Chaque passage ajoute un
+membre gzip au fichier de l'année, que gzip relit comme un seul flux. Le fichier est écrit et
+synchronisé sur disque avant la suppression des lignes: une interruption entre les deux peut
+dupliquer des lignes dans l'archive, jamais en perdre; read_archive ignore les doublons (id).
+"""
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters
+from .models import ActivityLog, Notification
+
+CHUNK_SIZE = 5000
+
+# Modèle archivé -> (champ de date, réglage de rétention, rétention par défaut en jours)
+ARCHIVED = {
+    'activitylog': (ActivityLog, 'timestamp', 'ACTIVITY_LOG_RETENTION_DAYS', 365),
+    'notification': (Notification, 'created_at', 'NOTIFICATION_RETENTION_DAYS', 180),
+}
+
+
+class ArchiveEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder tronque les microsecondes: les dates sont archivées telles quelles."""
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def archive_dir():
+    return Path(getattr(settings, 'ARCHIVE_DIR', settings.BASE_DIR / 'archives'))
+
+
+def archive_path(name, year):
+    return archive_dir() / name / f"{year}.jsonl.gz"
+
+
+def archived_years(name):
+    folder = archive_dir() / name
+    if not folder.is_dir():
+        return []
+    return sorted(int(path.name.split('.')[0]) for path in folder.glob('*.jsonl.gz'))
+
+
+def cutoff(name, now=None):
+    _, _, setting, default = ARCHIVED[name]
+    return (now or timezone.now()) - timedelta(days=getattr(settings, setting, default))
+
+
+def _append(name, year, rows):
+    path = archive_path(name, year)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+            for row in rows:
+                archive.write(json.dumps(row, cls=ArchiveEncoder, ensure_ascii=False).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def archive(name, before=None, dry_run=False):
+    """Archive les lignes de name antérieures à before (par défaut: l'horizon de rétention). Retourne leur nombre."""
+    model, date_field, _, _ = ARCHIVED[name]
+    before = before or cutoff(name)
+    fields = [field.attname for field in model._meta.concrete_fields]
+    old = model.objects.filter(**{f'{date_field}__lt': before})
+    if dry_run:
+        return old.count()
+
+    archived = 0
+    while True:
+        rows = list(old.order_by('id').values(*fields)[:CHUNK_SIZE])
+        if not rows:
+            return archived
+        by_year = defaultdict(list)
+        for row in rows:
+            by_year[timezone.localtime(row[date_field]).year].append(row)
+        for year, year_rows in by_year.items():
+            _append(name, year, year_rows)
+        ids = [row['id'] for row in rows]
+        with transaction.atomic():
+            if model is Notification:
+                # Les notifications non lues archivées ne comptent plus dans le badge
+                unread = Notification.objects.filter(id__in=ids, is_read=False).values('target_user_id').annotate(n=Count('id')).order_by()
+                for row in unread:
+                    counters.decrement(row['target_user_id'], row['n'])
+            model.objects.filter(id__in=ids).delete()
+        archived += len(rows)
+
+
+def read_archive(name, year, since=None, until=None, **filters):
+    """
+    Lignes archivées de l'année (dicts, dates en datetime), filtrées par intervalle de dates
+    et par égalité de champs (ex.: actor_id=12, action_type='user_login').
+    """
+    path = archive_path(name, year)
+    if not path.exists():
+        return
+    _, date_field, _, _ = ARCHIVED[name]
+    seen = set()
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            row = json.loads(line)
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            if any(row.get(field) != value for field, value in filters.items()):
+                continue
+            row[date_field] = parse_datetime(row[date_field])
+            if (since and row[date_field] < since) or (until and row[date_field] >= until):
+                continue
+            yield row
@@ -0,0 +1,53 @@
+"""
+Compteurs de notifications non lues (UnreadCounter), un par utilisateur.
+
+Les compteurs sont modifiés par UPDATE ... SET unread = unread + n dans la transaction qui
+crée ou lit les notifications: le badge se lit ensuite par clé primaire, sans COUNT(*).
+reconcile() recalcule les compteurs depuis Notification (suppressions dans l'admin,
+modifications directes en base) et corrige ceux qui ont dérivé.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadCounter
+
+
+def increment(user_ids, by=1):
+    """Ajoute by au compteur de chaque utilisateur (un même utilisateur ne doit figurer qu'une fois)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    with transaction.atomic(savepoint=False):
+        UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(unread=F('unread') + by)
+
+
+def decrement(user_id, by):
+    if by:
+        UnreadCounter.objects.filter(user_id=user_id).update(unread=Greatest(F('unread') - by, 0))
+
+
+def unread_count(user_id):
+    return UnreadCounter.objects.filter(user_id=user_id).values_list('unread', flat=True).first() or 0
+
+
+def reconcile():
+    """Corrige les compteurs qui ne correspondent plus aux notifications. Retourne le nombre de corrections."""
+    repaired = 0
+    with transaction.atomic():
+        # Compté après le verrou: un lot de notifications validé entre-temps attend ce verrou pour
+        # incrémenter les compteurs, et s'ajoute donc à la valeur corrigée au lieu d'être effacé
+        stored = dict(UnreadCounter.objects.select_for_update().values_list('user_id', 'unread'))
+        actual = dict(
+            Notification.objects.filter(is_read=False).values('target_user_id')
+            .annotate(n=Count('id')).order_by().values_list('target_user_id', 'n')
+        )
+        missing = [UnreadCounter(user_id=user_id, unread=n) for user_id, n in actual.items() if user_id not in stored]
+        UnreadCounter.objects.bulk_create(missing, batch_size=500, ignore_conflicts=True)
+        repaired += len(missing)
+        for user_id, unread in stored.items():
+            if actual.get(user_id, 0) != unread:
+                UnreadCounter.objects.filter(user_id=user_id).update(unread=actual.get(user_id, 0))
+                repaired += 1
+    return repaired
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.archive import ARCHIVED, archive, cutoff
+
+class Command(BaseCommand):
+    help = "Archive le journal d'activité et les notifications plus anciens que l'horizon de rétention (JSON Lines gzip par année)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', choices=sorted(ARCHIVED), help="Par défaut: tous.")
+        parser.add_argument('--older-than-days', type=int, default=None, help="Remplace l'horizon de rétention configuré.")
+        parser.add_argument('--dry-run', action='store_true', help="Compter les lignes à archiver sans rien modifier.")
+
+    def handle(self, *args, **options):
+        for name in options['models'] or sorted(ARCHIVED):
+            before = cutoff(name)
+            if options['older_than_days'] is not None:
+                before = timezone.now() - timedelta(days=options['older_than_days'])
+            count = archive(name, before=before, dry_run=options['dry_run'])
+            verb = 'à archiver' if options['dry_run'] else 'archivée(s)'
+            self.stdout.write(self.style.SUCCESS(f"{name}: {count} ligne(s) {verb} (avant le {before:%Y-%m-%d})."))
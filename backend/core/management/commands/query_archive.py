@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.archive import ARCHIVED, archived_years, read_archive
+
+
+def _moment(value, option):
+    """Date/heure ISO de l'option; sans fuseau, elle est lue dans le fuseau du projet."""
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise CommandError(f"--{option}: date/heure ISO invalide ({value}).")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = "Affiche (JSON Lines) les lignes archivées d'une année, avec filtres facultatifs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(ARCHIVED))
+        parser.add_argument('year', type=int, nargs='?', help="Sans année: liste les années archivées.")
+        parser.add_argument('--user', type=int, help="actor_id (journal) ou target_user_id (notifications).")
+        parser.add_argument('--type', help="action_type (journal) ou notification_type (notifications).")
+        parser.add_argument('--since', help="Date/heure ISO de début.")
+        parser.add_argument('--until', help="Date/heure ISO de fin (exclue).")
+
+    def handle(self, *args, **options):
+        name = options['model']
+        if options['year'] is None:
+            self.stdout.write(' '.join(str(year) for year in archived_years(name)) or 'Aucune archive.')
+            return
+        if options['year'] not in archived_years(name):
+            raise CommandError(f"Aucune archive {name} pour {options['year']}.")
+        filters = {}
+        if options['user'] is not None:
+            filters['actor_id' if name == 'activitylog' else 'target_user_id'] = options['user']
+        if options['type']:
+            filters['action_type' if name == 'activitylog' else 'notification_type'] = options['type']
+        since = _moment(options['since'], 'since') if options['since'] else None
+        until = _moment(options['until'], 'until') if options['until'] else None
+        for row in read_archive(name, options['year'], since=since, until=until, **filters):
+            self.stdout.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
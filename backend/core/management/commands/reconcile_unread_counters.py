@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core.counters import reconcile
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de notifications non lues depuis la table des notifications et corrige les écarts."
+
+    def handle(self, *args, **options):
+        repaired = reconcile()
+        self.stdout.write(self.style.SUCCESS(f'{repaired} compteur(s) corrigé(s).'))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:05
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill(apps, schema_editor):
+    """Un compteur par utilisateur ayant des notifications non lues."""
+    Notification = apps.get_model('core', 'Notification')
+    UnreadCounter = apps.get_model('core', 'UnreadCounter')
+    unread = (
+        Notification.objects.filter(is_read=False).values('target_user_id')
+        .annotate(n=Count('id')).order_by().values_list('target_user_id', 'n')
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, unread=n) for user_id, n in unread],
+        batch_size=500, ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_unread_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
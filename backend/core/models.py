@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Notification(models.Model):
     NOTIFICATION_TYPES = (
@@ -12,9 +13,17 @@ class Notification(models.Model):
     target_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES)
+    category = models.CharField(max_length=20, blank=True) # Filtre de l'interface: 'tptd', 'quiz', 'finance', 'exam'
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Index partiel: seules les notifications non lues y figurent (compteur de non-lus)
+            models.Index(fields=['target_user'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            models.Index(fields=['target_user', '-created_at'], name='notification_user_date_idx'),
+        ]
+
     def __str__(self):
         return f"Notification for {self.target_user.matricule}: {self.message[:50]}..."
 
@@ -32,9 +41,24 @@ class ActivityLog(models.Model):
     actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='actions')
     action_type = models.CharField(max_length=50, choices=ACTION_TYPES)
     details = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Heure de l'action, pas de l'écriture: les événements sont écrits par lots (core.activity)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp'], name='activitylog_timestamp_idx'),
+        ]
 
     def __str__(self):
         if self.actor:
             return f"{self.actor.matricule} performed action: {self.get_action_type_display()}"
         return f"System action: {self.get_action_type_display()}"
+
+
+class UnreadCounter(models.Model):
+    """Nombre de notifications non lues d'un utilisateur, tenu à jour par core.counters."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    unread = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} non lue(s)"
@@ -0,0 +1,115 @@
+"""
+Diffusion des notifications aux étudiants.
+
+Les vues et les signaux appellent notify_auditoire / notify_users: l'événement est mis en
+file à la validation de la transaction, et un thread d'arrière-plan unique écrit les lignes
+Notification par bulk_create (une ligne par destinataire), hors de la requête HTTP, et
+incrémente leurs compteurs de non-lues (core.counters).
+NOTIFICATIONS_IN_BACKGROUND=False écrit les notifications directement, dans le
+on_commit (tests, commandes). La file est en mémoire: des événements encore en attente
+sont perdus si le processus s'arrête.
+"""
+import logging
+import queue
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from . import counters
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+# auditoire_id: tous les étudiants de l'auditoire; user_ids: destinataires explicites
+Event = namedtuple('Event', 'notification_type category message auditoire_id user_ids')
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def recipients(event):
+    User = get_user_model()
+    if event.auditoire_id is not None:
+        return User.objects.filter(role='etudiant', current_auditoire_id=event.auditoire_id).values_list('id', flat=True)
+    return event.user_ids or []
+
+
+def deliver(event):
+    """Écrit une Notification par destinataire. Retourne le nombre de lignes créées."""
+    created = 0
+    batch = []
+    ids = recipients(event)
+    if hasattr(ids, 'iterator'):
+        ids = ids.iterator(chunk_size=BATCH_SIZE)
+    for user_id in ids:
+        batch.append(user_id)
+        if len(batch) >= BATCH_SIZE:
+            created += _write(event, batch)
+            batch = []
+    if batch:
+        created += _write(event, batch)
+    return created
+
+
+def _write(event, user_ids):
+    with transaction.atomic():
+        Notification.objects.bulk_create([
+            Notification(target_user_id=user_id, notification_type=event.notification_type,
+                         category=event.category, message=event.message)
+            for user_id in user_ids
+        ])
+        counters.increment(user_ids)
+    return len(user_ids)
+
+
+def _run():
+    while True:
+        event = _queue.get()
+        try:
+            deliver(event)
+        except Exception:
+            logger.exception("Échec de la diffusion de la notification %s", event.notification_type)
+        finally:
+            connection.close()
+            _queue.task_done()
+
+
+def _ensure_worker():
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="notifications", daemon=True)
+            _worker.start()
+
+
+def dispatch(event):
+    if getattr(settings, 'NOTIFICATIONS_IN_BACKGROUND', True):
+        _ensure_worker()
+        _queue.put(event)
+    else:
+        deliver(event)
+
+
+def wait(timeout=None):
+    """Attend que la file soit vide (arrêt propre, tests)."""
+    with _queue.all_tasks_done:
+        return _queue.all_tasks_done.wait_for(lambda: not _queue.unfinished_tasks, timeout)
+
+
+def notify_auditoire(auditoire_id, notification_type, message, category=''):
+    """Notifie tous les étudiants d'un auditoire, après la validation de la transaction."""
+    event = Event(notification_type, category, message, auditoire_id, None)
+    transaction.on_commit(lambda: dispatch(event))
+
+
+def notify_users(user_ids, notification_type, message, category=''):
+    user_ids = list(user_ids)
+    if user_ids:
+        event = Event(notification_type, category, message, None, user_ids)
+        transaction.on_commit(lambda: dispatch(event))
@@ -0,0 +1,28 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(*key):
+    """Curseur opaque construit sur la clé de tri de la dernière ligne d'une page."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor, *types):
+    """Clé d'un curseur, dont chaque élément doit être du type donné à sa position. Lève ValueError sinon."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Curseur invalide")
+    if not isinstance(key, list) or len(key) != len(types):
+        raise ValueError("Curseur invalide")
+    if not all(isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(key, types)):
+        raise ValueError("Curseur invalide")
+    return key
+
+
+def parse_limit(value, default, maximum):
+    """Taille de page bornée à [1, maximum]. Lève ValueError si value n'est pas un entier."""
+    if value in (None, ''):
+        return default
+    return min(max(int(value), 1), maximum)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from academics.models import Paiement
+from evaluations.models import Assignment, Submission, Quiz, QuizSubmission
+from .activity import log_activity
+from .notifications import notify_auditoire, notify_users
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Assignment)
+def assignment_created(sender, instance, created, **kwargs):
+    if created:
+        course = instance.course
+        notify_auditoire(
+            course.auditoire_id, 'new_assignment',
+            f"Nouveau {instance.type} « {instance.title} » en {course.name}, à rendre le {instance.deadline:%d/%m/%Y à %H:%M}.",
+            category='tptd',
+        )
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_created(sender, instance, created, **kwargs):
+    if created:
+        course = instance.course
+        notify_auditoire(course.auditoire_id, 'new_assignment', f"Nouveau quiz « {instance.title} » en {course.name}.", category='quiz')
+
+
+def _remember(instance, field):
+    # Valeur enregistrée avant cette sauvegarde: seule une première note déclenche une notification
+    instance._previous_result = None
+    if instance.pk and getattr(instance, field) is not None:
+        instance._previous_result = type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=Submission)
+def submission_saving(sender, instance, **kwargs):
+    _remember(instance, 'grade')
+
+
+@receiver(pre_save, sender=QuizSubmission)
+def quiz_submission_saving(sender, instance, **kwargs):
+    _remember(instance, 'score')
+
+
+@receiver(post_save, sender=Submission)
+def submission_graded(sender, instance, **kwargs):
+    if instance.grade is not None and getattr(instance, '_previous_result', None) is None:
+        assignment = instance.assignment
+        notify_users(
+            [instance.student_id], 'results_available',
+            f"Note disponible pour « {assignment.title} »: {instance.grade:g}/{assignment.total_points}.",
+            category='tptd',
+        )
+
+
+@receiver(post_save, sender=QuizSubmission)
+def quiz_submission_graded(sender, instance, **kwargs):
+    if instance.score is not None and getattr(instance, '_previous_result', None) is None:
+        quiz = instance.quiz
+        notify_users(
+            [instance.student_id], 'results_available',
+            f"Résultat disponible pour le quiz « {quiz.title} »: {instance.score:g}/{quiz.total_points}.",
+            category='quiz',
+        )
+
+
+@receiver(post_save, sender=User)
+def user_logged_in(sender, instance, created, update_fields=None, **kwargs):
+    # update_last_login (connexion admin ou jeton JWT avec UPDATE_LAST_LOGIN) n'enregistre que last_login
+    if not created and update_fields is not None and set(update_fields) == {'last_login'}:
+        log_activity(instance.id, 'user_login')
+
+
+@receiver(post_save, sender=Paiement)
+def payment_recorded(sender, instance, created, **kwargs):
+    if created:
+        log_activity(instance.student_id, 'payment', f"Tranche {instance.tranche_number} ({instance.academic_year}): {instance.amount}")
@@ -0,0 +1,269 @@
+import io
+import json
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import Section, Departement, Auditoire, Course
+from evaluations.models import Assignment, Submission, Quiz
+from . import activity, counters, notifications
+from .archive import archive, archived_years, read_archive
+from .activity import log_activity
+from .counters import reconcile
+from .models import ActivityLog, Notification, UnreadCounter
+
+User = get_user_model()
+
+
+class NotificationFanOutTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        other = Auditoire.objects.create(name="Licence 2", departement=departement)
+        cls.course = Course.objects.create(name="Algorithmique", auditoire=cls.auditoire)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        cls.students = [
+            User.objects.create_user(matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", role="etudiant", current_auditoire=cls.auditoire)
+            for i in range(5)
+        ]
+        User.objects.create_user(matricule="ETU-X", password="x", email="etux@ex.com", role="etudiant", current_auditoire=other)
+
+    def create_assignment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Assignment.objects.create(course=self.course, assistant=self.assistant, title="TP1", total_points=20, deadline=timezone.now())
+
+    def test_new_assignment_reaches_every_student_of_the_auditoire(self):
+        self.create_assignment()
+        with self.captureOnCommitCallbacks(execute=True):
+            Quiz.objects.create(course=self.course, assistant=self.assistant, title="Quiz 1")
+        rows = Notification.objects.filter(notification_type='new_assignment')
+        self.assertEqual(sorted(rows.values_list('target_user__matricule', flat=True).distinct()), [s.matricule for s in self.students])
+        self.assertEqual(sorted(rows.values_list('category', flat=True).distinct()), ['quiz', 'tptd'])
+
+    def test_delivery_is_one_bulk_insert(self):
+        event = notifications.Event('new_assignment', 'tptd', "Nouveau TP", self.auditoire.id, None)
+        # Destinataires, puis dans un savepoint: notifications, compteurs manquants, incrément des compteurs
+        with self.assertNumQueries(6):
+            self.assertEqual(notifications.deliver(event), 5)
+        self.assertEqual(sorted(UnreadCounter.objects.values_list('unread', flat=True)), [1] * 5)
+
+    def test_first_grade_notifies_the_student_once(self):
+        assignment = self.create_assignment()
+        student = self.students[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            submission = Submission.objects.create(assignment=assignment, student=student, status="soumis")
+        with self.captureOnCommitCallbacks(execute=True):
+            submission.grade = 15
+            submission.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            submission.grade = 16
+            submission.save()
+        results = Notification.objects.filter(notification_type='results_available')
+        self.assertEqual([(n.target_user_id, n.message) for n in results], [(student.id, "Note disponible pour « TP1 »: 15/20.")])
+
+    def test_unread_count_and_mark_read(self):
+        self.create_assignment()
+        client = APIClient()
+        client.force_authenticate(self.students[0])
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get("/api/notifications/unread-count").data, {"unread": 1})
+        items = client.get("/api/student/notifications").data
+        self.assertEqual([(n["type"], n["read"]) for n in items], [("tptd", False)])
+        self.assertEqual(client.get("/api/student/notifications?limit=abc").status_code, 400)
+        self.assertEqual(client.post("/api/notifications/read", {"ids": ["abc"]}, format="json").status_code, 400)
+        self.assertEqual(client.post("/api/notifications/read", {"ids": items[0]["id"]}, format="json").status_code, 400)
+        self.assertEqual(client.post("/api/notifications/read", {"ids": [items[0]["id"]]}, format="json").data, {"updated": 1})
+        self.assertEqual(client.get("/api/notifications/unread-count").data, {"unread": 0})
+        self.assertEqual(client.post("/api/notifications/read", {}, format="json").data, {"updated": 0})
+        self.assertEqual(client.get("/api/notifications/unread-count").data, {"unread": 0})
+
+    def test_reconcile_repairs_drift(self):
+        self.create_assignment()
+        self.create_assignment()
+        first, second, third = self.students[:3]
+        Notification.objects.filter(target_user=first).delete()
+        UnreadCounter.objects.filter(user=second).delete()
+        Notification.objects.filter(target_user=third).update(is_read=True)
+        self.assertEqual(reconcile(), 3)
+        counts = dict(UnreadCounter.objects.values_list('user_id', 'unread'))
+        self.assertEqual([counts.get(s.id) for s in self.students], [0, 2, 0, 2, 2])
+        self.assertEqual(reconcile(), 0)
+
+    def test_reconcile_counts_under_the_counter_lock(self):
+        self.create_assignment()
+        student = self.students[0]
+        with CaptureQueriesContext(connection) as ctx:
+            reconcile()
+        queries = [q["sql"] for q in ctx.captured_queries]
+        lock = next(i for i, sql in enumerate(queries) if 'FROM "core_unreadcounter"' in sql)
+        count = next(i for i, sql in enumerate(queries) if 'COUNT(' in sql and 'core_notification' in sql)
+        self.assertLess(lock, count)
+        self.assertEqual(counters.unread_count(student.id), 1)
+
+    @override_settings(NOTIFICATIONS_IN_BACKGROUND=True)
+    def test_background_worker_delivers_outside_the_request(self):
+        event = notifications.Event('new_assignment', 'tptd', "Nouveau TP", self.auditoire.id, None)
+        threads = []
+        with mock.patch.object(notifications, 'deliver', side_effect=lambda e: threads.append(threading.current_thread().name)) as deliver:
+            notifications.dispatch(event)
+            self.assertTrue(notifications.wait(timeout=5))
+        deliver.assert_called_once_with(event)
+        self.assertEqual(threads, ["notifications"])
+
+
+@override_settings(ACTIVITY_LOG_IN_BACKGROUND=False, ACTIVITY_LOG_BATCH_SIZE=50, ACTIVITY_LOG_FLUSH_SECONDS=60)
+class ActivityLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant")
+
+    def setUp(self):
+        activity.buffer.flush()
+
+    def test_logging_costs_no_query_until_the_batch_is_full(self):
+        with self.assertNumQueries(0), self.captureOnCommitCallbacks(execute=True):
+            started = time.perf_counter()
+            for i in range(49):
+                log_activity(self.user.id, 'submission', f"Soumission {i}")
+            per_call = (time.perf_counter() - started) / 49
+        # Coût d'un appel dans la requête: un ajout à une liste, bien en deçà d'une milliseconde
+        self.assertLess(per_call, 0.001)
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            log_activity(self.user.id, 'submission', "Soumission 49")
+        self.assertEqual(ActivityLog.objects.count(), 50)
+        self.assertEqual(len(activity.buffer), 0)
+
+    def test_events_keep_their_own_timestamp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            log_activity(self.user.id, 'user_login')
+        logged_at = activity.buffer._events[0].timestamp
+        self.assertEqual(activity.flush(), 1)
+        self.assertEqual(ActivityLog.objects.get().timestamp, logged_at)
+
+    def test_login_is_recorded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            update_last_login(None, self.user)
+        activity.flush()
+        self.assertEqual(list(ActivityLog.objects.values_list('actor_id', 'action_type')), [(self.user.id, 'user_login')])
+
+    def test_rolled_back_actions_are_not_logged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    log_activity(self.user.id, 'payment', "Tranche 1")
+                    raise ValueError
+            except ValueError:
+                pass
+            log_activity(self.user.id, 'user_login')
+        self.assertEqual([e.action_type for e in activity.buffer._events], ['user_login'])
+
+    @override_settings(ACTIVITY_LOG_MAX_PENDING=3)
+    def test_failed_batch_is_kept_up_to_the_cap(self):
+        buffer = activity.ActivityBuffer()
+        for i in range(2):
+            buffer.append(ActivityLog(actor_id=self.user.id, action_type='submission', details=f"Soumission {i}"))
+        with mock.patch.object(ActivityLog.objects, 'bulk_create', side_effect=DatabaseError), self.assertLogs('core.activity', 'ERROR'):
+            self.assertEqual(buffer.flush(), 0)
+            self.assertEqual(len(buffer), 2)
+            buffer.append(ActivityLog(actor_id=self.user.id, action_type='submission', details="Soumission 2"))
+            buffer.append(ActivityLog(actor_id=self.user.id, action_type='submission', details="Soumission 3"))
+            self.assertEqual(buffer.flush(), 0)
+        # Au-delà de la limite, les événements les plus anciens sont abandonnés
+        self.assertEqual([e.details for e in buffer._events], ["Soumission 1", "Soumission 2", "Soumission 3"])
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(ActivityLog.objects.count(), 3)
+
+    @override_settings(ACTIVITY_LOG_IN_BACKGROUND=True, ACTIVITY_LOG_FLUSH_SECONDS=0.05)
+    def test_background_thread_flushes_on_time(self):
+        buffer = activity.ActivityBuffer()
+        written = threading.Event()
+        with mock.patch.object(ActivityLog.objects, 'bulk_create', side_effect=lambda events, **kwargs: written.set()) as bulk_create:
+            buffer.append(ActivityLog(actor_id=self.user.id, action_type='payment'))
+            self.assertTrue(written.wait(timeout=5))
+        self.assertEqual(len(bulk_create.call_args.args[0]), 1)
+        self.assertEqual(len(buffer), 0)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant")
+        cls.other = User.objects.create_user(matricule="ETU-2", password="x", email="etu2@ex.com", role="etudiant")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(ARCHIVE_DIR=directory.name, ACTIVITY_LOG_RETENTION_DAYS=365, NOTIFICATION_RETENTION_DAYS=180)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.now = timezone.now()
+
+    def log(self, days_ago, actor, action_type='user_login'):
+        return ActivityLog.objects.create(actor=actor, action_type=action_type, timestamp=self.now - timedelta(days=days_ago))
+
+    def test_old_rows_move_to_yearly_archives(self):
+        old = [self.log(800, self.user), self.log(400, self.user, 'payment'), self.log(400, self.other)]
+        recent = self.log(10, self.user)
+        self.assertEqual(archive('activitylog'), 3)
+        self.assertEqual(list(ActivityLog.objects.values_list('id', flat=True)), [recent.id])
+
+        years = sorted({timezone.localtime(entry.timestamp).year for entry in old})
+        self.assertEqual(archived_years('activitylog'), years)
+        rows = [row for year in years for row in read_archive('activitylog', year, actor_id=self.user.id)]
+        self.assertEqual(sorted(row['id'] for row in rows), [old[0].id, old[1].id])
+        self.assertEqual({row['timestamp'] for row in rows}, {old[0].timestamp, old[1].timestamp})
+
+        # Un second passage ajoute un membre gzip au fichier de l'année, relu comme un seul flux
+        later = self.log(900, self.other, 'payment')
+        self.assertEqual(archive('activitylog'), 1)
+        year = timezone.localtime(later.timestamp).year
+        self.assertIn(later.id, [row['id'] for row in read_archive('activitylog', year, action_type='payment')])
+
+    def test_archived_unread_notifications_leave_the_badge(self):
+        for i in range(3):
+            Notification.objects.create(target_user=self.user, message=f"N{i}", notification_type='new_assignment')
+        counters.increment([self.user.id], by=3)
+        Notification.objects.filter(message__in=["N0", "N1"]).update(created_at=self.now - timedelta(days=200))
+        self.assertEqual(archive('notification', dry_run=True), 2)
+        self.assertEqual(archive('notification'), 2)
+        self.assertEqual(counters.unread_count(self.user.id), 1)
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_query_archive_command(self):
+        self.log(800, self.user)
+        call_command('archive_logs', 'activitylog', stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('query_archive', 'activitylog', archived_years('activitylog')[0], user=self.user.id, stdout=out)
+        self.assertEqual([json.loads(line)['action_type'] for line in out.getvalue().splitlines()], ['user_login'])
+
+    def test_query_archive_date_range(self):
+        logged = self.log(800, self.user)
+        call_command('archive_logs', 'activitylog', stdout=io.StringIO())
+        year = archived_years('activitylog')[0]
+        day = timezone.localtime(logged.timestamp).date()
+
+        def query(**options):
+            out = io.StringIO()
+            call_command('query_archive', 'activitylog', year, stdout=out, **options)
+            return [json.loads(line)['id'] for line in out.getvalue().splitlines()]
+
+        # Dates sans fuseau: lues dans le fuseau du projet
+        self.assertEqual(query(since=day.isoformat(), until=(day + timedelta(days=1)).isoformat()), [logged.id])
+        self.assertEqual(query(since=(day + timedelta(days=1)).isoformat()), [])
+        self.assertEqual(query(since=logged.timestamp.isoformat()), [logged.id])
+        self.assertEqual(query(until=logged.timestamp.isoformat()), [])
+        with self.assertRaises(CommandError):
+            query(since="hier")
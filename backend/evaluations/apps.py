@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EvaluationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'evaluations'
+
+    def ready(self):
+        from . import quiz_paper  # noqa: F401  (invalidation des copies d'examen)
@@ -0,0 +1,136 @@
+"""
+Correction automatique des quiz.
+
+Les questions 'single' et 'multiple' sont notées à partir de Choice.is_correct ;
+seules les questions 'text' restent à corriger manuellement par l'assistant.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.notifications import notify_users
+from gradebook.engine import rebuild
+
+from .models import QuizSubmission
+
+AUTO_GRADED_TYPES = ('single', 'multiple')
+
+# 'none'         : tout ou rien pour les questions à choix multiple
+# 'proportional' : (bonnes cases cochées - mauvaises cases cochées) / nombre de bonnes réponses, minimum 0
+PARTIAL_CREDIT_MODES = ('none', 'proportional')
+
+
+def _partial_credit_mode(partial_credit=None):
+    mode = partial_credit or getattr(settings, 'QUIZ_PARTIAL_CREDIT', 'proportional')
+    if mode not in PARTIAL_CREDIT_MODES:
+        raise ValueError(f"Mode de crédit partiel inconnu: {mode}")
+    return mode
+
+
+def build_answer_key(quiz):
+    """Retourne {question_id: (type, {ids des bons choix})} en deux requêtes."""
+    key = {}
+    for q in quiz.questions.prefetch_related('choices').order_by('id'):
+        key[q.id] = (q.question_type, {c.id for c in q.choices.all() if c.is_correct})
+    return key
+
+
+def _as_choice_ids(value):
+    if value is None or value == '':
+        return set()
+    if not isinstance(value, (list, tuple, set)):
+        value = [value]
+    ids = set()
+    for v in value:
+        try:
+            ids.add(int(v))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _question_fraction(question_type, correct_ids, answer, mode):
+    selected = _as_choice_ids(answer)
+    if question_type == 'single':
+        return 1.0 if len(selected) == 1 and selected <= correct_ids else 0.0
+
+    if not correct_ids:
+        return 1.0 if not selected else 0.0
+    if mode == 'none':
+        return 1.0 if selected == correct_ids else 0.0
+    hits = len(selected & correct_ids)
+    wrong = len(selected - correct_ids)
+    return max(0.0, (hits - wrong) / len(correct_ids))
+
+
+def grade_answers(answer_key, answers, total_points, partial_credit=None):
+    """
+    Note un dictionnaire de réponses {question_id: réponse}.
+
+    Retourne (points_automatiques, correction_manuelle_requise).
+    """
+    mode = _partial_credit_mode(partial_credit)
+    if not answer_key:
+        return 0.0, False
+
+    answers = answers or {}
+    points_per_question = total_points / len(answer_key)
+    auto_points = 0.0
+    needs_review = False
+    for question_id, (question_type, correct_ids) in answer_key.items():
+        if question_type not in AUTO_GRADED_TYPES:
+            needs_review = True
+            continue
+        answer = answers.get(str(question_id), answers.get(question_id))
+        auto_points += points_per_question * _question_fraction(question_type, correct_ids, answer, mode)
+    return round(auto_points, 2), needs_review
+
+
+def apply_grade(submission, answer_key, partial_credit=None):
+    """Renseigne auto_score, et score si aucune question ne demande de correction manuelle."""
+    auto_points, needs_review = grade_answers(answer_key, submission.answers, submission.quiz.total_points, partial_credit)
+    submission.auto_score = auto_points
+    if not needs_review:
+        submission.score = auto_points
+        submission.graded_at = timezone.now()
+    return needs_review
+
+
+def grade_submission(submission, partial_credit=None):
+    """Corrige une tentative soumise et l'enregistre. Retourne True si une correction manuelle reste à faire."""
+    needs_review = apply_grade(submission, build_answer_key(submission.quiz), partial_credit)
+    submission.save(update_fields=['auto_score', 'score', 'graded_at'])
+    return needs_review
+
+
+def grade_many(submissions, partial_credit=None, batch_size=500):
+    """
+    Corrige des tentatives soumises, éventuellement de plusieurs quiz, avec un seul bulk_update.
+    Retourne leur nombre.
+    """
+    answer_keys = {}
+    newly_graded = defaultdict(list)
+    for submission in submissions:
+        if submission.quiz_id not in answer_keys:
+            answer_keys[submission.quiz_id] = build_answer_key(submission.quiz)
+        previous_score = submission.score
+        apply_grade(submission, answer_keys[submission.quiz_id], partial_credit)
+        if previous_score is None and submission.score is not None:
+            newly_graded[submission.quiz].append(submission.student_id)
+    QuizSubmission.objects.bulk_update(submissions, ['auto_score', 'score', 'graded_at'], batch_size=batch_size)
+    # bulk_update n'envoie pas post_save: le carnet de notes des cours est recalculé et les
+    # étudiants nouvellement notés sont prévenus explicitement
+    course_ids = sorted({submission.quiz.course_id for submission in submissions})
+    if course_ids:
+        transaction.on_commit(lambda: rebuild(course_ids=course_ids))
+    for quiz, student_ids in newly_graded.items():
+        notify_users(student_ids, 'results_available', f"Résultat disponible pour le quiz « {quiz.title} ».", category='quiz')
+    return len(submissions)
+
+
+def regrade_quiz(quiz, partial_credit=None, batch_size=500):
+    """Recorrige toutes les tentatives soumises d'un quiz avec un seul bulk_update."""
+    submissions = list(QuizSubmission.objects.filter(quiz=quiz, status='soumis').select_related('quiz'))
+    return grade_many(submissions, partial_credit, batch_size)
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from evaluations.timer import expire_attempts
+
+class Command(BaseCommand):
+    help = "Clôt et corrige les tentatives de quiz en cours dont le temps est écoulé (à planifier, ex.: toutes les minutes)."
+
+    def handle(self, *args, **options):
+        closed = expire_attempts()
+        self.stdout.write(self.style.SUCCESS(f'{closed} tentative(s) expirée(s) clôturée(s).'))
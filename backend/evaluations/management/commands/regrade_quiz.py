@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from evaluations.grading import PARTIAL_CREDIT_MODES, regrade_quiz
+from evaluations.models import Quiz
+
+class Command(BaseCommand):
+    help = 'Recorrige automatiquement toutes les tentatives soumises des quiz donnés.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='+', type=int)
+        parser.add_argument('--partial-credit', choices=PARTIAL_CREDIT_MODES, default=None)
+
+    def handle(self, *args, **options):
+        for quiz_id in options['quiz_ids']:
+            try:
+                quiz = Quiz.objects.get(id=quiz_id)
+            except Quiz.DoesNotExist:
+                raise CommandError(f'Quiz {quiz_id} introuvable.')
+            count = regrade_quiz(quiz, partial_credit=options['partial_credit'])
+            self.stdout.write(self.style.SUCCESS(f'Quiz "{quiz.title}": {count} tentative(s) recorrigée(s).'))
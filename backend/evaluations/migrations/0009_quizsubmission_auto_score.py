@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0008_quizsubmission_started_at_quizsubmission_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsubmission',
+            name='auto_score',
+            field=models.FloatField(blank=True, help_text='Points obtenus sur les questions à choix, calculés automatiquement', null=True),
+        ),
+    ]
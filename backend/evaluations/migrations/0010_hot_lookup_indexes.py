@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_hot_lookup_indexes'),
+        ('evaluations', '0009_quizsubmission_auto_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['course', 'created_at'], name='assignment_course_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['assistant', 'deadline'], name='assignment_assistant_dl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsubmission',
+            index=models.Index(fields=['quiz', 'status'], name='quizsub_quiz_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsubmission',
+            index=models.Index(fields=['quiz', 'score'], name='quizsub_quiz_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizsubmission',
+            index=models.Index(fields=['student', 'submitted_at'], name='quizsub_student_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'grade'], name='submission_student_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['assignment', 'grade', 'status'], name='submission_assign_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'submitted_at'], name='submission_student_date_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:54
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    """Renseigne la fin des tentatives qui n'en ont pas: un UPDATE par durée de quiz."""
+    QuizSubmission = apps.get_model('evaluations', 'QuizSubmission')
+    missing = QuizSubmission.objects.filter(deadline__isnull=True)
+    for duration in list(missing.values_list('quiz__duration', flat=True).distinct().order_by()):
+        missing.filter(quiz__duration=duration).update(deadline=F('started_at') + timedelta(minutes=duration))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0010_hot_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsubmission',
+            name='deadline',
+            field=models.DateTimeField(blank=True, help_text='Fin de la tentative: début + durée du quiz', null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='quizsubmission',
+            index=models.Index(fields=['status', 'deadline'], name='quizsub_status_deadline_idx'),
+        ),
+    ]
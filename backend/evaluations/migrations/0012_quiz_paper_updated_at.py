@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('evaluations', '0011_quizsubmission_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='paper_updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text="Version de la copie d'examen en cache"),
+        ),
+    ]
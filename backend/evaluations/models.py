@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -25,6 +27,12 @@ class Assignment(models.Model):
     deadline = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['course', 'created_at'], name='assignment_course_created_idx'),
+            models.Index(fields=['assistant', 'deadline'], name='assignment_assistant_dl_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -38,6 +46,13 @@ class Submission(models.Model):
     submitted_at = models.DateTimeField(null=True, blank=True)
     graded_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'grade'], name='submission_student_grade_idx'),
+            models.Index(fields=['assignment', 'grade', 'status'], name='submission_assign_grade_idx'),
+            models.Index(fields=['student', 'submitted_at'], name='submission_student_date_idx'),
+        ]
+
     def __str__(self):
         return f"Submission by {self.student} for {self.assignment.title}"
 
@@ -56,6 +71,7 @@ class Quiz(models.Model):
     duration = models.PositiveIntegerField(default=30, help_text="Durée du quiz en minutes")
     total_points = models.PositiveSmallIntegerField(default=10, help_text="La note maximale pour ce quiz")
     created_at = models.DateTimeField(auto_now_add=True)
+    paper_updated_at = models.DateTimeField(default=timezone.now, help_text="Version de la copie d'examen en cache")
 
     def __str__(self):
         return self.title
@@ -100,15 +116,29 @@ class QuizSubmission(models.Model):
     )
     answers = models.JSONField(default=dict, help_text="Réponses de l'étudiant au format JSON")
     score = models.FloatField(null=True, blank=True)
+    auto_score = models.FloatField(null=True, blank=True, help_text="Points obtenus sur les questions à choix, calculés automatiquement")
     feedback = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=10, choices=SUBMISSION_STATUSES, default='en_cours')
     started_at = models.DateTimeField(default=timezone.now)
+    deadline = models.DateTimeField(null=True, blank=True, help_text="Fin de la tentative: début + durée du quiz")
     submitted_at = models.DateTimeField(null=True, blank=True)
     graded_at = models.DateTimeField(null=True, blank=True)
     submission_reason = models.CharField(max_length=10, choices=SUBMISSION_REASONS, default='manual')
 
     class Meta:
         unique_together = ('student', 'quiz')
+        indexes = [
+            models.Index(fields=['quiz', 'status'], name='quizsub_quiz_status_idx'),
+            models.Index(fields=['quiz', 'score'], name='quizsub_quiz_score_idx'),
+            models.Index(fields=['student', 'submitted_at'], name='quizsub_student_date_idx'),
+            models.Index(fields=['status', 'deadline'], name='quizsub_status_deadline_idx'),
+        ]
 
     def __str__(self):
         return f"Quiz Submission by {self.student} for {self.quiz.title}"
+
+    def save(self, *args, **kwargs):
+        # La durée est figée au début de la tentative: modifier le quiz ne prolonge pas les tentatives en cours
+        if self.deadline is None:
+            self.deadline = self.started_at + timedelta(minutes=self.quiz.duration)
+        super().save(*args, **kwargs)
@@ -0,0 +1,139 @@
+"""
+Création de quiz en masse.
+
+Le contenu complet est validé avant toute écriture, puis le quiz, ses questions et
+leurs choix sont insérés dans une seule transaction avec bulk_create (trois INSERT
+groupés au lieu d'un par question et par choix).
+
+Formats d'import acceptés pour réutiliser une banque de questions:
+- JSON: [{"text": "...", "type": "single|multiple|text", "choices": [{"text": "...", "is_correct": true}]}]
+- CSV (en-tête obligatoire): question,type,choices,correct
+  où choices sépare les choix par « | » et correct donne les positions (à partir de 1) des bons choix, ex. « 1|3 ».
+"""
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .models import Quiz, Question, Choice
+from .quiz_paper import invalidate_paper
+
+CHOICE_TYPES = ('single', 'multiple')
+QUESTION_TYPES = tuple(code for code, _ in Question.QUESTION_TYPES)
+CSV_COLUMNS = ('question', 'type', 'choices', 'correct')
+
+
+class QuizImportError(ValueError):
+    pass
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'vrai', 'oui', 'yes')
+    return bool(value)
+
+
+def parse_questions(questions):
+    """Valide et normalise une liste de questions. Lève QuizImportError à la première erreur."""
+    if not isinstance(questions, list) or not questions:
+        raise QuizImportError("La liste des questions est vide ou invalide.")
+
+    parsed = []
+    for index, q_data in enumerate(questions, start=1):
+        if not isinstance(q_data, dict):
+            raise QuizImportError(f"Question {index}: format invalide.")
+        text = str(q_data.get('text') or '').strip()
+        q_type = q_data.get('type')
+        if not text:
+            raise QuizImportError(f"Question {index}: l'énoncé est requis.")
+        if q_type not in QUESTION_TYPES:
+            raise QuizImportError(f"Question {index}: type '{q_type}' inconnu.")
+
+        choices = []
+        if q_type in CHOICE_TYPES:
+            for c_data in q_data.get('choices') or []:
+                if not isinstance(c_data, dict):
+                    raise QuizImportError(f"Question {index}: choix invalide.")
+                choice_text = str(c_data.get('text') or '').strip()
+                if not choice_text:
+                    raise QuizImportError(f"Question {index}: un choix n'a pas de texte.")
+                choices.append({'text': choice_text, 'is_correct': _as_bool(c_data.get('is_correct'))})
+            correct = sum(1 for c in choices if c['is_correct'])
+            if not choices:
+                raise QuizImportError(f"Question {index}: au moins un choix est requis.")
+            if correct == 0:
+                raise QuizImportError(f"Question {index}: au moins un choix doit être correct.")
+            if q_type == 'single' and correct != 1:
+                raise QuizImportError(f"Question {index}: une question à choix unique doit avoir exactement une bonne réponse.")
+
+        parsed.append({'text': text, 'type': q_type, 'choices': choices})
+    return parsed
+
+
+def parse_csv(content):
+    """Convertit un CSV de banque de questions au format JSON attendu par parse_questions."""
+    reader = csv.DictReader(io.StringIO(content.lstrip('\ufeff')))
+    if not reader.fieldnames or any(col not in reader.fieldnames for col in CSV_COLUMNS):
+        raise QuizImportError(f"En-tête CSV attendu: {','.join(CSV_COLUMNS)}")
+
+    questions = []
+    for line, row in enumerate(reader, start=2):
+        choices_text = [c.strip() for c in (row['choices'] or '').split('|') if c.strip()]
+        try:
+            correct = {int(p) for p in (row['correct'] or '').split('|') if p.strip()}
+        except ValueError:
+            raise QuizImportError(f"Ligne {line}: colonne 'correct' invalide.")
+        questions.append({
+            'text': row['question'],
+            'type': (row['type'] or '').strip(),
+            'choices': [{'text': c, 'is_correct': i in correct} for i, c in enumerate(choices_text, start=1)],
+        })
+    return questions
+
+
+def load_question_bank(content, filename=''):
+    """Lit une banque de questions JSON ou CSV (selon l'extension, puis le contenu)."""
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise QuizImportError("Le fichier doit être encodé en UTF-8.")
+    if filename.lower().endswith('.csv'):
+        return parse_questions(parse_csv(content))
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return parse_questions(parse_csv(content))
+    if isinstance(data, dict):
+        data = data.get('questions')
+    return parse_questions(data)
+
+
+def _bulk_add_questions(quiz, parsed):
+    questions = Question.objects.bulk_create([
+        Question(quiz=quiz, question_text=q['text'], question_type=q['type']) for q in parsed
+    ])
+    Choice.objects.bulk_create([
+        Choice(question=question, choice_text=c['text'], is_correct=c['is_correct'])
+        for question, q in zip(questions, parsed)
+        for c in q['choices']
+    ])
+    return questions
+
+
+def create_quiz(course, assistant, title, questions, **fields):
+    """Crée un quiz complet de façon atomique. questions doit déjà être passé par parse_questions."""
+    with transaction.atomic():
+        quiz = Quiz.objects.create(course=course, assistant=assistant, title=title, **fields)
+        _bulk_add_questions(quiz, questions)
+    return quiz
+
+
+def import_questions(quiz, questions):
+    """Ajoute des questions (déjà validées) à un quiz existant, de façon atomique."""
+    with transaction.atomic():
+        created = _bulk_add_questions(quiz, questions)
+        # bulk_create n'envoie pas post_save: la version de la copie d'examen est renouvelée explicitement
+        invalidate_paper(quiz.id)
+    return created
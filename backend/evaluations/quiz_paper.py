@@ -0,0 +1,83 @@
+"""
+Copie d'examen des étudiants.
+
+Chaque quiz est compilé une seule fois en un énoncé sérialisé sans Choice.is_correct,
+mis en cache par version. La version est Quiz.paper_updated_at, enregistrée en base et
+renouvelée à chaque modification d'une question ou d'un choix: tous les processus voient
+la nouvelle version dès la validation de la transaction, même avec un cache propre à chaque
+processus. Au démarrage d'un examen, tout l'auditoire est servi depuis le cache au lieu de
+reconstruire l'arbre questions/choix à chaque requête.
+"""
+import threading
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Quiz, Question, Choice
+
+PAPER_TIMEOUT = 60 * 60 * 24
+
+# Verrous répartis par quiz (quiz.id modulo leur nombre): leur nombre ne croît pas avec les quiz
+_compile_locks = [threading.Lock() for _ in range(64)]
+
+
+def _paper_key(quiz_id, version):
+    return f"quiz-paper:{quiz_id}:{version}"
+
+
+def invalidate_paper(quiz_id):
+    """Renouvelle la version de la copie du quiz (dans la transaction en cours)."""
+    Quiz.objects.filter(id=quiz_id).update(paper_updated_at=timezone.now())
+
+
+def compile_paper(quiz):
+    """Construit l'énoncé étudiant du quiz (deux requêtes, sans les bonnes réponses)."""
+    questions = []
+    for q in quiz.questions.prefetch_related('choices').order_by('id'):
+        choices = []
+        if q.question_type in ['single', 'multiple']:
+            choices = [{"id": c.id, "text": c.choice_text} for c in sorted(q.choices.all(), key=lambda c: c.id)]
+        questions.append({
+            "id": q.id,
+            "text": q.question_text,
+            "type": q.question_type,
+            "choices": choices,
+        })
+    return {"questions": questions}
+
+
+def get_student_paper(quiz):
+    """Copie du quiz, dont la version est lue sur l'instance: passer un quiz chargé pour la requête."""
+    key = _paper_key(quiz.id, quiz.paper_updated_at.timestamp())
+    paper = cache.get(key)
+    if paper is not None:
+        return paper
+
+    # Un seul thread par processus compile la copie; les autres attendent puis lisent le cache
+    with _compile_locks[quiz.id % len(_compile_locks)]:
+        paper = cache.get(key)
+        if paper is None:
+            paper = compile_paper(quiz)
+            cache.set(key, paper, timeout=PAPER_TIMEOUT)
+    return paper
+
+
+@receiver(post_save, sender=Quiz)
+def _quiz_saved(sender, instance, created, **kwargs):
+    # Une instance chargée avant une modification des questions réécrirait une ancienne version
+    if not created:
+        invalidate_paper(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def _question_changed(sender, instance, **kwargs):
+    invalidate_paper(instance.quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Choice)
+def _choice_changed(sender, instance, **kwargs):
+    quiz_id = Question.objects.filter(id=instance.question_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        invalidate_paper(quiz_id)
@@ -0,0 +1,257 @@
+import io
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import Section, Departement, Auditoire, Course
+from .grading import grade_submission, regrade_quiz
+from .quiz_paper import get_student_paper, invalidate_paper
+from .quiz_import import QuizImportError, parse_questions, load_question_bank, create_quiz, import_questions
+from .timer import expire_attempts
+from .models import Quiz, Question, Choice, QuizSubmission
+
+User = get_user_model()
+
+
+class QuizGradingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        course = Course.objects.create(name="Réseaux", auditoire=auditoire)
+        cls.student = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", current_auditoire=auditoire)
+        cls.quiz = Quiz.objects.create(course=course, title="QCM", total_points=20)
+
+        cls.single = Question.objects.create(quiz=cls.quiz, question_text="TCP ?", question_type="single")
+        cls.single_ok = Choice.objects.create(question=cls.single, choice_text="Couche 4", is_correct=True)
+        Choice.objects.create(question=cls.single, choice_text="Couche 2")
+
+        cls.multiple = Question.objects.create(quiz=cls.quiz, question_text="Protocoles fiables ?", question_type="multiple")
+        cls.multi_a = Choice.objects.create(question=cls.multiple, choice_text="TCP", is_correct=True)
+        cls.multi_b = Choice.objects.create(question=cls.multiple, choice_text="SCTP", is_correct=True)
+        cls.multi_wrong = Choice.objects.create(question=cls.multiple, choice_text="UDP")
+
+    def _submit(self, answers):
+        return QuizSubmission.objects.create(quiz=self.quiz, student=self.student, answers=answers, status="soumis")
+
+    def test_choice_only_quiz_is_fully_graded(self):
+        submission = self._submit({str(self.single.id): self.single_ok.id, str(self.multiple.id): [self.multi_a.id]})
+        self.assertFalse(grade_submission(submission))
+        submission.refresh_from_db()
+        self.assertEqual(submission.score, 15)
+        self.assertIsNotNone(submission.graded_at)
+
+    @override_settings(QUIZ_PARTIAL_CREDIT="none")
+    def test_all_or_nothing_mode(self):
+        submission = self._submit({str(self.single.id): self.single_ok.id, str(self.multiple.id): [self.multi_a.id]})
+        grade_submission(submission)
+        self.assertEqual(submission.score, 10)
+
+    def test_text_question_leaves_score_for_manual_review(self):
+        text = Question.objects.create(quiz=self.quiz, question_text="Expliquez.", question_type="text")
+        submission = self._submit({
+            str(self.single.id): self.single_ok.id,
+            str(self.multiple.id): [self.multi_a.id, self.multi_b.id, self.multi_wrong.id],
+            str(text.id): "...",
+        })
+        self.assertTrue(grade_submission(submission))
+        self.assertIsNone(submission.score)
+        self.assertAlmostEqual(submission.auto_score, 10.0)
+
+    def test_regrade_quiz_updates_every_submission(self):
+        submission = self._submit({str(self.single.id): self.single_ok.id, str(self.multiple.id): [self.multi_a.id, self.multi_b.id]})
+        self.assertEqual(regrade_quiz(self.quiz), 1)
+        submission.refresh_from_db()
+        self.assertEqual(submission.score, 20)
+
+
+class QuizImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.course = Course.objects.create(name="Réseaux", auditoire=Auditoire.objects.create(name="Licence 1", departement=departement))
+
+    def _bank(self, size):
+        return [
+            {"text": f"Question {i}", "type": "single", "choices": [
+                {"text": "A", "is_correct": True}, {"text": "B", "is_correct": False},
+                {"text": "C", "is_correct": False}, {"text": "D", "is_correct": False},
+            ]}
+            for i in range(size)
+        ]
+
+    def test_create_quiz_uses_constant_inserts(self):
+        parsed = parse_questions(self._bank(60))
+        # savepoint + quiz + questions + choix + release
+        with self.assertNumQueries(5):
+            quiz = create_quiz(self.course, None, "Examen", parsed, duration=60)
+        self.assertEqual(quiz.questions.count(), 60)
+        self.assertEqual(Choice.objects.filter(question__quiz=quiz, is_correct=True).count(), 60)
+
+    def test_invalid_payload_writes_nothing(self):
+        bank = self._bank(3)
+        bank[2]["choices"] = [{"text": "A", "is_correct": False}]
+        with self.assertRaises(QuizImportError):
+            parse_questions(bank)
+        self.assertFalse(Quiz.objects.exists())
+
+    def test_csv_question_bank(self):
+        content = (
+            "question,type,choices,correct\n"
+            "Couche de TCP ?,single,Transport|Réseau,1\n"
+            "Protocoles fiables ?,multiple,TCP|UDP|SCTP,1|3\n"
+            "Expliquez le handshake.,text,,\n"
+        )
+        parsed = load_question_bank(content.encode(), "banque.csv")
+        self.assertEqual([q["type"] for q in parsed], ["single", "multiple", "text"])
+        self.assertEqual([c["is_correct"] for c in parsed[1]["choices"]], [True, False, True])
+
+        with self.assertRaises(QuizImportError):
+            load_question_bank("Protocole fiable ?,single,Réseau|Câble,1\n".encode("cp1252"), "banque.csv")
+
+        quiz = create_quiz(self.course, None, "Banque", parsed)
+        import_questions(quiz, parsed)
+        self.assertEqual(quiz.questions.count(), 6)
+
+
+class StudentPaperTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        course = Course.objects.create(name="Réseaux", auditoire=Auditoire.objects.create(name="Licence 1", departement=departement))
+        cls.quiz = Quiz.objects.create(course=course, title="Examen")
+        cls.question = Question.objects.create(quiz=cls.quiz, question_text="TCP ?", question_type="single")
+        cls.choice = Choice.objects.create(question=cls.question, choice_text="Couche 4", is_correct=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_paper_is_compiled_once_and_hides_answers(self):
+        paper = get_student_paper(self.quiz)
+        self.assertEqual(paper["questions"][0]["choices"], [{"id": self.choice.id, "text": "Couche 4"}])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_student_paper(self.quiz), paper)
+
+    def test_editing_a_choice_or_importing_questions_recompiles(self):
+        get_student_paper(self.quiz)
+        self.choice.choice_text = "Transport"
+        self.choice.save()
+        self.assertEqual(get_student_paper(Quiz.objects.get(id=self.quiz.id))["questions"][0]["choices"][0]["text"], "Transport")
+
+        import_questions(self.quiz, parse_questions([{"text": "Expliquez.", "type": "text"}]))
+        self.assertEqual(len(get_student_paper(Quiz.objects.get(id=self.quiz.id))["questions"]), 2)
+
+    def test_version_is_shared_through_the_database(self):
+        stale = Quiz.objects.get(id=self.quiz.id)
+        get_student_paper(stale)
+        # Modification traitée par un autre processus: seule la base est partagée
+        Choice.objects.filter(id=self.choice.id).update(choice_text="Transport")
+        invalidate_paper(self.quiz.id)
+        self.assertEqual(get_student_paper(Quiz.objects.get(id=self.quiz.id))["questions"][0]["choices"][0]["text"], "Transport")
+
+        # Un quiz chargé avant la modification et réenregistré ne ramène pas l'ancienne version
+        stale.title = "Examen final"
+        stale.save()
+        self.assertEqual(get_student_paper(Quiz.objects.get(id=self.quiz.id))["questions"][0]["choices"][0]["text"], "Transport")
+
+
+@override_settings(QUIZ_SUBMISSION_GRACE_SECONDS=30)
+class QuizTimerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        course = Course.objects.create(name="Réseaux", auditoire=auditoire)
+        cls.quiz = Quiz.objects.create(course=course, title="QCM", duration=30, total_points=10)
+        cls.question = Question.objects.create(quiz=cls.quiz, question_text="TCP ?", question_type="single")
+        cls.choice = Choice.objects.create(question=cls.question, choice_text="Couche 4", is_correct=True)
+        cls.students = [
+            User.objects.create_user(matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", role="etudiant", current_auditoire=auditoire)
+            for i in range(4)
+        ]
+
+    def start(self, student, minutes_ago, **fields):
+        return QuizSubmission.objects.create(quiz=self.quiz, student=student, started_at=timezone.now() - timedelta(minutes=minutes_ago), **fields)
+
+    def client_for(self, student):
+        client = APIClient()
+        client.force_authenticate(student)
+        return client
+
+    def test_deadline_is_fixed_when_the_attempt_starts(self):
+        response = self.client_for(self.students[0]).get(f"/api/quizzes/student/{self.quiz.id}/")
+        attempt = QuizSubmission.objects.get(student=self.students[0])
+        self.assertEqual(attempt.deadline, attempt.started_at + timedelta(minutes=30))
+        self.assertIn(response.data["attempt"]["remaining_seconds"], (1799, 1800))
+
+        self.quiz.duration = 60
+        self.quiz.save()
+        attempt.save()
+        self.assertEqual(attempt.deadline, attempt.started_at + timedelta(minutes=30))
+
+    def test_sweeper_closes_expired_attempts_in_one_update(self):
+        expired = [self.start(student, 120) for student in self.students[:2]]
+        self.start(self.students[2], 10)
+        self.start(self.students[3], 120, status="soumis", submission_reason="manual")
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(expire_attempts(), 2)
+        closing = [q["sql"] for q in queries if q["sql"].startswith("UPDATE") and "submission_reason" in q["sql"]]
+        self.assertEqual(len(closing), 1)
+        # Même filtre que la lecture verrouillée, sans renvoyer la liste des identifiants
+        self.assertIn("deadline", closing[0].split("WHERE")[1])
+        self.assertNotIn(" IN (", closing[0])
+
+        closed = QuizSubmission.objects.filter(submission_reason="time-out")
+        self.assertEqual(sorted(closed.values_list("id", flat=True)), [attempt.id for attempt in expired])
+        for attempt in closed:
+            self.assertEqual((attempt.status, attempt.submitted_at, attempt.score), ("soumis", attempt.deadline, 0))
+        self.assertEqual(QuizSubmission.objects.filter(status="en_cours").count(), 1)
+        self.assertEqual(expire_attempts(), 0)
+
+    def test_reopening_an_abandoned_attempt_closes_it(self):
+        self.start(self.students[0], 45)
+        response = self.client_for(self.students[0]).get(f"/api/quizzes/student/{self.quiz.id}/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["attempt"], {"status": "soumis"})
+        attempt = QuizSubmission.objects.get(student=self.students[0])
+        self.assertEqual((attempt.status, attempt.submission_reason), ("soumis", "time-out"))
+
+    def test_late_submission_is_rejected(self):
+        answers = {str(self.question.id): self.choice.id}
+        on_time = self.start(self.students[0], 30.2)
+        late = self.start(self.students[1], 31)
+
+        response = self.client_for(self.students[0]).post(f"/api/quizzes/student/{self.quiz.id}/submit/", {"answers": answers, "reason": "time-out"}, format="json")
+        self.assertEqual(response.data["status"], "submitted")
+        on_time.refresh_from_db()
+        self.assertEqual(on_time.score, 10)
+
+        response = self.client_for(self.students[1]).post(f"/api/quizzes/student/{self.quiz.id}/submit/", {"answers": answers}, format="json")
+        self.assertEqual(response.status_code, 400)
+        late.refresh_from_db()
+        self.assertEqual((late.status, late.submission_reason, late.answers, late.score), ("soumis", "time-out", {}, 0))
+        self.assertEqual(late.submitted_at, late.deadline)
+
+    def test_backfill_and_command(self):
+        attempt = self.start(self.students[0], 120)
+        QuizSubmission.objects.filter(id=attempt.id).update(deadline=None)
+        import_module("evaluations.migrations.0011_quizsubmission_deadline").backfill(apps, None)
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.deadline, attempt.started_at + timedelta(minutes=30))
+        call_command("expire_quiz_attempts", stdout=io.StringIO())
+        self.assertEqual(QuizSubmission.objects.get(id=attempt.id).status, "soumis")
@@ -0,0 +1,62 @@
+"""
+Minuterie des tentatives de quiz, tenue par le serveur.
+
+La fin d'une tentative (QuizSubmission.deadline) est fixée à son début: started_at + Quiz.duration.
+Une soumission reçue après deadline + QUIZ_SUBMISSION_GRACE_SECONDS (latence réseau, envoi
+automatique du navigateur à la fin du compte à rebours) est refusée et la tentative est close
+avec les réponses déjà enregistrées. Les tentatives abandonnées sont closes paresseusement quand
+l'étudiant rouvre le quiz, et par la commande expire_quiz_attempts: un seul UPDATE guidé par
+l'index (status, deadline), sans parcourir les tentatives en cours, puis la correction des
+tentatives closes.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .grading import grade_many
+from .models import QuizSubmission
+
+
+# Champs lus par grade_many (réponses et barème, cours et titre du quiz pour le carnet et la notification)
+GRADING_FIELDS = (
+    'id', 'student_id', 'answers', 'auto_score', 'score', 'graded_at',
+    'quiz__id', 'quiz__title', 'quiz__total_points', 'quiz__course_id',
+)
+
+
+def grace():
+    return timedelta(seconds=getattr(settings, 'QUIZ_SUBMISSION_GRACE_SECONDS', 30))
+
+
+def limit(now=None):
+    """Les tentatives dont la fin est antérieure à cette date sont expirées."""
+    return (now or timezone.now()) - grace()
+
+
+def remaining_seconds(submission, now=None):
+    return max(0, int((submission.deadline - (now or timezone.now())).total_seconds()))
+
+
+def is_expired(submission, now=None):
+    return submission.status == 'en_cours' and submission.deadline < limit(now)
+
+
+def expire_attempts(now=None, **filters):
+    """
+    Clôt (raison 'time-out', soumise à sa date de fin) chaque tentative en cours expirée, filtrée
+    par filters (ex.: id=12), puis la corrige. Retourne le nombre de tentatives closes.
+    """
+    with transaction.atomic():
+        expired = QuizSubmission.objects.filter(status='en_cours', deadline__lt=limit(now), **filters)
+        # Verrouille les tentatives à clore en lisant seulement ce que la correction utilise
+        submissions = list(expired.select_for_update().select_related('quiz').only(*GRADING_FIELDS))
+        if not submissions:
+            return 0
+        # Les lignes verrouillées ne peuvent plus changer: le même filtre désigne les mêmes tentatives
+        closed = expired.update(status='soumis', submission_reason='time-out', submitted_at=F('deadline'))
+        # update() n'envoie pas post_save: grade_many recalcule le carnet de notes et notifie
+        grade_many(submissions)
+    return closed
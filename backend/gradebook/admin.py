@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import CourseGrade, Deliberation
+
+@admin.register(CourseGrade)
+class CourseGradeAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'auditoire', 'average', 'credits', 'updated_at')
+    list_filter = ('auditoire', 'course')
+    search_fields = ('student__matricule', 'student__last_name', 'course__name')
+    readonly_fields = [f.name for f in CourseGrade._meta.fields]
+
+
+@admin.register(Deliberation)
+class DeliberationAdmin(admin.ModelAdmin):
+    list_display = ('scope_name', 'status', 'student_count', 'passed_count', 'run_by', 'created_at')
+    list_filter = ('status',)
+    readonly_fields = [f.name for f in Deliberation._meta.fields]
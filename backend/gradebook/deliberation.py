@@ -0,0 +1,119 @@
+"""
+Délibération des étudiants d'un auditoire ou d'un département.
+
+Tout l'effectif est traité en un nombre fixe de requêtes, quel que soit le nombre
+d'étudiants: les crédits de chaque auditoire et, par étudiant, la somme des moyennes
+pondérées et les crédits validés sont agrégés en SQL depuis le carnet de notes
+(CourseGrade). Les résultats sont enregistrés par bulk_create et, si la délibération
+est validée, academic_status est mis à jour par deux UPDATE groupés.
+
+Règles (réglages DELIBERATION_PASS_AVERAGE et DELIBERATION_MIN_CREDIT_RATIO): un étudiant
+réussit si sa moyenne sur 20, pondérée par les crédits de tous les cours de son auditoire
+(un cours sans note compte pour 0), atteint la moyenne requise et s'il a validé la part de
+crédits demandée. Un étudiant dont l'auditoire n'a aucun cours n'est pas délibéré.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from academics.models import Course
+from api.dashboard_cache import invalidate_model
+from .models import PASS_MARK, CourseGrade, Deliberation, DeliberationResult
+
+User = get_user_model()
+
+UPDATE_BATCH_SIZE = 900
+
+
+def default_rules():
+    return {
+        "pass_average": getattr(settings, 'DELIBERATION_PASS_AVERAGE', 10),
+        "min_credit_ratio": getattr(settings, 'DELIBERATION_MIN_CREDIT_RATIO', 1.0),
+    }
+
+
+def _decide(average, credits_attempted, credits_earned, rules):
+    if average >= rules["pass_average"] and credits_earned >= rules["min_credit_ratio"] * credits_attempted:
+        return 'reussi'
+    return 'non_reussi'
+
+
+def compute(auditoire_ids, rules):
+    """Retourne la liste des résultats {student_id, auditoire_id, average, credits_...} des auditoires donnés."""
+    credits_by_auditoire = {
+        row['auditoire_id']: row['total']
+        for row in Course.objects.filter(auditoire_id__in=auditoire_ids)
+        .values('auditoire_id').annotate(total=Sum('credits')).order_by()
+    }
+    students = User.objects.filter(role='etudiant', current_auditoire_id__in=auditoire_ids)
+
+    # Seules les notes des cours de l'auditoire actuel de l'étudiant comptent
+    grades = {
+        row['student_id']: row
+        for row in CourseGrade.objects.filter(
+            student__in=students, average__isnull=False, auditoire_id=F('student__current_auditoire_id'),
+        ).values('student_id').annotate(
+            weighted=Sum(F('average') * F('credits')),
+            earned=Sum('credits', filter=Q(average__gte=PASS_MARK)),
+        ).order_by()
+    }
+
+    results = []
+    for student_id, auditoire_id in students.values_list('id', 'current_auditoire_id').iterator(chunk_size=2000):
+        attempted = credits_by_auditoire.get(auditoire_id) or 0
+        if not attempted:
+            continue
+        row = grades.get(student_id, {})
+        average = round((row.get('weighted') or 0) / attempted, 2)
+        earned = row.get('earned') or 0
+        results.append({
+            "student_id": student_id,
+            "auditoire_id": auditoire_id,
+            "average": average,
+            "credits_attempted": attempted,
+            "credits_earned": earned,
+            "decision": _decide(average, attempted, earned, rules),
+        })
+    return results
+
+
+def _update_status(student_ids, status):
+    student_ids = list(student_ids)
+    for start in range(0, len(student_ids), UPDATE_BATCH_SIZE):
+        User.objects.filter(id__in=student_ids[start:start + UPDATE_BATCH_SIZE]).update(academic_status=status)
+
+
+def deliberate(auditoire=None, departement=None, commit=False, rules=None, run_by=None):
+    """
+    Délibère un auditoire ou tous les auditoires d'un département.
+
+    commit=False enregistre une simulation sans toucher aux étudiants; commit=True applique
+    les décisions à User.academic_status. Retourne la Deliberation créée.
+    """
+    if (auditoire is None) == (departement is None):
+        raise ValueError("Délibérer un auditoire ou un département.")
+    rules = {**default_rules(), **(rules or {})}
+    if auditoire is not None:
+        auditoire_ids = [auditoire.id]
+    else:
+        auditoire_ids = list(departement.auditoires.values_list('id', flat=True))
+
+    results = compute(auditoire_ids, rules)
+    passed = [r["student_id"] for r in results if r["decision"] == 'reussi']
+    failed = [r["student_id"] for r in results if r["decision"] != 'reussi']
+
+    with transaction.atomic():
+        deliberation = Deliberation.objects.create(
+            auditoire=auditoire, departement=departement, status='validee' if commit else 'simulee',
+            rules=rules, student_count=len(results), passed_count=len(passed), run_by=run_by,
+        )
+        DeliberationResult.objects.bulk_create(
+            [DeliberationResult(deliberation=deliberation, **r) for r in results], batch_size=1000,
+        )
+        if commit:
+            _update_status(passed, 'reussi')
+            _update_status(failed, 'non_reussi')
+            # update() n'envoie pas post_save: les tableaux de bord dépendant de User sont invalidés ici
+            transaction.on_commit(lambda: invalidate_model(User))
+    return deliberation
@@ -0,0 +1,186 @@
+"""
+Calcul du carnet de notes matérialisé (gradebook.models.CourseGrade).
+
+Une ligne (étudiant, cours) est toujours recalculée depuis les sources — TP/TD corrigés
+(Submission.grade) et quiz corrigés (QuizSubmission.score) — par deux agrégats groupés
+sur des colonnes indexées, puis écrite par un upsert groupé. refresh_pairs ne touche que
+les couples concernés par une écriture de note; rebuild recalcule des cours entiers.
+Chaque ligne modifiée émet un événement gradebook.stats.grade_changed dans la même transaction.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from academics.models import Auditoire, Course
+from evaluations.models import Submission, QuizSubmission
+from .models import PASS_MARK, CourseGrade
+from .stats import grade_changed
+
+GRADE_FIELDS = ['auditoire', 'credits', 'tp_obtained', 'tp_possible', 'tp_count',
+                'quiz_obtained', 'quiz_possible', 'quiz_count', 'average']
+
+
+def _totals(student_ids=None, course_ids=None):
+    """{(student_id, course_id): {...}} pour les copies corrigées des étudiants/cours donnés (tous si None)."""
+    tp = Submission.objects.filter(grade__isnull=False)
+    quiz = QuizSubmission.objects.filter(score__isnull=False)
+    if student_ids is not None:
+        tp = tp.filter(student_id__in=student_ids)
+        quiz = quiz.filter(student_id__in=student_ids)
+    if course_ids is not None:
+        tp = tp.filter(assignment__course_id__in=course_ids)
+        quiz = quiz.filter(quiz__course_id__in=course_ids)
+
+    totals = {}
+    for row in tp.values('student_id', course_id=F('assignment__course_id')).annotate(
+        obtained=Sum('grade'), possible=Sum('assignment__total_points'), count=Count('id'),
+    ).order_by():
+        totals.setdefault((row['student_id'], row['course_id']), {}).update(
+            tp_obtained=row['obtained'], tp_possible=row['possible'], tp_count=row['count'],
+        )
+    for row in quiz.values('student_id', course_id=F('quiz__course_id')).annotate(
+        obtained=Sum('score'), possible=Sum('quiz__total_points'), count=Count('id'),
+    ).order_by():
+        totals.setdefault((row['student_id'], row['course_id']), {}).update(
+            quiz_obtained=row['obtained'], quiz_possible=row['possible'], quiz_count=row['count'],
+        )
+    return totals
+
+
+def _courses(course_ids):
+    return {c['id']: c for c in Course.objects.filter(id__in=course_ids).values('id', 'auditoire_id', 'credits')}
+
+
+def _rows(totals, courses=None):
+    if courses is None:
+        courses = _courses({course_id for _, course_id in totals})
+    rows = []
+    for (student_id, course_id), values in totals.items():
+        course = courses.get(course_id)
+        if course is None:
+            continue
+        row = CourseGrade(student_id=student_id, course_id=course_id,
+                          auditoire_id=course['auditoire_id'], credits=course['credits'], **values)
+        possible = row.tp_possible + row.quiz_possible
+        row.average = round(20 * (row.tp_obtained + row.quiz_obtained) / possible, 2) if possible else None
+        rows.append(row)
+    return rows
+
+
+def _upsert(rows, batch_size=500):
+    CourseGrade.objects.bulk_create(
+        rows, batch_size=batch_size,
+        update_conflicts=True, unique_fields=['student', 'course'], update_fields=GRADE_FIELDS + ['updated_at'],
+    )
+
+
+def _snapshot(rows):
+    return {(r.student_id, r.course_id): (r.auditoire_id, r.average) for r in rows}
+
+
+def emit_changes(old, new):
+    """Émet grade_changed pour les couples dont la moyenne ou l'auditoire diffère entre old et new."""
+    if not (old or new):
+        return
+    auditoire_ids = {a for a, _ in old.values()} | {a for a, _ in new.values()}
+    departements = dict(Auditoire.objects.filter(id__in=auditoire_ids).values_list('id', 'departement_id'))
+    events = []
+    for pair in old.keys() | new.keys():
+        (old_auditoire, old_average), (new_auditoire, new_average) = old.get(pair, (None, None)), new.get(pair, (None, None))
+        if (old_auditoire, old_average) == (new_auditoire, new_average):
+            continue
+        if old_auditoire is not None and new_auditoire is not None and old_auditoire != new_auditoire:
+            # Le cours a changé d'auditoire: la moyenne quitte l'ancien et rejoint le nouveau
+            moves = [(old_auditoire, old_average, None), (new_auditoire, None, new_average)]
+        else:
+            moves = [(new_auditoire or old_auditoire, old_average, new_average)]
+        for auditoire_id, before, after in moves:
+            events.append({
+                "student_id": pair[0],
+                "course_id": pair[1],
+                "auditoire_id": auditoire_id,
+                "departement_id": departements.get(auditoire_id),
+                "old": before,
+                "new": after,
+            })
+    if events:
+        grade_changed.send(sender=CourseGrade, events=events)
+
+
+def refresh_pairs(pairs):
+    """
+    Recalcule les lignes des couples (student_id, course_id) donnés, et supprime celles sans note.
+
+    Les lignes sont verrouillées avant le calcul des totaux: deux recalculs simultanés d'un même
+    couple s'exécutent l'un après l'autre et le second part de la ligne écrite par le premier,
+    sans compter deux fois la moyenne dans les statistiques. Un couple encore sans ligne en
+    reçoit une provisoire, sans moyenne, qui porte le verrou.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return
+    student_ids = {s for s, _ in pairs}
+    course_ids = {c for _, c in pairs}
+    courses = _courses(course_ids)
+    with transaction.atomic():
+        CourseGrade.objects.bulk_create([
+            CourseGrade(student_id=student_id, course_id=course_id,
+                        auditoire_id=courses[course_id]['auditoire_id'], credits=courses[course_id]['credits'])
+            for student_id, course_id in sorted(pairs) if course_id in courses
+        ], ignore_conflicts=True)
+        current = CourseGrade.objects.select_for_update().filter(
+            student_id__in=student_ids, course_id__in=course_ids,
+        ).order_by('student_id', 'course_id')
+        old = {pair: value for pair, value in _snapshot(current).items() if pair in pairs}
+        totals = {
+            pair: values
+            for pair, values in _totals(student_ids, course_ids).items()
+            if pair in pairs
+        }
+        stale = [pair for pair in old if pair not in totals]
+        if stale:
+            condition = Q()
+            for student_id, course_id in stale:
+                condition |= Q(student_id=student_id, course_id=course_id)
+            CourseGrade.objects.filter(condition).delete()
+        rows = _rows(totals, courses)
+        _upsert(rows)
+        emit_changes(old, _snapshot(rows))
+
+
+def rebuild(course_ids=None):
+    """Recalcule entièrement les lignes des cours donnés (tous les cours si None)."""
+    totals = _totals(course_ids=course_ids)
+    with transaction.atomic():
+        existing = CourseGrade.objects.select_for_update()
+        if course_ids is not None:
+            existing = existing.filter(course_id__in=course_ids)
+        old = _snapshot(existing)
+        existing.delete()
+        rows = _rows(totals)
+        CourseGrade.objects.bulk_create(rows, batch_size=500)
+        emit_changes(old, _snapshot(rows))
+    return len(rows)
+
+
+def schedule_refresh(student_id, course_id):
+    """Recalcule le couple une fois la transaction en cours validée (ou tout de suite hors transaction)."""
+    transaction.on_commit(lambda: refresh_pairs({(student_id, course_id)}))
+
+
+def student_overview(student):
+    """Moyenne pondérée par les crédits et crédits validés d'un étudiant, en une requête."""
+    totals = CourseGrade.objects.filter(student=student, average__isnull=False).aggregate(
+        weighted=Sum(F('average') * F('credits')),
+        attempted=Sum('credits'),
+        earned=Sum('credits', filter=Q(average__gte=PASS_MARK)),
+        obtained=Sum(F('tp_obtained') + F('quiz_obtained')),
+        possible=Sum(F('tp_possible') + F('quiz_possible')),
+    )
+    credits = totals['attempted'] or 0
+    return {
+        "weighted_average": round(totals['weighted'] / credits, 2) if credits else 0.0,
+        "credits_attempted": credits,
+        "credits_earned": totals['earned'] or 0,
+        "obtained": totals['obtained'] or 0,
+        "possible": totals['possible'] or 0,
+    }
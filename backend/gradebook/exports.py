@@ -0,0 +1,106 @@
+"""
+Export des relevés de notes (TP/TD et quiz) en CSV ou XLSX.
+
+Les lignes sont lues par values_list(...).iterator(chunk_size) et écrites au fil de l'eau
+dans la réponse: la mémoire utilisée reste constante, même pour un département entier.
+Sous ASGI, Django lirait un itérateur synchrone d'un seul bloc (sync_to_async(list)) avant
+d'envoyer quoi que ce soit: le flux est alors converti par as_async_stream, qui le lit par
+lots dans le thread des vues synchrones.
+"""
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from evaluations.models import Submission, QuizSubmission
+from .xlsx import stream_xlsx
+
+EXPORT_CHUNK_SIZE = 2000
+
+HEADER = ['Matricule', 'Étudiant', 'Auditoire', 'Cours', 'Code', 'Type', 'Évaluation', 'Note', 'Sur', 'Statut', 'Date']
+
+SUBMISSION_FIELDS = (
+    'student__matricule', 'student__last_name', 'student__post_name', 'student__first_name',
+    'assignment__course__auditoire__name', 'assignment__course__name', 'assignment__course__code',
+    'assignment__type', 'assignment__title', 'grade', 'assignment__total_points', 'status', 'submitted_at',
+)
+QUIZ_FIELDS = (
+    'student__matricule', 'student__last_name', 'student__post_name', 'student__first_name',
+    'quiz__course__auditoire__name', 'quiz__course__name', 'quiz__course__code',
+    'quiz__title', 'score', 'quiz__total_points', 'status', 'submitted_at',
+)
+
+
+def course_filter(prefix, course_ids=None, auditoire_id=None, departement_id=None, section_id=None):
+    """Filtre Q sur le cours de l'évaluation (prefix: 'assignment__course' ou 'quiz__course')."""
+    condition = Q()
+    if course_ids is not None:
+        condition &= Q(**{f'{prefix}__in': course_ids})
+    if auditoire_id is not None:
+        condition &= Q(**{f'{prefix}__auditoire_id': auditoire_id})
+    if departement_id is not None:
+        condition &= Q(**{f'{prefix}__auditoire__departement_id': departement_id})
+    if section_id is not None:
+        condition &= Q(**{f'{prefix}__auditoire__departement__section_id': section_id})
+    return condition
+
+
+def _full_name(first_name, post_name, last_name):
+    return ' '.join(part for part in (first_name, post_name, last_name) if part)
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d %H:%M') if value else ''
+
+
+def grade_rows(**scope):
+    """Lignes du relevé pour la portée donnée (voir course_filter), TP/TD puis quiz."""
+    submissions = Submission.objects.filter(course_filter('assignment__course', **scope)).order_by(
+        'assignment__course__auditoire__name', 'assignment__course__name', 'assignment__id', 'student__matricule',
+    ).values_list(*SUBMISSION_FIELDS)
+    for (matricule, last_name, post_name, first_name, auditoire, course, code,
+         kind, title, grade, total, status, submitted_at) in submissions.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [matricule, _full_name(first_name, post_name, last_name), auditoire, course, code,
+               kind, title, grade, total, status, _date(submitted_at)]
+
+    quiz_submissions = QuizSubmission.objects.filter(course_filter('quiz__course', **scope)).order_by(
+        'quiz__course__auditoire__name', 'quiz__course__name', 'quiz__id', 'student__matricule',
+    ).values_list(*QUIZ_FIELDS)
+    for (matricule, last_name, post_name, first_name, auditoire, course, code,
+         title, score, total, status, submitted_at) in quiz_submissions.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [matricule, _full_name(first_name, post_name, last_name), auditoire, course, code,
+               'Quiz', title, score, total, status, _date(submitted_at)]
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer: writerow() renvoie directement la ligne formatée."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    # BOM: Excel reconnaît ainsi l'UTF-8 (accents des noms)
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def as_async_stream(chunks, batch_size=None):
+    """Itérateur asynchrone sur un flux synchrone, lu par lots de batch_size morceaux."""
+    batch_size = batch_size or EXPORT_CHUNK_SIZE
+    next_batch = sync_to_async(lambda: list(islice(chunks, batch_size)), thread_sensitive=True)
+
+    async def stream():
+        while batch := await next_batch():
+            yield batch[0][:0].join(batch)
+    return stream()
+
+
+def export_stream(fmt, sheet_name, **scope):
+    """(générateur, type MIME, extension) du relevé au format 'csv' ou 'xlsx'."""
+    rows = grade_rows(**scope)
+    if fmt == 'xlsx':
+        return stream_xlsx(HEADER, rows, sheet_name), 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'
+    return stream_csv(HEADER, rows), 'text/csv; charset=utf-8', 'csv'
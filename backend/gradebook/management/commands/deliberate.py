@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from academics.models import Auditoire, Departement
+from gradebook.deliberation import deliberate
+
+class Command(BaseCommand):
+    help = "Délibère un auditoire ou un département (simulation par défaut, --commit pour appliquer les décisions)."
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--auditoire', type=int)
+        scope.add_argument('--departement', type=int)
+        parser.add_argument('--commit', action='store_true', help="Mettre à jour academic_status des étudiants.")
+        parser.add_argument('--pass-average', type=float, default=None)
+        parser.add_argument('--min-credit-ratio', type=float, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            auditoire = Auditoire.objects.get(id=options['auditoire']) if options['auditoire'] else None
+            departement = Departement.objects.get(id=options['departement']) if options['departement'] else None
+        except (Auditoire.DoesNotExist, Departement.DoesNotExist):
+            raise CommandError('Auditoire ou département introuvable.')
+        rules = {key: options[key] for key in ('pass_average', 'min_credit_ratio') if options[key] is not None}
+        deliberation = deliberate(auditoire=auditoire, departement=departement, commit=options['commit'], rules=rules)
+        self.stdout.write(self.style.SUCCESS(
+            f'{deliberation}: {deliberation.passed_count}/{deliberation.student_count} étudiant(s) admis.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from gradebook.engine import rebuild
+from gradebook.stats import recount
+
+class Command(BaseCommand):
+    help = 'Recalcule le carnet de notes matérialisé (tous les cours, ou seulement ceux donnés) et ses statistiques.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        count = rebuild(course_ids=options['course_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'{count} ligne(s) de carnet de notes recalculée(s).'))
+        if not options['course_ids']:
+            stats = recount()
+            self.stdout.write(self.style.SUCCESS(f'{stats} statistique(s) recalculée(s).'))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('academics', '0008_hot_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseGrade',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('credits', models.PositiveSmallIntegerField(default=3)),
+                ('tp_obtained', models.FloatField(default=0)),
+                ('tp_possible', models.FloatField(default=0)),
+                ('tp_count', models.PositiveIntegerField(default=0)),
+                ('quiz_obtained', models.FloatField(default=0)),
+                ('quiz_possible', models.FloatField(default=0)),
+                ('quiz_count', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('auditoire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_grades', to='academics.auditoire')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grades', to='academics.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_grades', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['auditoire', 'course'], name='coursegrade_auditoire_idx')],
+                'unique_together': {('student', 'course')},
+            },
+        ),
+    ]
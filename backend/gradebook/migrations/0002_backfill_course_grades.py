@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:22
+
+from django.db import migrations
+from django.db.models import Count, F, Sum
+
+
+def backfill(apps, schema_editor):
+    """Une ligne par (étudiant, cours) ayant au moins une copie corrigée."""
+    Submission = apps.get_model('evaluations', 'Submission')
+    QuizSubmission = apps.get_model('evaluations', 'QuizSubmission')
+    Course = apps.get_model('academics', 'Course')
+    CourseGrade = apps.get_model('gradebook', 'CourseGrade')
+
+    totals = {}
+    sources = (
+        ('tp', Submission.objects.filter(grade__isnull=False), 'grade', 'assignment'),
+        ('quiz', QuizSubmission.objects.filter(score__isnull=False), 'score', 'quiz'),
+    )
+    for prefix, graded, field, evaluation in sources:
+        for row in graded.values('student_id', course_id=F(f'{evaluation}__course_id')).annotate(
+            obtained=Sum(field), possible=Sum(f'{evaluation}__total_points'), count=Count('id'),
+        ).order_by():
+            totals.setdefault((row['student_id'], row['course_id']), {}).update({
+                f'{prefix}_obtained': row['obtained'], f'{prefix}_possible': row['possible'], f'{prefix}_count': row['count'],
+            })
+
+    courses = dict(
+        (course_id, (auditoire_id, credits))
+        for course_id, auditoire_id, credits in Course.objects.filter(
+            id__in={course_id for _, course_id in totals}
+        ).values_list('id', 'auditoire_id', 'credits')
+    )
+    rows = []
+    for (student_id, course_id), values in totals.items():
+        if course_id not in courses:
+            continue
+        auditoire_id, credits = courses[course_id]
+        row = CourseGrade(student_id=student_id, course_id=course_id, auditoire_id=auditoire_id, credits=credits, **values)
+        possible = row.tp_possible + row.quiz_possible
+        row.average = round(20 * (row.tp_obtained + row.quiz_obtained) / possible, 2) if possible else None
+        rows.append(row)
+    CourseGrade.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gradebook', '0001_initial'),
+        ('evaluations', '0010_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gradebook', '0002_backfill_course_grades'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('course', 'Cours'), ('auditoire', 'Auditoire'), ('departement', 'Département')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('total', models.FloatField(default=0)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('scope', 'object_id')},
+            },
+        ),
+    ]
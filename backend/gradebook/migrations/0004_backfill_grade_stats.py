@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:40
+
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+
+PASS_MARK = 10
+
+
+def backfill(apps, schema_editor):
+    """Sommes des moyennes de CourseGrade par cours, auditoire et département."""
+    CourseGrade = apps.get_model('gradebook', 'CourseGrade')
+    GradeStat = apps.get_model('gradebook', 'GradeStat')
+    graded = CourseGrade.objects.filter(average__isnull=False)
+    groups = (
+        ('course', 'course_id'),
+        ('auditoire', 'auditoire_id'),
+        ('departement', 'auditoire__departement_id'),
+    )
+    rows = []
+    for scope, field in groups:
+        for row in graded.values(object_id=F(field)).annotate(
+            sum_average=Sum('average'), n=Count('id'), n_passed=Count('id', filter=Q(average__gte=PASS_MARK)),
+        ).order_by():
+            if row['object_id'] is not None:
+                rows.append(GradeStat(scope=scope, object_id=row['object_id'],
+                                      total=row['sum_average'], count=row['n'], passed=row['n_passed']))
+    GradeStat.objects.all().delete()
+    GradeStat.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gradebook', '0003_gradestat'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_hot_lookup_indexes'),
+        ('gradebook', '0004_backfill_grade_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deliberation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('simulee', 'Simulée'), ('validee', 'Validée')], default='simulee', max_length=20)),
+                ('rules', models.JSONField(blank=True, default=dict)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('passed_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('auditoire', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deliberations', to='academics.auditoire')),
+                ('departement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deliberations', to='academics.departement')),
+                ('run_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DeliberationResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('average', models.FloatField()),
+                ('credits_attempted', models.PositiveIntegerField()),
+                ('credits_earned', models.PositiveIntegerField()),
+                ('decision', models.CharField(choices=[('reussi', 'Réussi'), ('non_reussi', 'Non réussi')], max_length=20)),
+                ('auditoire', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='academics.auditoire')),
+                ('deliberation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='gradebook.deliberation')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliberation_results', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('deliberation', 'student')},
+            },
+        ),
+    ]
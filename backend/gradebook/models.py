@@ -0,0 +1,129 @@
+from django.db import models
+from django.conf import settings
+from academics.models import Course, Auditoire
+
+PASS_MARK = 10 # Moyenne minimale sur 20 pour valider un cours
+
+
+class CourseGrade(models.Model):
+    """
+    Bilan matérialisé d'un étudiant dans un cours: points TP/TD et quiz corrigés.
+
+    Tenu à jour par gradebook.signals à chaque écriture de note; `average` est la note
+    ramenée sur 20 et `credits` recopie Course.credits pour les moyennes pondérées.
+    """
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='course_grades')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='grades')
+    auditoire = models.ForeignKey(Auditoire, on_delete=models.CASCADE, related_name='course_grades') # Auditoire du cours
+    credits = models.PositiveSmallIntegerField(default=3)
+    tp_obtained = models.FloatField(default=0)
+    tp_possible = models.FloatField(default=0)
+    tp_count = models.PositiveIntegerField(default=0)
+    quiz_obtained = models.FloatField(default=0)
+    quiz_possible = models.FloatField(default=0)
+    quiz_count = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student', 'course')
+        indexes = [
+            models.Index(fields=['auditoire', 'course'], name='coursegrade_auditoire_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.course.name}: {self.average}"
+
+    @property
+    def obtained(self):
+        return self.tp_obtained + self.quiz_obtained
+
+    @property
+    def possible(self):
+        return self.tp_possible + self.quiz_possible
+
+    @property
+    def passed(self):
+        return self.average is not None and self.average >= PASS_MARK
+
+
+class GradeStat(models.Model):
+    """
+    Sommes courantes des moyennes de CourseGrade par cours, auditoire ou département.
+
+    Ajustées par gradebook.stats à chaque événement de note, elles donnent moyenne et taux
+    de réussite en lisant une seule ligne.
+    """
+    SCOPE_CHOICES = (
+        ('course', 'Cours'),
+        ('auditoire', 'Auditoire'),
+        ('departement', 'Département'),
+    )
+
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    total = models.FloatField(default=0) # Somme des moyennes /20
+    count = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('scope', 'object_id')
+
+    def __str__(self):
+        return f"{self.get_scope_display()} #{self.object_id}: {self.average}"
+
+    @property
+    def average(self):
+        return round(self.total / self.count, 2) if self.count else None
+
+    @property
+    def pass_rate(self):
+        return round(100 * self.passed / self.count, 1) if self.count else None
+
+
+class Deliberation(models.Model):
+    """Délibération d'un auditoire ou d'un département (simulée, ou validée et appliquée aux étudiants)."""
+    STATUS_CHOICES = (
+        ('simulee', 'Simulée'),
+        ('validee', 'Validée'),
+    )
+
+    auditoire = models.ForeignKey(Auditoire, on_delete=models.CASCADE, null=True, blank=True, related_name='deliberations')
+    departement = models.ForeignKey('academics.Departement', on_delete=models.CASCADE, null=True, blank=True, related_name='deliberations')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='simulee')
+    rules = models.JSONField(default=dict, blank=True) # Règles appliquées (moyenne et part de crédits minimales)
+    student_count = models.PositiveIntegerField(default=0)
+    passed_count = models.PositiveIntegerField(default=0)
+    run_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Délibération {self.scope_name} ({self.get_status_display()})"
+
+    @property
+    def scope_name(self):
+        return self.auditoire.name if self.auditoire_id else getattr(self.departement, 'name', '')
+
+
+class DeliberationResult(models.Model):
+    DECISION_CHOICES = (
+        ('reussi', 'Réussi'),
+        ('non_reussi', 'Non réussi'),
+    )
+
+    deliberation = models.ForeignKey(Deliberation, on_delete=models.CASCADE, related_name='results')
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='deliberation_results')
+    auditoire = models.ForeignKey(Auditoire, on_delete=models.CASCADE, related_name='+')
+    average = models.FloatField() # Moyenne /20 pondérée par les crédits de tous les cours de l'auditoire
+    credits_attempted = models.PositiveIntegerField()
+    credits_earned = models.PositiveIntegerField()
+    decision = models.CharField(max_length=20, choices=DECISION_CHOICES)
+
+    class Meta:
+        unique_together = ('deliberation', 'student')
+
+    def __str__(self):
+        return f"{self.student} : {self.get_decision_display()} ({self.average})"
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from academics.models import Course
+from evaluations.models import Assignment, Submission, Quiz, QuizSubmission
+from .engine import schedule_refresh, rebuild, emit_changes
+from .models import CourseGrade
+from .stats import grade_changed, apply_events
+
+
+# Note chargée avec l'instance (absente si le champ est différé): seule une note qui change
+# touche le carnet, pas l'ouverture d'un quiz ni le simple changement de statut d'une copie
+_UNKNOWN = object()
+RESULT_FIELDS = {Submission: 'grade', QuizSubmission: 'score'}
+
+
+@receiver(post_init, sender=Submission)
+@receiver(post_init, sender=QuizSubmission)
+def remember_result(sender, instance, **kwargs):
+    instance._gradebook_result = instance.__dict__.get(RESULT_FIELDS[sender], _UNKNOWN)
+
+
+def _result_changed(sender, instance, created, update_fields):
+    field = RESULT_FIELDS[sender]
+    if update_fields is not None and field not in update_fields:
+        return False
+    value = getattr(instance, field)
+    previous = None if created else instance._gradebook_result
+    instance._gradebook_result = value
+    return previous is _UNKNOWN or previous != value
+
+
+@receiver(post_save, sender=Submission)
+def submission_saved(sender, instance, created, update_fields=None, **kwargs):
+    if _result_changed(sender, instance, created, update_fields):
+        schedule_refresh(instance.student_id, instance.assignment.course_id)
+
+
+@receiver(post_save, sender=QuizSubmission)
+def quiz_submission_saved(sender, instance, created, update_fields=None, **kwargs):
+    if _result_changed(sender, instance, created, update_fields):
+        schedule_refresh(instance.student_id, instance.quiz.course_id)
+
+
+@receiver(post_delete, sender=Submission)
+def submission_deleted(sender, instance, **kwargs):
+    schedule_refresh(instance.student_id, instance.assignment.course_id)
+
+
+@receiver(post_delete, sender=QuizSubmission)
+def quiz_submission_deleted(sender, instance, **kwargs):
+    schedule_refresh(instance.student_id, instance.quiz.course_id)
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_save, sender=Quiz)
+def evaluation_saved(sender, instance, created, **kwargs):
+    # Le barème (total_points) ou le cours a pu changer: toutes les lignes du cours sont recalculées
+    if not created:
+        course_id = instance.course_id
+        transaction.on_commit(lambda: rebuild(course_ids=[course_id]))
+
+
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=Quiz)
+def evaluation_deleted(sender, instance, **kwargs):
+    course_id = instance.course_id
+    transaction.on_commit(lambda: rebuild(course_ids=[course_id]))
+
+
+@receiver(post_save, sender=Course)
+def course_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    with transaction.atomic():
+        rows = CourseGrade.objects.select_for_update().filter(course=instance).exclude(
+            auditoire_id=instance.auditoire_id, credits=instance.credits
+        ).values_list('student_id', 'auditoire_id', 'average')
+        old = {(student_id, instance.id): (auditoire_id, average) for student_id, auditoire_id, average in rows}
+        if old:
+            CourseGrade.objects.filter(course=instance).update(auditoire_id=instance.auditoire_id, credits=instance.credits)
+            emit_changes(old, {pair: (instance.auditoire_id, average) for pair, (_, average) in old.items()})
+
+
+@receiver(grade_changed)
+def update_grade_stats(sender, events, **kwargs):
+    apply_events(events)
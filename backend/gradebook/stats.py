@@ -0,0 +1,90 @@
+"""
+Statistiques de notes incrémentales.
+
+Chaque changement d'une ligne CourseGrade émet un événement grade_changed
+{"course_id", "auditoire_id", "departement_id", "old", "new"} (moyennes /20, None si absente).
+apply_events en déduit des deltas de somme, d'effectif et de réussites qu'il applique aux
+GradeStat du cours, de l'auditoire et du département par des UPDATE ... SET x = x + delta:
+les statistiques se lisent ensuite en une ligne, quelle que soit la taille de la cohorte.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.dispatch import Signal
+
+from .models import PASS_MARK, CourseGrade, GradeStat
+
+# Envoyé avec events=[...] une fois les lignes CourseGrade écrites
+grade_changed = Signal()
+
+SCOPES = (('course', 'course_id'), ('auditoire', 'auditoire_id'), ('departement', 'departement_id'))
+
+
+def _contribution(average):
+    if average is None:
+        return 0.0, 0, 0
+    return average, 1, 1 if average >= PASS_MARK else 0
+
+
+def event_deltas(events):
+    """{(scope, object_id): [total, count, passed]} cumulés sur tous les événements."""
+    deltas = {}
+    for event in events:
+        old_total, old_count, old_passed = _contribution(event['old'])
+        new_total, new_count, new_passed = _contribution(event['new'])
+        change = (new_total - old_total, new_count - old_count, new_passed - old_passed)
+        if change == (0, 0, 0):
+            continue
+        for scope, key in SCOPES:
+            object_id = event.get(key)
+            if object_id is None:
+                continue
+            delta = deltas.setdefault((scope, object_id), [0.0, 0, 0])
+            for i, value in enumerate(change):
+                delta[i] += value
+    return deltas
+
+
+def apply_events(events):
+    deltas = event_deltas(events)
+    if not deltas:
+        return
+    with transaction.atomic():
+        GradeStat.objects.bulk_create(
+            [GradeStat(scope=scope, object_id=object_id) for scope, object_id in deltas],
+            ignore_conflicts=True,
+        )
+        for (scope, object_id), (total, count, passed) in deltas.items():
+            GradeStat.objects.filter(scope=scope, object_id=object_id).update(
+                total=F('total') + total, count=F('count') + count, passed=F('passed') + passed,
+            )
+
+
+def recount():
+    """Recalcule toutes les GradeStat depuis CourseGrade (rattrapage)."""
+    graded = CourseGrade.objects.filter(average__isnull=False)
+    groups = (
+        ('course', 'course_id'),
+        ('auditoire', 'auditoire_id'),
+        ('departement', 'auditoire__departement_id'),
+    )
+    rows = []
+    for scope, field in groups:
+        for row in graded.values(object_id=F(field)).annotate(
+            sum_average=Sum('average'), n=Count('id'), n_passed=Count('id', filter=Q(average__gte=PASS_MARK)),
+        ).order_by():
+            if row['object_id'] is not None:
+                rows.append(GradeStat(scope=scope, object_id=row['object_id'],
+                                 total=row['sum_average'], count=row['n'], passed=row['n_passed']))
+    with transaction.atomic():
+        GradeStat.objects.all().delete()
+        GradeStat.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def get_stat(scope, object_id):
+    return GradeStat.objects.filter(scope=scope, object_id=object_id).first() or GradeStat(scope=scope, object_id=object_id)
+
+
+def get_stats(scope, object_ids):
+    found = {s.object_id: s for s in GradeStat.objects.filter(scope=scope, object_id__in=object_ids)}
+    return {object_id: found.get(object_id) or GradeStat(scope=scope, object_id=object_id) for object_id in object_ids}
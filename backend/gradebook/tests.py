@@ -0,0 +1,380 @@
+import csv
+import io
+import zipfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from academics.models import Section, Departement, Auditoire, Course, CourseAssignment
+from evaluations.models import Assignment, Submission, Quiz, QuizSubmission
+from .deliberation import deliberate
+from . import engine
+from .engine import rebuild
+from .exports import HEADER
+from .models import CourseGrade, GradeStat
+from .stats import recount
+
+User = get_user_model()
+
+
+class CourseGradeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.algo = Course.objects.create(name="Algorithmique", auditoire=cls.auditoire, credits=4)
+        cls.reseaux = Course.objects.create(name="Réseaux", auditoire=cls.auditoire, credits=2)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        cls.student = User.objects.create_user(
+            matricule="ETU-1", password="x", email="etu@ex.com", role="etudiant", current_auditoire=cls.auditoire,
+        )
+        cls.tp = Assignment.objects.create(course=cls.algo, assistant=cls.assistant, title="TP1", total_points=10, deadline=timezone.now())
+        cls.quiz = Quiz.objects.create(course=cls.algo, assistant=cls.assistant, title="Quiz 1", total_points=20)
+        cls.td = Assignment.objects.create(course=cls.reseaux, assistant=cls.assistant, title="TD1", total_points=20, deadline=timezone.now())
+
+    def grade(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Submission.objects.create(student=self.student, status="soumis", **kwargs)
+
+    def test_grade_writes_update_the_row(self):
+        submission = self.grade(assignment=self.tp, grade=8)
+        row = CourseGrade.objects.get(student=self.student, course=self.algo)
+        self.assertEqual((row.tp_obtained, row.tp_possible, row.tp_count), (8, 10, 1))
+        self.assertEqual(row.average, 16)
+        self.assertEqual((row.auditoire_id, row.credits), (self.auditoire.id, 4))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            QuizSubmission.objects.create(student=self.student, quiz=self.quiz, status="soumis", score=11)
+        row.refresh_from_db()
+        self.assertEqual((row.quiz_obtained, row.quiz_possible), (11, 20))
+        self.assertEqual(row.average, 12.67)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            submission.delete()
+            QuizSubmission.objects.filter(student=self.student).delete()
+        self.assertFalse(CourseGrade.objects.exists())
+
+    def test_ungraded_submission_has_no_row(self):
+        self.grade(assignment=self.tp, grade=None)
+        self.assertFalse(CourseGrade.objects.exists())
+
+    def test_only_result_changes_refresh_the_row(self):
+        with mock.patch.object(engine, "refresh_pairs") as refresh_pairs, self.captureOnCommitCallbacks(execute=True):
+            attempt = QuizSubmission.objects.create(student=self.student, quiz=self.quiz)
+            attempt.status = "soumis"
+            attempt.save()
+            Submission.objects.create(student=self.student, assignment=self.tp, status="soumis")
+        refresh_pairs.assert_not_called()
+
+        with mock.patch.object(engine, "refresh_pairs") as refresh_pairs, self.captureOnCommitCallbacks(execute=True):
+            attempt = QuizSubmission.objects.get(id=attempt.id)
+            attempt.score = 12
+            attempt.save(update_fields=["score"])
+            attempt.save(update_fields=["score"])
+        refresh_pairs.assert_called_once_with({(self.student.id, self.algo.id)})
+
+    def test_pair_is_locked_before_its_totals_are_read(self):
+        locked = []
+        real_totals = engine._totals
+
+        def totals(*args, **kwargs):
+            locked.append(CourseGrade.objects.filter(student=self.student, course=self.algo).exists())
+            return real_totals(*args, **kwargs)
+
+        with mock.patch.object(engine, "_totals", side_effect=totals):
+            self.grade(assignment=self.tp, grade=8)
+        self.assertEqual(locked, [True])
+        self.assertEqual(GradeStat.objects.get(scope="course", object_id=self.algo.id).count, 1)
+
+        # La ligne provisoire d'un couple sans note ne survit pas au recalcul
+        engine.refresh_pairs({(self.student.id, self.reseaux.id)})
+        self.assertEqual(list(CourseGrade.objects.values_list("course_id", flat=True)), [self.algo.id])
+
+    def test_course_and_scale_changes(self):
+        self.grade(assignment=self.tp, grade=8)
+        self.algo.credits = 6
+        self.algo.save()
+        self.assertEqual(CourseGrade.objects.get(course=self.algo).credits, 6)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tp.total_points = 20
+            self.tp.save()
+        self.assertEqual(CourseGrade.objects.get(course=self.algo).average, 8)
+
+    def test_rebuild_matches_incremental_rows(self):
+        self.grade(assignment=self.tp, grade=5)
+        self.grade(assignment=self.td, grade=15)
+        expected = sorted(CourseGrade.objects.values_list('course_id', 'average', 'credits'))
+        CourseGrade.objects.all().delete()
+        self.assertEqual(rebuild(), 2)
+        self.assertEqual(sorted(CourseGrade.objects.values_list('course_id', 'average', 'credits')), expected)
+
+    def test_endpoints_read_the_gradebook(self):
+        self.grade(assignment=self.tp, grade=8) # 16/20, 4 crédits
+        self.grade(assignment=self.td, grade=6) # 6/20, 2 crédits
+        client = APIClient()
+        client.force_authenticate(self.student)
+
+        summary = client.get("/api/student/summary").data
+        self.assertEqual(summary["creditsEarned"], 4)
+        self.assertEqual(summary["gpa"], round((16 * 4 + 6 * 2) / 6, 2))
+
+        client.force_authenticate(self.assistant)
+        with self.assertNumQueries(4):
+            stats = client.get(f"/api/assistant/auditoriums/{self.auditoire.id}/stats").data
+        self.assertEqual((stats["averageGrade"], stats["passRate"], stats["totalStudents"]), (11, 50, 1))
+
+        grades = client.get(f"/api/assistant/students/{self.student.id}/grades").data
+        self.assertEqual(grades, [
+            {"name": "Algorithmique", "grade": 16, "credits": 4},
+            {"name": "Réseaux", "grade": 6, "credits": 2},
+        ])
+        detail = client.get(f"/api/assistant/students/{self.student.id}").data
+        self.assertEqual((detail["total_grade_obtained"], detail["total_possible_points"]), (14, 30))
+
+
+class GradeStatTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.l1 = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.l2 = Auditoire.objects.create(name="Licence 2", departement=cls.departement)
+        cls.course = Course.objects.create(name="Algorithmique", auditoire=cls.l1)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        cls.tp = Assignment.objects.create(course=cls.course, assistant=cls.assistant, title="TP1", total_points=20, deadline=timezone.now())
+        cls.students = [
+            User.objects.create_user(matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", role="etudiant", current_auditoire=cls.l1)
+            for i in range(3)
+        ]
+
+    def stat(self, scope, object_id):
+        stat = GradeStat.objects.get(scope=scope, object_id=object_id)
+        return stat.count, stat.passed, stat.average
+
+    def grade_all(self, grades):
+        with self.captureOnCommitCallbacks(execute=True):
+            return [
+                Submission.objects.create(assignment=self.tp, student=student, status="soumis", grade=grade)
+                for student, grade in zip(self.students, grades)
+            ]
+
+    def test_events_adjust_every_scope(self):
+        submissions = self.grade_all([12, 8, 16])
+        for scope, object_id in (('course', self.course.id), ('auditoire', self.l1.id), ('departement', self.departement.id)):
+            self.assertEqual(self.stat(scope, object_id), (3, 2, 12))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            submissions[1].grade = 14
+            submissions[1].save()
+        self.assertEqual(self.stat('auditoire', self.l1.id), (3, 3, 14))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            submissions[2].delete()
+        self.assertEqual(self.stat('departement', self.departement.id), (2, 2, 13))
+
+    def test_course_moving_to_another_auditoire(self):
+        self.grade_all([12, 8])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.auditoire = self.l2
+            self.course.save()
+        self.assertEqual(self.stat('auditoire', self.l1.id), (0, 0, None))
+        self.assertEqual(self.stat('auditoire', self.l2.id), (2, 1, 10))
+        self.assertEqual(self.stat('departement', self.departement.id), (2, 1, 10))
+
+    def test_recount_matches_running_sums(self):
+        self.grade_all([12, 8, 16])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tp.total_points = 40
+            self.tp.save()
+        incremental = sorted((s.scope, s.object_id, s.count, s.passed, s.average) for s in GradeStat.objects.all())
+        recount()
+        self.assertEqual(sorted((s.scope, s.object_id, s.count, s.passed, s.average) for s in GradeStat.objects.all()), incremental)
+
+    def test_department_performance_reads_stats(self):
+        self.grade_all([12, 8, 16])
+        head = User.objects.create_user(matricule="CD-1", password="x", email="cd@ex.com", role="chef_departement", department_head_of=self.departement)
+        client = APIClient()
+        client.force_authenticate(head)
+        with self.assertNumQueries(2):
+            response = client.get("/api/department/student-performance")
+        self.assertEqual(response.data, [{"name": "Licence 1", "performance": 12}, {"name": "Licence 2", "performance": 0}])
+
+
+class GradeExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.algo = Course.objects.create(name="Algorithmique", code="ALGO", auditoire=cls.auditoire)
+        cls.reseaux = Course.objects.create(name="Réseaux", code="RES", auditoire=cls.auditoire)
+        cls.assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        CourseAssignment.objects.create(course=cls.algo, assistant=cls.assistant)
+        cls.jury = User.objects.create_user(matricule="JUR-1", password="x", email="jury@ex.com", role="jury")
+        tp = Assignment.objects.create(course=cls.algo, assistant=cls.assistant, title="TP1", total_points=10, deadline=timezone.now())
+        td = Assignment.objects.create(course=cls.reseaux, assistant=cls.assistant, title="TD1", total_points=20, deadline=timezone.now())
+        quiz = Quiz.objects.create(course=cls.algo, assistant=cls.assistant, title="Quiz 1", total_points=20)
+        for i in range(3):
+            student = User.objects.create_user(
+                matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", first_name="Élève", last_name=f"N{i}",
+                role="etudiant", current_auditoire=cls.auditoire,
+            )
+            Submission.objects.create(assignment=tp, student=student, status="soumis", grade=5 + i)
+            Submission.objects.create(assignment=td, student=student, status="soumis", grade=None)
+            QuizSubmission.objects.create(quiz=quiz, student=student, status="soumis", score=10 + i)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.jury)
+
+    def test_csv_export_of_auditoire(self):
+        response = self.client.get(f"/api/grades/export.csv?auditoire={self.auditoire.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="notes-licence-1.csv"', response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode("utf-8-sig"))))
+        self.assertEqual(rows[0], HEADER)
+        self.assertEqual(len(rows), 1 + 9)
+        self.assertIn(["ETU-0", "Élève N0", "Licence 1", "Algorithmique", "ALGO", "TP", "TP1", "5.0", "10", "soumis", ""], rows)
+        self.assertEqual([r[7] for r in rows if r[5] == "Quiz"], ["10.0", "11.0", "12.0"])
+
+    def test_assistant_only_exports_assigned_courses(self):
+        self.client.force_authenticate(self.assistant)
+        response = self.client.get(f"/api/grades/export.csv?departement={self.departement.id}")
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        self.assertNotIn("Réseaux", content)
+        self.assertEqual(content.count("Algorithmique"), 6)
+
+    def test_heads_only_export_their_department_or_section(self):
+        other_section = Section.objects.create(name="Lettres")
+        other = Departement.objects.create(name="Histoire", section=other_section)
+        head = User.objects.create_user(matricule="CD-1", password="x", email="cd@ex.com", role="chef_departement", department_head_of=other)
+        self.client.force_authenticate(head)
+        self.assertEqual(self.client.get(f"/api/grades/export.csv?departement={self.departement.id}").status_code, 403)
+        response = self.client.get(f"/api/grades/export.csv?auditoire={self.auditoire.id}")
+        self.assertEqual(len(b"".join(response.streaming_content).decode("utf-8-sig").splitlines()), 1)
+
+        section_head = User.objects.create_user(matricule="CS-1", password="x", email="cs@ex.com", role="chef_section", section_head_of=other_section)
+        self.client.force_authenticate(section_head)
+        response = self.client.get(f"/api/grades/export.csv?departement={self.departement.id}")
+        self.assertEqual(len(b"".join(response.streaming_content).decode("utf-8-sig").splitlines()), 1)
+
+        self.client.force_authenticate(User.objects.create_user(
+            matricule="CD-2", password="x", email="cd2@ex.com", role="chef_departement", department_head_of=self.departement,
+        ))
+        response = self.client.get(f"/api/grades/export.csv?auditoire={self.auditoire.id}")
+        self.assertEqual(len(b"".join(response.streaming_content).decode("utf-8-sig").splitlines()), 1 + 9)
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        response = self.client.get("/api/grades/export.xlsx?course=ALGO")
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        self.assertIn('name="ALGO"', archive.read("xl/workbook.xml").decode())
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 1 + 6)
+        self.assertIn("<t xml:space=\"preserve\">Élève N2</t>", sheet)
+
+    async def test_asgi_export_is_streamed_asynchronously(self):
+        token = await sync_to_async(AccessToken.for_user)(self.jury)
+        with mock.patch("gradebook.exports.EXPORT_CHUNK_SIZE", 4):
+            response = await AsyncClient().get(
+                f"/api/grades/export.csv?auditoire={self.auditoire.id}", headers={"Authorization": f"Bearer {token}"},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+        # En-tête + 9 lignes, rendues par lots de 4
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+        self.assertEqual((rows[0], len(rows)), (HEADER, 1 + 9))
+
+    def test_scope_and_role_are_required(self):
+        self.assertEqual(self.client.get("/api/grades/export.csv").status_code, 400)
+        self.client.force_authenticate(User.objects.get(matricule="ETU-0"))
+        self.assertEqual(self.client.get(f"/api/grades/export.csv?auditoire={self.auditoire.id}").status_code, 403)
+
+
+class DeliberationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        cls.departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=cls.departement)
+        cls.empty = Auditoire.objects.create(name="Licence 2", departement=cls.departement)
+        algo = Course.objects.create(name="Algorithmique", auditoire=cls.auditoire, credits=6)
+        reseaux = Course.objects.create(name="Réseaux", auditoire=cls.auditoire, credits=4)
+        assistant = User.objects.create_user(matricule="ASS-1", password="x", email="ass@ex.com", role="assistant")
+        tps = [
+            Assignment.objects.create(course=course, assistant=assistant, title="TP", total_points=20, deadline=timezone.now())
+            for course in (algo, reseaux)
+        ]
+        cls.students = [
+            User.objects.create_user(matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", role="etudiant", current_auditoire=cls.auditoire)
+            for i in range(3)
+        ]
+        # ETU-0: 14 et 12 (moyenne 13.2, tout validé); ETU-1: 16 et 6 (moyenne 12, 6 crédits sur 10); ETU-2: aucune note
+        for student, grades in zip(cls.students, ((14, 12), (16, 6))):
+            for tp, grade in zip(tps, grades):
+                Submission.objects.create(assignment=tp, student=student, status="soumis", grade=grade)
+        rebuild()
+        cls.sga = User.objects.create_user(matricule="SGA-1", password="x", email="sga@ex.com", role="sga")
+
+    def results(self, deliberation):
+        return {
+            r.student.matricule: (r.average, r.credits_earned, r.decision)
+            for r in deliberation.results.select_related('student')
+        }
+
+    def test_simulation_leaves_students_untouched(self):
+        deliberation = deliberate(auditoire=self.auditoire)
+        self.assertEqual(deliberation.status, 'simulee')
+        self.assertEqual((deliberation.student_count, deliberation.passed_count), (3, 1))
+        self.assertEqual(self.results(deliberation), {
+            "ETU-0": (13.2, 10, 'reussi'),
+            "ETU-1": (12.0, 6, 'non_reussi'),
+            "ETU-2": (0.0, 0, 'non_reussi'),
+        })
+        self.assertFalse(User.objects.filter(role="etudiant").exclude(academic_status="en_cours").exists())
+
+    def test_commit_applies_decisions_and_custom_rules(self):
+        with mock.patch("gradebook.deliberation.invalidate_model") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                deliberation = deliberate(departement=self.departement, commit=True, rules={"min_credit_ratio": 0.5})
+        invalidate.assert_called_once_with(User)
+        self.assertEqual(deliberation.passed_count, 2)
+        statuses = dict(User.objects.filter(role="etudiant").values_list("matricule", "academic_status"))
+        self.assertEqual(statuses, {"ETU-0": "reussi", "ETU-1": "reussi", "ETU-2": "non_reussi"})
+
+    def test_query_count_does_not_depend_on_cohort_size(self):
+        with CaptureQueriesContext(connection) as small:
+            deliberate(auditoire=self.auditoire, commit=True)
+        for i in range(3, 40):
+            User.objects.create_user(matricule=f"ETU-{i}", password="x", email=f"etu{i}@ex.com", role="etudiant", current_auditoire=self.auditoire)
+        with self.assertNumQueries(len(small)):
+            deliberation = deliberate(auditoire=self.auditoire, commit=True)
+        self.assertEqual(deliberation.student_count, 40)
+
+    def test_api_run_and_detail(self):
+        client = APIClient()
+        client.force_authenticate(self.sga)
+        response = client.post("/api/sga/evaluation-supervision/deliberation-sessions", {"auditoire_id": self.auditoire.id}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data["faculty"], response.data["status"], response.data["passed"]), ("Licence 1", "Simulée", 1))
+
+        listing = client.get("/api/sga/evaluation-supervision/deliberation-sessions").data
+        self.assertEqual([d["id"] for d in listing], [response.data["id"]])
+        detail = client.get(f"/api/jury/deliberations/{response.data['id']}").data
+        self.assertEqual([(r["matricule"], r["decision"]) for r in detail["results"]][0], ("ETU-0", "Réussi"))
+
+        bad = client.post("/api/jury/deliberations", {"auditoire_id": self.auditoire.id, "departement_id": self.departement.id}, format="json")
+        self.assertEqual(bad.status_code, 400)
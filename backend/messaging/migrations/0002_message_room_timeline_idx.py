@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_remove_calendrier_description_and_more'),
+        ('messaging', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['course', 'auditorium', 'timestamp', 'id'], name='message_room_timeline_idx'),
+        ),
+    ]
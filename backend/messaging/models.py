@@ -16,3 +16,6 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            models.Index(fields=['course', 'auditorium', 'timestamp', 'id'], name='message_room_timeline_idx'),
+        ]
@@ -0,0 +1,16 @@
+from django.utils.dateparse import parse_datetime
+
+from core import pagination
+
+
+def encode_cursor(message):
+    """Curseur opaque construit sur la clé (timestamp, id) d'un message."""
+    return pagination.encode_cursor(message.timestamp.isoformat(), message.id)
+
+
+def decode_cursor(cursor):
+    timestamp_s, message_id = pagination.decode_cursor(cursor, str, int)
+    timestamp = parse_datetime(timestamp_s)
+    if timestamp is None:
+        raise ValueError("Curseur invalide")
+    return timestamp, message_id
@@ -0,0 +1,105 @@
+"""
+Diffusion en temps réel des messages de chat par salle (cours, auditoire).
+
+Le backend est choisi par le réglage MESSAGING_BROKER (chemin pointé vers une classe
+BaseBroker). Par défaut, InMemoryBroker diffuse aux abonnés du même processus ; un
+déploiement multi-processus peut fournir un backend reposant sur un broker externe.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = 'messaging.pubsub.InMemoryBroker'
+
+
+def room_name(course_id, auditorium_id):
+    return f"chat:{course_id}:{auditorium_id}"
+
+
+class BaseBroker:
+    def publish(self, room, payload):
+        """Diffuse payload à tous les abonnés de room. Doit pouvoir être appelé depuis n'importe quel thread."""
+        raise NotImplementedError
+
+    def subscribe(self, room):
+        """Retourne un gestionnaire de contexte asynchrone qui s'abonne à room le temps du bloc."""
+        raise NotImplementedError
+
+
+class Subscription:
+    """Abonnement à une salle, utilisé comme gestionnaire de contexte asynchrone."""
+    def __init__(self, broker, room, maxsize):
+        self.broker = broker
+        self.room = room
+        self._maxsize = maxsize
+        self._loop = None
+        self._queue = None
+
+    async def __aenter__(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        self.broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self)
+        return False
+
+    def put(self, payload):
+        self._loop.call_soon_threadsafe(self._put_nowait, payload)
+
+    def _put_nowait(self, payload):
+        # Un abonné trop lent perd les messages en excès plutôt que de bloquer l'émetteur;
+        # il les récupère en se reconnectant avec son dernier curseur.
+        if not self._queue.full():
+            self._queue.put_nowait(payload)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class InMemoryBroker(BaseBroker):
+    def __init__(self, maxsize=100):
+        self._maxsize = maxsize
+        self._rooms = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, room, payload):
+        with self._lock:
+            subscribers = list(self._rooms.get(room, ()))
+        for subscription in subscribers:
+            subscription.put(payload)
+
+    def subscribe(self, room):
+        return Subscription(self, room, self._maxsize)
+
+    def _add(self, subscription):
+        with self._lock:
+            self._rooms[subscription.room].add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            self._rooms[subscription.room].discard(subscription)
+            if not self._rooms[subscription.room]:
+                del self._rooms[subscription.room]
+
+    def subscriber_count(self, room):
+        with self._lock:
+            return len(self._rooms.get(room, ()))
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(getattr(settings, 'MESSAGING_BROKER', DEFAULT_BROKER))()
+
+
+@receiver(setting_changed)
+def _reset_broker(*, setting, **kwargs):
+    if setting == 'MESSAGING_BROKER':
+        get_broker.cache_clear()
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Message
+from .pagination import encode_cursor
+from .pubsub import get_broker, room_name
+from .serializers import MessageSerializer
+
+
+@receiver(post_save, sender=Message)
+def publish_new_message(sender, instance, created, **kwargs):
+    if not created:
+        return
+    payload = {"cursor": encode_cursor(instance), "message": MessageSerializer(instance).data}
+    room = room_name(instance.course_id, instance.auditorium_id)
+    transaction.on_commit(lambda: get_broker().publish(room, payload))
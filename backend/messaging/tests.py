@@ -0,0 +1,123 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from academics.models import Section, Departement, Auditoire, Course
+from .models import Message
+from .pagination import encode_cursor
+from .pubsub import InMemoryBroker, get_broker, room_name
+
+User = get_user_model()
+
+
+class MessageListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        cls.course = Course.objects.create(name="Réseaux", auditoire=cls.auditoire)
+        cls.user = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", first_name="Ada")
+        for i in range(5):
+            Message.objects.create(course=cls.course, auditorium=cls.auditoire, sender=cls.user, text=f"m{i}")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f"/api/messaging/courses/{self.course.code}/auditoriums/{self.auditoire.id}/messages/"
+
+    def test_latest_page_and_history(self):
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual([m["text"] for m in response.json()], ["m3", "m4"])
+
+        older = self.client.get(self.url, {"limit": 2, "before": response["X-Previous-Cursor"]})
+        self.assertEqual([m["text"] for m in older.json()], ["m1", "m2"])
+
+        oldest = self.client.get(self.url, {"limit": 2, "before": older["X-Previous-Cursor"]})
+        self.assertEqual([m["text"] for m in oldest.json()], ["m0"])
+        self.assertNotIn("X-Previous-Cursor", oldest)
+
+    def test_since_returns_only_new_messages(self):
+        cursor = self.client.get(self.url)["X-Next-Cursor"]
+
+        empty = self.client.get(self.url, {"since": cursor})
+        self.assertEqual(empty.json(), [])
+        self.assertEqual(empty["X-Next-Cursor"], cursor)
+
+        Message.objects.create(course=self.course, auditorium=self.auditoire, sender=self.user, text="nouveau")
+        fresh = self.client.get(self.url, {"since": cursor})
+        self.assertEqual([m["text"] for m in fresh.json()], ["nouveau"])
+        self.assertNotEqual(fresh["X-Next-Cursor"], cursor)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {"since": "pas-un-curseur"}).status_code, 400)
+
+
+class RecordingBroker(InMemoryBroker):
+    """Broker local de substitution qui garde une trace des publications."""
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, room, payload):
+        self.published.append((room, payload))
+        super().publish(room, payload)
+
+
+@override_settings(MESSAGING_BROKER="messaging.tests.RecordingBroker")
+class MessageStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        section = Section.objects.create(name="Sciences")
+        departement = Departement.objects.create(name="Informatique", section=section)
+        cls.auditoire = Auditoire.objects.create(name="Licence 1", departement=departement)
+        cls.course = Course.objects.create(name="Réseaux", auditoire=cls.auditoire)
+        cls.user = User.objects.create_user(matricule="ETU-1", password="x", email="etu@ex.com", first_name="Ada")
+
+    def setUp(self):
+        get_broker.cache_clear()
+
+    def test_new_message_is_published_to_its_room_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            message = Message.objects.create(course=self.course, auditorium=self.auditoire, sender=self.user, text="salut")
+        [(room, payload)] = get_broker().published
+        self.assertEqual(room, room_name(self.course.id, self.auditoire.id))
+        self.assertEqual(payload["message"]["id"], message.id)
+
+    async def test_fan_out_is_scoped_to_the_room(self):
+        broker = get_broker()
+        async with broker.subscribe("a") as first, broker.subscribe("a") as second, broker.subscribe("b") as other:
+            # publication depuis un autre thread, comme depuis une vue synchrone
+            await asyncio.to_thread(broker.publish, "a", {"n": 1})
+            self.assertEqual(await first.get(timeout=1), {"n": 1})
+            self.assertEqual(await second.get(timeout=1), {"n": 1})
+            with self.assertRaises(asyncio.TimeoutError):
+                await other.get(timeout=0.05)
+        self.assertEqual(broker.subscriber_count("a"), 0)
+
+    async def test_stream_replays_missed_messages_then_pushes_live_ones(self):
+        first = await Message.objects.acreate(course=self.course, auditorium=self.auditoire, sender=self.user, text="m1")
+        await Message.objects.acreate(course=self.course, auditorium=self.auditoire, sender=self.user, text="m2")
+        token = str(AccessToken.for_user(self.user))
+
+        response = await self.async_client.get(
+            f"/api/messaging/courses/{self.course.code}/auditoriums/{self.auditoire.id}/stream/",
+            {"token": token, "since": encode_cursor(first)},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+        self.assertIn(b'"text": "m2"', await anext(stream))
+
+        get_broker().publish(room_name(self.course.id, self.auditoire.id), {"cursor": "c", "message": {"id": 0, "text": "live"}})
+        self.assertIn(b'"text": "live"', await anext(stream))
+        await stream.aclose()
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(
+            f"/api/messaging/courses/{self.course.code}/auditoriums/{self.auditoire.id}/stream/"
+        )
+        self.assertEqual(response.status_code, 401)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import message_list
+from .views import message_list, message_stream
 
 urlpatterns = [
     path('courses/<str:course_code>/auditoriums/<int:auditorium_id>/messages/', message_list, name='message_list'),
+    path('courses/<str:course_code>/auditoriums/<int:auditorium_id>/stream/', message_stream, name='message_stream'),
 ]
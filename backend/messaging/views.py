@@ -1,16 +1,39 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
 from .models import Message
+from .pagination import encode_cursor, decode_cursor
+from .pubsub import get_broker, room_name
 from .serializers import MessageSerializer
 from academics.models import Course, Auditoire
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def message_list(request, course_code, auditorium_id):
     """
-    List all messages for a given course and auditorium, or create a new message.
+    List messages for a given course and auditorium, or create a new message.
+
+    GET returns at most `limit` messages in chronological order:
+    - `since=<cursor>`: only messages newer than the cursor (incremental polling);
+    - `before=<cursor>`: the page of messages just older than the cursor;
+    - no cursor: the most recent page.
+    The `X-Next-Cursor` header is the cursor to pass as `since` on the next poll and
+    `X-Previous-Cursor`, when present, the cursor to pass as `before` to load older history.
     """
     try:
         course = Course.objects.get(code=course_code)
@@ -21,9 +44,40 @@ def message_list(request, course_code, auditorium_id):
         return Response({'error': 'Auditorium not found'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        messages = Message.objects.filter(course=course, auditorium=auditorium)
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        since = request.query_params.get('since')
+        before = request.query_params.get('before')
+
+        messages = Message.objects.filter(course=course, auditorium=auditorium).select_related('sender')
+        try:
+            if since:
+                timestamp, message_id = decode_cursor(since)
+                page = list(messages.filter(
+                    Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id)
+                ).order_by('timestamp', 'id')[:limit])
+                has_older = False
+            else:
+                if before:
+                    timestamp, message_id = decode_cursor(before)
+                    messages = messages.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id))
+                # On lit une ligne de plus pour savoir s'il reste de l'historique
+                page = list(messages.order_by('-timestamp', '-id')[:limit + 1])
+                has_older = len(page) > limit
+                page = page[:limit][::-1]
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = MessageSerializer(page, many=True)
+        response = Response(serializer.data)
+        next_cursor = encode_cursor(page[-1]) if page else since
+        if next_cursor:
+            response['X-Next-Cursor'] = next_cursor
+        if has_older:
+            response['X-Previous-Cursor'] = encode_cursor(page[0])
+        return response
 
     elif request.method == 'POST':
         serializer = MessageSerializer(data=request.data, context={'request': request, 'course': course, 'auditorium': auditorium})
@@ -31,3 +85,90 @@ def message_list(request, course_code, auditorium_id):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _authenticate_stream(request):
+    """
+    Authentifie la connexion SSE. EventSource ne pouvant pas envoyer d'en-tête
+    Authorization, le jeton d'accès JWT est aussi accepté via ?token=.
+    """
+    authenticator = JWTAuthentication()
+    try:
+        raw_token = request.GET.get('token')
+        if raw_token:
+            return authenticator.get_user(authenticator.get_validated_token(raw_token))
+        result = authenticator.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _missed_messages(course_id, auditorium_id, cursor):
+    timestamp, message_id = decode_cursor(cursor)
+    messages = Message.objects.filter(
+        Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id),
+        course_id=course_id, auditorium_id=auditorium_id,
+    ).select_related('sender').order_by('timestamp', 'id')[:MAX_PAGE_SIZE]
+    return [{"cursor": encode_cursor(m), "message": MessageSerializer(m).data} for m in messages]
+
+
+def _sse_event(payload):
+    return f"id: {payload['cursor']}\nevent: message\ndata: {json.dumps(payload['message'])}\n\n"
+
+
+async def message_stream(request, course_code, auditorium_id):
+    """
+    Flux Server-Sent Events des nouveaux messages d'un cours et d'un auditoire.
+
+    Doit être servi par un serveur ASGI (config.asgi). Le client reprend là où il s'est
+    arrêté grâce à l'en-tête Last-Event-ID (ou ?since=), qui porte le curseur du dernier message reçu.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    user = await sync_to_async(_authenticate_stream)(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    course = await Course.objects.filter(code=course_code).afirst()
+    if course is None:
+        return JsonResponse({'error': 'Course not found'}, status=404)
+    if not await Auditoire.objects.filter(id=auditorium_id).aexists():
+        return JsonResponse({'error': 'Auditorium not found'}, status=404)
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    if since:
+        try:
+            decode_cursor(since)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    room = room_name(course.id, auditorium_id)
+    heartbeat = getattr(settings, 'MESSAGING_STREAM_HEARTBEAT', 15)
+    max_duration = getattr(settings, 'MESSAGING_STREAM_MAX_SECONDS', 300)
+
+    async def events():
+        async with get_broker().subscribe(room) as subscription:
+            # Abonnement avant le rattrapage pour ne perdre aucun message entre les deux
+            sent_ids = set()
+            yield f"retry: {heartbeat * 1000}\n\n"
+            if since:
+                for payload in await sync_to_async(_missed_messages)(course.id, auditorium_id, since):
+                    sent_ids.add(payload['message']['id'])
+                    yield _sse_event(payload)
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + max_duration
+            while loop.time() < deadline:
+                try:
+                    payload = await subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if payload['message']['id'] not in sent_ids:
+                    yield _sse_event(payload)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
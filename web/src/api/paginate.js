@@ -0,0 +1,25 @@
+import axios from 'axios'
+
+// Pagination par clé: le serveur renvoie l'en-tête X-Next-Cursor tant qu'il reste des lignes
+export async function getPage(url, params = {}, cursor = null) {
+  const { data, headers } = await axios.get(url, { params: cursor ? { ...params, cursor } : params })
+  return { items: data, nextCursor: headers['x-next-cursor'] || null }
+}
+
+export async function getAllPages(url, params = {}) {
+  const items = []
+  let cursor = null
+  do {
+    const page = await getPage(url, params, cursor)
+    items.push(...page.items)
+    cursor = page.nextCursor
+  } while (cursor)
+  return items
+}
+
+// Messagerie: la page la plus récente d'abord; l'en-tête X-Previous-Cursor, passé en `before`,
+// donne la page de messages juste plus anciens
+export async function getMessagePage(url, before = null) {
+  const { data, headers } = await axios.get(url, { params: before ? { before } : {} })
+  return { items: data, previousCursor: headers['x-previous-cursor'] || null }
+}
@@ -103,7 +103,7 @@ const CreateScheduleModal = ({ isOpen, onClose, departmentId, onScheduleCreated
             onClose();
         } catch (error) {
             console.error("Error creating schedule:", error);
-            toast.error("Erreur lors de la création de l'horaire.");
+            toast.error(error.response?.data?.detail || "Erreur lors de la création de l'horaire.");
         } finally {
             setLoading(false);
         }
@@ -220,10 +220,8 @@ export function initMock() {
 
   // Calendrier académique
   mock.onGet('/api/student/calendar').reply(200, [
-    { date: '2025-11-05', title: 'Quiz Algorithmique' },
-    { date: '2025-11-07', title: 'TP Réseaux' },
-    { date: '2025-11-12', title: 'TD POO' },
-    { date: '2025-11-20', title: 'Date limite frais académiques' },
+    { day: 'Lundi', events: [{ id: 1, startTime: '08:00', endTime: '10:00', courseName: 'Algorithmique', teacherName: 'Prof. Kabila' }] },
+    { day: 'Mercredi', events: [{ id: 2, startTime: '10:00', endTime: '12:00', courseName: 'Réseaux', teacherName: 'Ass. Mbuyi' }] },
   ])
 
   // Bibliothèque (vue étudiante)
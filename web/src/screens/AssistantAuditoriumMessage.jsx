@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { useParams } from 'react-router-dom';
 import axios from 'axios';
+import { getMessagePage } from '../api/paginate';
 
 export default function AssistantAuditoriumMessage() {
   const { code: auditoriumId } = useParams(); // 'code' from URL is now 'auditoriumId'
@@ -10,6 +11,8 @@ export default function AssistantAuditoriumMessage() {
   const [messageText, setMessageText] = useState(''); // Renamed 'body' to 'messageText'
   const [sending, setSending] = useState(false);
   const [msgs, setMsgs] = useState([]);
+  const [previousCursor, setPreviousCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   // Fetch courses for the auditorium
   useEffect(() => {
@@ -20,14 +23,33 @@ export default function AssistantAuditoriumMessage() {
     }
   }, [auditoriumId]);
 
+  const messagesUrl = `/api/messaging/courses/${encodeURIComponent(selectedCourseCode)}/auditoriums/${encodeURIComponent(auditoriumId)}/messages/`;
+
+  // La page la plus récente; l'historique plus ancien est chargé à la demande (X-Previous-Cursor)
+  const loadMessages = async (before = null) => {
+    const page = await getMessagePage(messagesUrl, before);
+    setMsgs(previous => before ? [...page.items, ...previous] : (page.items || []));
+    setPreviousCursor(page.previousCursor);
+  };
+
+  const loadOlder = async () => {
+    setLoadingOlder(true);
+    try {
+      await loadMessages(previousCursor);
+    } catch (error) {
+      console.error("Error fetching messages:", error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   // Fetch messages when both auditoriumId and selectedCourseCode are available
   useEffect(() => {
     if (auditoriumId && selectedCourseCode) {
-      axios.get(`/api/messaging/courses/${encodeURIComponent(selectedCourseCode)}/auditoriums/${encodeURIComponent(auditoriumId)}/messages/`)
-        .then(r => setMsgs(r.data || []))
-        .catch(error => console.error("Error fetching messages:", error));
+      loadMessages().catch(error => console.error("Error fetching messages:", error));
     } else {
       setMsgs([]); // Clear messages if no course is selected
+      setPreviousCursor(null);
     }
   }, [auditoriumId, selectedCourseCode]);
 
@@ -49,10 +71,7 @@ export default function AssistantAuditoriumMessage() {
       );
       setMessageText(''); // Clear message input
       // Re-fetch messages after sending
-      const { data } = await axios.get(
-        `/api/messaging/courses/${encodeURIComponent(selectedCourseCode)}/auditoriums/${encodeURIComponent(auditoriumId)}/messages/`
-      );
-      setMsgs(data || []);
+      await loadMessages();
     } catch (error) {
       console.error("Error sending message:", error);
     } finally {
@@ -81,6 +100,11 @@ export default function AssistantAuditoriumMessage() {
 
       <div className="card p-4 bg-slate-800">
         <h3 className="text-lg font-semibold mb-2">Messages récents</h3>
+        {previousCursor && (
+          <button className="btn mb-3" disabled={loadingOlder} onClick={loadOlder}>
+            {loadingOlder ? 'Chargement...' : 'Charger les messages précédents'}
+          </button>
+        )}
         <ul className="grid gap-2 text-sm">
           {msgs.map(m => (
             <li key={m.id} className="border border-white/10 rounded p-3 bg-slate-900">
@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useSearchParams } from 'react-router-dom';
 import { safeGet, safePost } from '../api/safeGet';
+import { getMessagePage } from '../api/paginate';
 
 // --- Helper Functions ---
 
@@ -76,6 +77,8 @@ function ChatArea({ course, currentUser }) {
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState('');
   const [loading, setLoading] = useState(false);
+  const [previousCursor, setPreviousCursor] = useState(null);
+  const [loadingOlder, setLoadingOlder] = useState(false);
   const messagesEndRef = useRef(null);
   const textareaRef = useRef(null);
 
@@ -86,24 +89,41 @@ function ChatArea({ course, currentUser }) {
   useEffect(() => {
     if (!course || !course.code || !course.auditorium_id) {
         setMessages([]);
+        setPreviousCursor(null);
         return;
     }
     const fetchMessages = async () => {
       setLoading(true);
       try {
-        const response = await safeGet(`/api/messaging/courses/${course.code}/auditoriums/${course.auditorium_id}/messages/`);
-        setMessages(response || []);
+        const page = await getMessagePage(`/api/messaging/courses/${course.code}/auditoriums/${course.auditorium_id}/messages/`);
+        setMessages(page.items || []);
+        setPreviousCursor(page.previousCursor);
         scrollToBottom();
       } catch (error) {
         console.error("Erreur lors de la récupération des messages:", error);
         setMessages([]);
+        setPreviousCursor(null);
       }
       setLoading(false);
     };
     fetchMessages();
   }, [course]);
 
-  useEffect(scrollToBottom, [messages]);
+  // L'API ne renvoie que la page la plus récente: l'historique plus ancien est chargé à la demande
+  const loadOlder = async () => {
+    setLoadingOlder(true);
+    try {
+      const page = await getMessagePage(`/api/messaging/courses/${course.code}/auditoriums/${course.auditorium_id}/messages/`, previousCursor);
+      setMessages(prev => [...page.items, ...prev]);
+      setPreviousCursor(page.previousCursor);
+    } catch (error) {
+      console.error("Erreur lors de la récupération des messages:", error);
+    }
+    setLoadingOlder(false);
+  };
+
+  // Défile vers le bas à l'arrivée d'un nouveau message, pas au chargement de l'historique
+  useEffect(scrollToBottom, [messages[messages.length - 1]?.id]);
 
   const handleSendMessage = async (e) => {
     e.preventDefault();
@@ -190,6 +210,13 @@ function ChatArea({ course, currentUser }) {
       </div>
       <div className="flex-1 p-6 overflow-y-auto">
         <div className="flex flex-col gap-4">
+          {previousCursor && (
+            <div className="text-center">
+              <button className="btn" disabled={loadingOlder} onClick={loadOlder}>
+                {loadingOlder ? 'Chargement...' : 'Charger les messages précédents'}
+              </button>
+            </div>
+          )}
           {chatElements.length > 0 ? chatElements : <p className="text-center text-slate-500">Aucun message pour ce cours.</p>}
           <div ref={messagesEndRef} />
         </div>
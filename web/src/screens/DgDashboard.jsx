@@ -4,9 +4,13 @@ import KpiCard from '../components/KpiCard'
 import ListWithFilters from '../components/ListWithFilters'
 import Skeleton from '../components/Skeleton'
 import { useToast } from '../shared/ToastProvider'
+import { getAllPages } from '../api/paginate'
 import { AreaChart, Area, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
 
 // Dummy Icons
+// Rôles du personnel (tous sauf 'etudiant'), filtrés par l'API
+const STAFF_ROLES = ['pdg', 'dg', 'sga', 'sgad', 'chef_section', 'chef_departement', 'professeur', 'assistant', 'apparitorat', 'caisse', 'service_it', 'bibliothecaire', 'jury']
+
 const UsersIcon = () => <svg xmlns="http://www.w3.org/2000/svg" className="h-6 w-6" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 4.354a4 4 0 110 5.292M15 21H3v-1a6 6 0 016-6h6a6 6 0 016 6v1h-3" /></svg>;
 const AcademicCapIcon = () => <svg xmlns="http://www.w3.org/2000/svg" className="h-6 w-6" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 14l9-5-9-5-9 5 9 5zm0 0l6.16-3.422a12.083 12.083 0 01.665 6.479A11.952 11.952 0 0012 20.055a11.952 11.952 0 00-6.824-2.998 12.078 12.078 0 01.665-6.479L12 14zm-4 6v-7.5l4-2.222" /></svg>;
 const BookOpenIcon = () => <svg xmlns="http://www.w3.org/2000/svg" className="h-6 w-6" fill="none" viewBox="0 0 24 24" stroke="currentColor"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M12 6.253v13m0-13C10.832 5.477 9.206 5 7.5 5S4.168 5.477 3 6.253v13C4.168 18.477 5.794 18 7.5 18s3.332.477 4.5 1.253m0-13C13.168 5.477 14.794 5 16.5 5c1.706 0 3.332.477 4.5 1.253v13C19.832 18.477 18.206 18 16.5 18s-3.332.477-4.5 1.253" /></svg>;
@@ -146,8 +150,9 @@ export default function DgDashboard() {
     const loadPersonnelManagement = async () => {
       setLoadingPersonnelManagement(true);
       try {
-        const response = await axios.get('/api/users'); // Assuming /api/users returns a list of all users
-        const personnelData = response.data.map(user => ({
+        // L'annuaire est paginé: toutes les pages du personnel (sans les étudiants) sont chargées
+        const users = await getAllPages('/api/users', { role: STAFF_ROLES.join(',') });
+        const personnelData = users.map(user => ({
           id: user.id,
           name: user.full_name, 
           role: user.role, 
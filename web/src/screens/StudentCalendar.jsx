@@ -26,17 +26,21 @@ function CalendarTab() {
   if (loading) return <p className="text-slate-500">Chargement du calendrier...</p>;
   if (error) return <p className="text-red-500">{error}</p>;
 
+  // Horaire hebdomadaire de l'auditoire: [{ day, events: [{ startTime, endTime, courseName, teacherName }] }]
   return (
     <ul className="space-y-3 mt-4">
-      {items.length > 0 ? items.map((item, i) => (
-        <li key={i} className="p-3 rounded-lg flex items-center gap-4 border border-slate-200 dark:border-slate-700">
-          <div className="flex-shrink-0 w-12 h-12 rounded-lg bg-blue-100 dark:bg-blue-900/50 flex flex-col items-center justify-center">
-            <span className="text-xs font-semibold text-blue-600 dark:text-blue-300">{new Date(item.date).toLocaleString('fr-FR', { month: 'short' })}</span>
-            <span className="text-lg font-bold text-blue-800 dark:text-blue-200">{new Date(item.date).getDate()}</span>
+      {items.length > 0 ? items.map((item) => (
+        <li key={item.day} className="p-3 rounded-lg flex items-start gap-4 border border-slate-200 dark:border-slate-700">
+          <div className="flex-shrink-0 w-20 h-12 rounded-lg bg-blue-100 dark:bg-blue-900/50 flex items-center justify-center">
+            <span className="text-sm font-bold text-blue-800 dark:text-blue-200">{item.day}</span>
           </div>
-          <div>
-            <p className="font-semibold text-slate-700 dark:text-slate-200">{item.title}</p>
-            <p className="text-sm text-slate-500 dark:text-slate-400">Événement académique</p>
+          <div className="space-y-1">
+            {item.events.map((event) => (
+              <p key={event.id} className="text-slate-700 dark:text-slate-200">
+                <span className="font-semibold">{event.startTime} - {event.endTime}</span> {event.courseName}
+                <span className="text-sm text-slate-500 dark:text-slate-400"> ({event.teacherName})</span>
+              </p>
+            ))}
           </div>
         </li>
       )) : <p className="text-center text-slate-500 py-4">Aucun événement à afficher dans le calendrier.</p>}
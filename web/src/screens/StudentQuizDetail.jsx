@@ -129,11 +129,12 @@ export default function StudentQuizDetail() {
         });
         setAnswers(initialAnswers);
 
-        const now = new Date();
-        const startedAt = new Date(data.attempt.started_at);
-        const durationInSeconds = data.duration * 60;
-        const timePassed = (now - startedAt) / 1000;
-        const remaining = Math.max(0, durationInSeconds - timePassed);
+        // Le temps restant est fourni par le serveur, qui refuse les soumissions hors délai
+        let remaining = data.attempt.remaining_seconds;
+        if (remaining === undefined) {
+          const startedAt = new Date(data.attempt.started_at);
+          remaining = Math.max(0, data.duration * 60 - (new Date() - startedAt) / 1000);
+        }
         setTimeLeft(remaining);
 
       } else {
@@ -1,29 +1,71 @@
-import React, { useEffect, useState } from 'react';
-import axios from 'axios';
+import React, { useCallback, useEffect, useState } from 'react';
+import { getPage } from '../api/paginate';
+
+const ROLES = [
+  ['', 'Tous les rôles'],
+  ['etudiant', 'Étudiant'],
+  ['assistant', 'Assistant'],
+  ['professeur', 'Professeur'],
+  ['chef_departement', 'Chef de Département'],
+  ['chef_section', 'Chef de Section'],
+  ['sga', 'SGA'],
+  ['sgad', 'SGAD'],
+  ['dg', 'DG'],
+  ['pdg', 'PDG'],
+  ['apparitorat', 'Apparitorat'],
+  ['caisse', 'Caisse/Comptabilité'],
+  ['service_it', 'Service IT'],
+  ['bibliothecaire', 'Bibliothécaire'],
+  ['jury', 'Jury'],
+];
 
 export default function UserList() {
   const [users, setUsers] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [role, setRole] = useState('');
+  const [search, setSearch] = useState('');
+
+  // L'annuaire est paginé côté serveur: les filtres sont envoyés à l'API, les pages suivantes chargées à la demande
+  const load = useCallback(async (cursor = null) => {
+    setLoading(true);
+    try {
+      const params = {};
+      if (role) params.role = role;
+      if (search.trim()) params.q = search.trim();
+      const page = await getPage('/api/users/', params, cursor);
+      setUsers(previous => cursor ? [...previous, ...page.items] : page.items);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error("There was an error fetching the users!", error);
+    } finally {
+      setLoading(false);
+    }
+  }, [role, search]);
 
   useEffect(() => {
-    axios.get('/api/users/')
-      .then(response => {
-        setUsers(response.data);
-        setLoading(false);
-      })
-      .catch(error => {
-        console.error("There was an error fetching the users!", error);
-        setLoading(false);
-      });
-  }, []);
+    const timer = setTimeout(() => load(), 300);
+    return () => clearTimeout(timer);
+  }, [load]);
 
-  if (loading) {
+  if (loading && users.length === 0) {
     return <div className="card p-4">Chargement...</div>;
   }
 
   return (
     <div className="card p-4">
       <h1 className="text-xl font-semibold mb-4">Liste des Utilisateurs</h1>
+      <div className="flex flex-wrap gap-2 mb-4">
+        <select className="input" value={role} onChange={e => setRole(e.target.value)}>
+          {ROLES.map(([value, label]) => <option key={value} value={value}>{label}</option>)}
+        </select>
+        <input
+          className="input"
+          placeholder="Matricule, nom ou prénom"
+          value={search}
+          onChange={e => setSearch(e.target.value)}
+        />
+      </div>
       <div className="overflow-x-auto">
         <table className="min-w-full text-sm text-left text-slate-500 dark:text-slate-400">
           <thead className="text-xs text-slate-700 uppercase bg-slate-50 dark:bg-slate-700 dark:text-slate-400">
@@ -58,6 +100,13 @@ export default function UserList() {
           </tbody>
         </table>
       </div>
+      {nextCursor && (
+        <div className="mt-4 text-center">
+          <button className="btn" disabled={loading} onClick={() => load(nextCursor)}>
+            {loading ? 'Chargement...' : 'Charger plus'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }